@@ -1,14 +1,27 @@
-import requests
-import google.generativeai as genai
-from bs4 import BeautifulSoup
-from googleapiclient.discovery import build
-from textblob import TextBlob
-import PyPDF2
-from io import BytesIO
-import praw
 import re
 from datetime import datetime
 import json
+import hashlib
+import itertools
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import nullcontext
+from urllib.parse import urlparse
+import bill_cache
+import bill_diff
+import governor
+import html_extract
+import metrics
+import schemes_index
+from clients import get_http_session, get_search_service, get_reddit, get_gemini_model
+from pdf_text import extract_pdf_text
+from retrieval import select_context, SUMMARY_QUERY, IMPACT_QUERY
+from compaction import count_tokens, fit_to_budget, tidy_prompt
+from kv_cache import KVCache
+import singleflight
+from singleflight import coalesce
 
 # Load Configuration
 try:
@@ -20,56 +33,328 @@ except ImportError:
     GOOGLE_API_KEY, SEARCH_ENGINE_ID, GEMINI_API_KEY = None, None, None
     REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USER_AGENT = None, None, None
 
-# Configure Gemini
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
+try:
+    from config import GEN_CACHE_TTL, GEN_CACHE_MAX_ENTRIES
+except ImportError:
+    GEN_CACHE_TTL, GEN_CACHE_MAX_ENTRIES = 30 * 24 * 3600, 5000
+
+try:
+    from config import SUMMARY_CONTEXT_TOKENS, IMPACT_CONTEXT_TOKENS, MITRA_CONTEXT_TOKENS
+except ImportError:
+    SUMMARY_CONTEXT_TOKENS, IMPACT_CONTEXT_TOKENS, MITRA_CONTEXT_TOKENS = 1000, 1000, 1500
+
+try:
+    from config import MITRA_HISTORY_TOKENS, COMPARE_DIFF_TOKENS
+except ImportError:
+    MITRA_HISTORY_TOKENS, COMPARE_DIFF_TOKENS = 600, 1500
+
+try:
+    from config import SCHEME_CACHE_TTL, SCHEME_CACHE_MAX_ENTRIES
+except ImportError:
+    SCHEME_CACHE_TTL, SCHEME_CACHE_MAX_ENTRIES = 24 * 3600, 5000
+
+try:
+    from config import FETCH_MAX_WORKERS, SOURCE_RACE_GRACE
+except ImportError:
+    FETCH_MAX_WORKERS, SOURCE_RACE_GRACE = 10, 1.5
+
+try:
+    from config import SCRAPE_MAX_HTML_BYTES, SCRAPE_MAX_PDF_BYTES
+except ImportError:
+    SCRAPE_MAX_HTML_BYTES, SCRAPE_MAX_PDF_BYTES = 5 * 1024 * 1024, 50 * 1024 * 1024
+
+# Preferred hosts when several candidate sources are readable, best first.
+OFFICIAL_DOMAINS = ('sansad.in', 'indiacode.nic.in', 'egazette.gov.in', 'gov.in', 'nic.in', 'prsindia.org')
+
+try:
+    from config import (
+        REDDIT_MAX_WORKERS, REDDIT_POSTS_PER_SEARCH, SENTIMENT_CACHE_TTL,
+        SENTIMENT_REFRESH_INTERVAL, SENTIMENT_TRENDING_MIN_HITS
+    )
+except ImportError:
+    REDDIT_MAX_WORKERS, REDDIT_POSTS_PER_SEARCH, SENTIMENT_CACHE_TTL = 6, 25, 3 * 3600
+    SENTIMENT_REFRESH_INTERVAL, SENTIMENT_TRENDING_MIN_HITS = 600, 3
+
+# Time a Reddit comments call is given to come back before its stage deadline.
+REDDIT_CALL_MARGIN = 3.0
 
+# Bounded pool for racing candidate sources.
+_fetch_executor = ThreadPoolExecutor(max_workers=FETCH_MAX_WORKERS, thread_name_prefix="fetch")
 
+# Fetches both versions of a bill for comparison; separate from _fetch_executor,
+# which each fetch uses for its own source race.
+_compare_executor = ThreadPoolExecutor(max_workers=FETCH_MAX_WORKERS, thread_name_prefix="compare")
+
+# Reddit comment expansion: bounded pool; governor.reddit holds the worker's shared rate limit.
+_reddit_executor = ThreadPoolExecutor(max_workers=REDDIT_MAX_WORKERS, thread_name_prefix="reddit")
+sentiment_cache = KVCache('sentiment', ttl=SENTIMENT_CACHE_TTL, max_entries=2000)
+_sentiment_hits = {}
+_sentiment_hits_lock = threading.Lock()
+_sentiment_refresher_started = False
+
+# Scheme recommendations are shared by every user with the same eligibility profile.
+scheme_cache = KVCache('schemes', ttl=SCHEME_CACHE_TTL, max_entries=SCHEME_CACHE_MAX_ENTRIES)
+# Profile fields that decide eligibility; anything else in the user doc is ignored.
+SCHEME_PROFILE_FIELDS = (
+    'state', 'occupation', 'category', 'sex', 'age', 'income',
+    'marital_status', 'is_only_girl_child', 'parental_status',
+)
+
+# Bump a template's version whenever its prompt wording changes so stale generations are not served.
+PROMPT_VERSIONS = {
+    'summary': 'v2',
+    'impact': 'v2',
+    'compare': 'v3',
+    'mitra': 'v3',
+}
+
+generation_cache = KVCache('generations', ttl=GEN_CACHE_TTL, max_entries=GEN_CACHE_MAX_ENTRIES)
+
+
+def _generation_key(model_name: str, template: str, inputs: tuple) -> str:
+    key_material = json.dumps([model_name, template, PROMPT_VERSIONS[template], *inputs], ensure_ascii=False)
+    return hashlib.sha256(key_material.encode('utf-8')).hexdigest()
+
+
+def _cached_generation(key: str, template: str):
+    try:
+        cached = generation_cache.get(key)
+    except Exception as e:
+        print(f"AGENT: Generation cache unavailable. Error: {e}")
+        return None
+    if cached is not None:
+        print(f"AGENT: Generation cache hit ({template}).")
+    return cached
+
+
+def _store_generation(key: str, text: str):
+    try:
+        generation_cache.set(key, text)
+    except Exception as e:
+        print(f"AGENT: Could not cache generation. Error: {e}")
+
+
+def _prepare_prompt(template: str, prompt: str) -> str:
+    """Strips the template indentation and records how many tokens are about to be sent."""
+    prompt = tidy_prompt(prompt)
+    tokens = count_tokens(prompt)
+    metrics.incr('llm_prompt_tokens_total', tokens, template=template)
+    print(f"AGENT: Sending {tokens} prompt tokens ({template}).")
+    return prompt
+
+
+def generate_cached(model_name: str, template: str, inputs: tuple, prompt: str, validate=None) -> str:
+    """
+    Calls Gemini, memoized on (model, prompt template version, prompt inputs).
+    `inputs` must hold exactly the (already truncated) values interpolated into
+    the prompt, language included. Errors propagate and are never cached, and
+    neither are responses rejected by the optional `validate` callable.
+    """
+    key = _generation_key(model_name, template, inputs)
+    cached = _cached_generation(key, template)
+    if cached is not None:
+        return cached
+
+    prompt = _prepare_prompt(template, prompt)
+    with metrics.span('gemini', template=template):
+        text = governor.gemini.call(get_gemini_model(model_name).generate_content, prompt).text
+    if validate and not validate(text):
+        return text
+    _store_generation(key, text)
+    return text
+
+
+def stream_cached(model_name: str, template: str, inputs: tuple, prompt: str):
+    """
+    Streaming counterpart of generate_cached: yields text as Gemini produces it.
+    A cached generation is yielded in one piece; a completed stream is cached.
+    """
+    key = _generation_key(model_name, template, inputs)
+    cached = _cached_generation(key, template)
+    if cached is not None:
+        yield cached
+        return
+
+    parts = []
+    prompt = _prepare_prompt(template, prompt)
+    with metrics.span('gemini', template=template):
+        for chunk in governor.gemini.stream(get_gemini_model(model_name).generate_content, prompt, stream=True):
+            text = chunk.text
+            if text:
+                parts.append(text)
+                yield text
+    _store_generation(key, "".join(parts))
+
+
+def _source_rank(url: str) -> int:
+    """Lower is better: official government hosts first, everything else after."""
+    host = urlparse(url).netloc.lower()
+    for rank, domain in enumerate(OFFICIAL_DOMAINS):
+        if host == domain or host.endswith('.' + domain):
+            return rank
+    return len(OFFICIAL_DOMAINS)
+
+
+def _scrape_source(source_url: str, cancelled: threading.Event) -> str:
+    """
+    Downloads and extracts one candidate source. Streams the body so a
+    losing candidate stops downloading as soon as the race is decided. The
+    body's first bytes and Content-Type decide between the PDF, HTML and
+    plain-text paths; HTML is parsed as it arrives and all are capped in size.
+    """
+    headers = {'User-Agent': 'Mozilla/5.0'}
+    fetched, kind = 0, 'unknown'
+    with metrics.span('scrape'):
+        try:
+            with get_http_session().get(source_url, headers=headers, timeout=20, stream=True) as response:
+                response.raise_for_status()
+                content_type = response.headers.get('Content-Type', '')
+                chunks = response.iter_content(chunk_size=64 * 1024)
+                first = next(chunks, b'')
+                kind = html_extract.sniff(content_type, first, source_url)
+                if kind == 'other':
+                    print(f"AGENT: Skipping {source_url}: unsupported content type '{content_type}'.")
+                    return ""
+
+                limit = SCRAPE_MAX_PDF_BYTES if kind == 'pdf' else SCRAPE_MAX_HTML_BYTES
+                declared = int(response.headers.get('Content-Length') or 0)
+                if kind == 'pdf' and declared > limit:
+                    print(f"AGENT: Skipping {source_url}: PDF of {declared} bytes is over the size limit.")
+                    return ""
+
+                # PDFs are spooled to disk so large documents never sit fully in memory.
+                if kind == 'pdf':
+                    sink = tempfile.NamedTemporaryFile(suffix='.pdf')
+                    write = sink.write
+                else:
+                    sink = nullcontext()
+                    if kind == 'text':
+                        extractor = html_extract.PlainTextReader(content_type)
+                    else:
+                        extractor = html_extract.HTMLExtractor(content_type)
+                    write = extractor.feed
+                with sink:
+                    for chunk in itertools.chain([first], chunks):
+                        if cancelled.is_set():
+                            return ""
+                        if fetched + len(chunk) > limit:
+                            if kind == 'pdf':
+                                # A truncated PDF can't be parsed.
+                                print(f"AGENT: Skipping {source_url}: PDF is over the size limit.")
+                                return ""
+                            # The main content of a page comes well before the cap.
+                            write(chunk[:limit - fetched])
+                            fetched = limit
+                            break
+                        write(chunk)
+                        fetched += len(chunk)
+
+                    if kind == 'pdf':
+                        sink.flush()
+                        return extract_pdf_text(sink.name)
+                    with metrics.span('html_parse'):
+                        return extractor.close()
+        finally:
+            metrics.incr('fetched_bytes_total', fetched, kind=kind)
+
+
+def _race_sources(source_urls):
+    """
+    Fetches all candidates concurrently and returns (url, text) for the best
+    readable one, or (None, None). Once a readable source finishes we wait a
+    short grace period for a better-ranked (official) source before deciding,
+    then cancel the rest.
+    """
+    cancelled = threading.Event()
+    futures = {metrics.submit(_fetch_executor, _scrape_source, url, cancelled): (i, url) for i, url in enumerate(source_urls)}
+    readable = []
+    decide_by = None
+    pending = set(futures)
+    try:
+        while pending:
+            timeout = None if decide_by is None else max(0, decide_by - time.monotonic())
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                i, url = futures[future]
+                try:
+                    text = future.result()
+                except Exception as e:
+                    print(f"AGENT: FAILED to process source {url}. Error: {e}")
+                    continue
+                if text and len(text) > 100:
+                    print(f"AGENT: Readable text from source {i+1} -> {url}")
+                    readable.append((_source_rank(url), i, url, text))
+                else:
+                    print(f"AGENT: Source {url} was accessible, but contained no readable text.")
+
+            if readable:
+                best_rank = min(r[0] for r in readable)
+                pending_ranks = [_source_rank(futures[f][1]) for f in pending]
+                # Nothing still running can beat what we have: stop now.
+                if not pending_ranks or best_rank <= min(pending_ranks):
+                    break
+                if decide_by is None:
+                    decide_by = time.monotonic() + SOURCE_RACE_GRACE
+                elif time.monotonic() >= decide_by:
+                    break
+    finally:
+        cancelled.set()
+        for future in pending:
+            future.cancel()
+
+    if not readable:
+        return None, None
+    _, _, url, text = min(readable)
+    return url, text
+
+
+def _bill_key(bill_name, *extra):
+    """Single-flight key: callers asking about the same bill share one computation."""
+    return "|".join([bill_cache.normalize_bill_name(bill_name), *map(str, extra)])
+
+
+def _cached_bill_text(bill_name: str):
+    cached = bill_cache.get(bill_name)
+    if cached:
+        print(f"AGENT: Cache hit for '{bill_name}' -> {cached['url']}")
+    return cached
+
+
+@metrics.timed('step_bill_text')
+@coalesce('bill_text', _bill_key, cached=_cached_bill_text)
 def get_bill_text_from_web(bill_name: str):
     """
     AGENT STEP 1: Finds and scrapes the text of a bill using Google Search API.
     """
+    #Stored by a leader that finished after our lookup; that lookup was already counted
+    cached = bill_cache.get(bill_name, track=False)
+    if cached:
+        return cached
+
     print(f"AGENT: Starting resilient search for '{bill_name}'...")
     if not GOOGLE_API_KEY or not SEARCH_ENGINE_ID:
         return {'error': "Google API keys are not configured."}
     
     try:
-        service = build("customsearch", "v1", developerKey=GOOGLE_API_KEY, static_discovery=False)
+        service = get_search_service()
         query = bill_name
-        res = service.cse().list(q=query, cx=SEARCH_ENGINE_ID, num=5).execute()
+        with metrics.span('cse', purpose='bill_text'):
+            res = governor.cse.call(service.cse().list(q=query, cx=SEARCH_ENGINE_ID, num=5).execute)
 
         if 'items' not in res or not res['items']:
             return {'error': "Sorry, no search results were found for this bill."}
         
-        for i, item in enumerate(res['items']):
-            source_url = item['link']
-            print(f"\nAGENT: Attempt {i+1}: Trying source -> {source_url}")
+        source_urls = [item['link'] for item in res['items']]
+        print(f"AGENT: Racing {len(source_urls)} candidate sources...")
+        source_url, scraped_text = _race_sources(source_urls)
 
+        if source_url:
+            print(f"AGENT: SUCCESS! Found readable text from {source_url}")
             try:
-                headers = {'User-Agent': 'Mozilla/5.0'}
-                response = requests.get(source_url, headers=headers, timeout=20)
-                response.raise_for_status()
-                
-                scraped_text = ""
-                if source_url.lower().endswith('.pdf'):
-                    pdf_file = BytesIO(response.content)
-                    pdf_reader = PyPDF2.PdfReader(pdf_file)
-                    for page in pdf_reader.pages:
-                        scraped_text += page.extract_text() or ""
-                else:
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    paragraphs = soup.find_all('p')
-                    if paragraphs:
-                        scraped_text = ' '.join(p.get_text() for p in paragraphs)
-                
-                if scraped_text and len(scraped_text) > 100:
-                    print(f"AGENT: SUCCESS! Found readable text from {source_url}")
-                    return {'text': scraped_text, 'url': source_url, 'error': None}
-                else:
-                    print("AGENT: Source was accessible, but contained no readable text.")
-
+                bill_cache.put(bill_name, source_url, scraped_text)
             except Exception as e:
-                print(f"AGENT: FAILED to process source. Error: {e}")
+                print(f"AGENT: Could not cache bill text. Error: {e}")
+            return {'text': scraped_text, 'url': source_url, 'error': None}
         
         return {'error': "Could not find and access a readable source after trying multiple links."}
 
@@ -78,14 +363,7 @@ def get_bill_text_from_web(bill_name: str):
         return {'error': f"A critical error occurred with the Google Search API: {e}"}
 
 
-def generate_detailed_summary(bill_text: str, bill_name: str, language: str) -> str:
-    """
-    AGENT STEP 2: Sends text to Gemini for a detailed summary in English or Hinglish.
-    """
-    print(f"AGENT: Sending text to Gemini for summarization in {language}...")
-    if not GEMINI_API_KEY:
-        return "Error: Gemini API key is not configured."
-    
+def _summary_prompt(bill_text: str, bill_name: str, language: str):
     if language == 'Hinglish':
         language_instruction = "create a clear, detailed summary in simple Hinglish for the common citizen."
         heading1 = "### Yeh Kis Par Laagu Hota Hai?"
@@ -95,11 +373,11 @@ def generate_detailed_summary(bill_text: str, bill_name: str, language: str) ->
         heading1 = "### Who Does It Apply To?"
         heading2 = "### What Is This Bill?"
 
-    model = genai.GenerativeModel('gemini-2.5-flash')
+    bill_excerpt = select_context(bill_text, f"{bill_name} {SUMMARY_QUERY}", SUMMARY_CONTEXT_TOKENS)
     prompt = f"""
     You are an expert policy analyst named 'Sarkari Sanket'. Your task is to analyze the provided text of a government bill and {language_instruction}
     The bill name is: "{bill_name}"
-    The bill text is: "{bill_text[:4000]}"
+    The bill text is: "{bill_excerpt}"
     Your summary MUST be structured into exactly two sections with the following markdown headings:
     {heading1}
     (In this section, clearly explain the people, groups, or industries affected by this bill. Be specific.)
@@ -107,23 +385,58 @@ def generate_detailed_summary(bill_text: str, bill_name: str, language: str) ->
     (In this section, explain the main purpose, key features, and the most important changes this bill introduces. Use simple language.)
     Generate the response now.
     """
+    return (bill_name, bill_excerpt, language), prompt
+
+
+# Summary steps report failures to the user in the text itself rather than raising.
+SUMMARY_KEY_MISSING = "Error: Gemini API key is not configured."
+SUMMARY_FAILED = "Sorry, an error occurred while generating the summary"
+
+
+def is_failed_summary(summary) -> bool:
+    """True for an empty summary or one of the failure messages below."""
+    return not summary or summary.startswith((SUMMARY_KEY_MISSING, SUMMARY_FAILED))
+
+
+@coalesce('summary')
+def generate_detailed_summary(bill_text: str, bill_name: str, language: str) -> str:
+    """
+    AGENT STEP 2: Sends text to Gemini for a detailed summary in English or Hinglish.
+    """
+    print(f"AGENT: Sending text to Gemini for summarization in {language}...")
+    if not GEMINI_API_KEY:
+        return SUMMARY_KEY_MISSING
+
+    inputs, prompt = _summary_prompt(bill_text, bill_name, language)
     try:
-        response = model.generate_content(prompt)
+        summary = generate_cached('gemini-2.5-flash', 'summary', inputs, prompt)
         print("AGENT: Successfully received summary from Gemini.")
-        return response.text
+        return summary
+    except governor.DeadlineError:
+        # Out of this caller's time, not a failed summary: nothing to share with other callers.
+        raise
     except Exception as e:
         print(f"AGENT ERROR (Gemini API): {e}")
-        return f"Sorry, an error occurred while generating the summary: {e}"
+        return f"{SUMMARY_FAILED}: {e}"
 
 
-def get_social_media_sentiment(bill_name: str) -> dict:
-    """
-    AGENT STEP 3: Gathers and analyzes sentiment from Reddit.
-    """
-    print(f"AGENT: Starting sentiment analysis for '{bill_name}'...")
-    if not all([REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USER_AGENT]):
-        return {'error': "Reddit API keys are not fully configured."}
+def stream_detailed_summary(bill_text: str, bill_name: str, language: str):
+    """AGENT STEP 2 (streaming): Yields the summary as Gemini generates it."""
+    print(f"AGENT: Streaming summary from Gemini in {language}...")
+    if not GEMINI_API_KEY:
+        yield SUMMARY_KEY_MISSING
+        return
+
+    inputs, prompt = _summary_prompt(bill_text, bill_name, language)
+    try:
+        yield from stream_cached('gemini-2.5-flash', 'summary', inputs, prompt)
+    except Exception as e:
+        print(f"AGENT ERROR (Gemini API): {e}")
+        yield f"{SUMMARY_FAILED}: {e}"
+
 
+def _reddit_time_filter(bill_name: str):
+    """Returns (time_filter, note). A note means sentiment should not be fetched at all."""
     time_period = 'year'
     try:
         year_match = re.search(r'\b(19\d{2}|20\d{2})\b', bill_name)
@@ -133,7 +446,7 @@ def get_social_media_sentiment(bill_name: str) -> dict:
             
             if bill_year < 2020:
                 print(f"AGENT: Bill year ({bill_year}) is before 2020. Skipping sentiment analysis.")
-                return {'note': "Sentiment analysis is not available for bills before 2020."}
+                return None, {'note': "Sentiment analysis is not available for bills before 2020."}
             
             if bill_year < current_year:
                 time_period = 'all'
@@ -141,70 +454,171 @@ def get_social_media_sentiment(bill_name: str) -> dict:
 
     except Exception:
         pass 
+    return time_period, None
+
+
+def _load_top_comments(post_id: str):
+    submission = get_reddit().submission(id=post_id)
+    submission.comments.replace_more(limit=0)
+    return [comment.body for comment in submission.comments.list()[:5]]
+
+
+def _fetch_post_texts(post_id: str, title: str):
+    """Title plus top comments of one submission, fetched on this thread's Reddit client."""
+    with metrics.span('reddit_comments'):
+        return [title] + governor.reddit.call(_load_top_comments, post_id)
 
+
+def _compute_sentiment(bill_name: str, time_period: str):
+    """Returns (result, complete); a result missing some posts' comments is not complete."""
     try:
-        reddit = praw.Reddit(
-            client_id=REDDIT_CLIENT_ID,
-            client_secret=REDDIT_CLIENT_SECRET,
-            user_agent=REDDIT_USER_AGENT,
-        )
+        reddit = get_reddit()
         
         print(f"AGENT: Searching Reddit with time_filter='{time_period}'...")
         subreddit = reddit.subreddit("india+unitedstatesofindia+indiaspeaks")
-        submissions = subreddit.search(bill_name, sort='relevance', time_filter=time_period, limit=25)
-        
-        comments_and_titles = []
-        for post in submissions:
-            comments_and_titles.append(post.title)
-            post.comments.replace_more(limit=0)
-            for comment in post.comments.list()[:5]:
-                comments_and_titles.append(comment.body)
+        with metrics.span('reddit_search'):
+            submissions = governor.reddit.call(
+                lambda: list(subreddit.search(bill_name, sort='relevance', time_filter=time_period, limit=REDDIT_POSTS_PER_SEARCH))
+            )
+
+        # One comment round trip per post, spread over a bounded, rate-limited pool.
+        # Under a stage deadline, comment calls must start early enough to return
+        # in time; posts whose turn comes later fall back to their title.
+        left = governor.time_left()
+        comments_deadline = time.monotonic() + max(0.0, left - REDDIT_CALL_MARGIN) if left is not None else float('inf')
+        comments_and_titles, skipped = [], 0
+        with governor.deadline(comments_deadline):
+            futures = [metrics.submit(_reddit_executor, _fetch_post_texts, post.id, post.title) for post in submissions]
+        for post, future in zip(submissions, futures):
+            try:
+                comments_and_titles.extend(future.result())
+            except governor.DeadlineError as e:
+                if governor.abandoned():
+                    # The stage was given up on; don't score (or cache) a titles-only result.
+                    for pending in futures:
+                        pending.cancel()
+                    raise
+                print(f"AGENT: Skipping comments for post {post.id}. {e}")
+                comments_and_titles.append(post.title)
+                skipped += 1
+            except Exception as e:
+                print(f"AGENT: Could not load comments for post {post.id}. Error: {e}")
+                comments_and_titles.append(post.title)
 
         if not comments_and_titles:
             print("AGENT: No relevant Reddit posts found.")
-            return {'note': "No relevant posts found on Reddit for this bill."}
+            return {'note': "No relevant posts found on Reddit for this bill."}, True
         
         print(f"AGENT: Found {len(comments_and_titles)} posts and comments to analyze.")
-        positive, negative, neutral = 0, 0, 0
-        for text in comments_and_titles:
-            analysis = TextBlob(text)
-            if analysis.sentiment.polarity > 0.1:
-                positive += 1
-            elif analysis.sentiment.polarity < -0.1:
-                negative += 1
-            else:
-                neutral += 1
-        
-        total = len(comments_and_titles)
-        result = {
-            'positive': round((positive / total) * 100),
-            'negative': round((negative / total) * 100),
-            'neutral': round((neutral / total) * 100)
-        }
+        with metrics.span('sentiment_score'):
+            from sentiment import get_sentiment_engine
+            batch = get_sentiment_engine().score_batch(comments_and_titles)
+        result = batch.buckets()
+        result['confidence'] = round(float(batch.confidence.mean()), 2)
         print(f"AGENT: Sentiment analysis complete. Result: {result}")
-        return result
+        return result, not skipped
 
+    except governor.DeadlineError as e:
+        print(f"AGENT: Sentiment analysis abandoned. {e}")
+        raise
     except Exception as e:
         print(f"AGENT ERROR (Reddit API): {e}")
-        return {'error': f"Could not fetch data from Reddit. Please check your API keys."}
+        return {'error': f"Could not fetch data from Reddit. Please check your API keys."}, False
 
 
-def compare_bills(bill_name, older_year, language):
-    """AGENT STEP 4: Simplified comparison of two bill versions."""
-    new_data = get_bill_text_from_web(bill_name)
-    old_data = get_bill_text_from_web(f"{bill_name} {older_year}")
-    
-    if "error" in new_data or "error" in old_data:
-        return "Error: Could not find both versions of the bill for comparison."
+@coalesce('sentiment', lambda cache_key, *_: cache_key)
+def _refresh_sentiment(cache_key: str, bill_name: str, time_period: str) -> dict:
+    result, complete = _compute_sentiment(bill_name, time_period)
+    # Incomplete results (titles only under a deadline, or an error) go to this
+    # caller once; they are neither cached nor handed to callers that joined it.
+    if complete:
+        try:
+            sentiment_cache.set(cache_key, {'result': result, 'computed_at': time.time(),
+                                            'bill_name': bill_name, 'time_period': time_period})
+        except Exception as e:
+            print(f"AGENT: Could not cache sentiment. Error: {e}")
+    else:
+        singleflight.keep_private()
+    return result
+
+
+def _sentiment_refresher():
+    """Keeps trending bills' sentiment warm: recomputes popular entries before they expire."""
+    while True:
+        time.sleep(SENTIMENT_REFRESH_INTERVAL)
+        with _sentiment_hits_lock:
+            trending = [key for key, hits in _sentiment_hits.items() if hits >= SENTIMENT_TRENDING_MIN_HITS]
+            _sentiment_hits.clear()
+        for key in trending:
+            try:
+                entry = sentiment_cache.get(key)
+                if entry and time.time() - entry['computed_at'] > SENTIMENT_CACHE_TTL - 2 * SENTIMENT_REFRESH_INTERVAL:
+                    print(f"AGENT: Refreshing trending sentiment for '{entry['bill_name']}'...")
+                    _refresh_sentiment(key, entry['bill_name'], entry['time_period'])
+            except Exception as e:
+                print(f"AGENT: Sentiment refresh failed. Error: {e}")
+
+
+def _start_sentiment_refresher():
+    global _sentiment_refresher_started
+    with _sentiment_hits_lock:
+        if _sentiment_refresher_started:
+            return
+        _sentiment_refresher_started = True
+    threading.Thread(target=_sentiment_refresher, name="sentiment-refresh", daemon=True).start()
+
+
+def get_social_media_sentiment(bill_name: str) -> dict:
+    """
+    AGENT STEP 3: Gathers and analyzes sentiment from Reddit.
+    Results are cached per (normalized bill name, time filter).
+    """
+    print(f"AGENT: Starting sentiment analysis for '{bill_name}'...")
+    if not all([REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USER_AGENT]):
+        return {'error': "Reddit API keys are not fully configured."}
+
+    time_period, note = _reddit_time_filter(bill_name)
+    if note:
+        return note
+
+    cache_key = f"{bill_cache.normalize_bill_name(bill_name)}|{time_period}"
+    _start_sentiment_refresher()
+    with _sentiment_hits_lock:
+        _sentiment_hits[cache_key] = _sentiment_hits.get(cache_key, 0) + 1
+
+    try:
+        entry = sentiment_cache.get(cache_key)
+    except Exception as e:
+        print(f"AGENT: Sentiment cache unavailable. Error: {e}")
+        entry = None
+    if entry:
+        print(f"AGENT: Sentiment cache hit for '{bill_name}'.")
+        return entry['result']
+
+    return _refresh_sentiment(cache_key, bill_name, time_period)
 
-    new_text = new_data.get('text', '')
-    old_text = old_data.get('text', '')
 
-    model = genai.GenerativeModel("gemini-2.5-flash")
+def _compare_prompt(bill_name, older_year, language):
+    """Returns (inputs, prompt), or (None, message) if there is nothing to send to Gemini."""
+    # Both versions are fetched at once; each lookup races its own sources.
+    new_future = metrics.submit(_compare_executor, get_bill_text_from_web, bill_name)
+    old_future = metrics.submit(_compare_executor, get_bill_text_from_web, f"{bill_name} {older_year}")
+    new_data, old_data = new_future.result(), old_future.result()
+
+    if new_data.get('error') or old_data.get('error'):
+        return None, "Error: Could not find both versions of the bill for comparison."
+
+    with metrics.span('bill_diff'):
+        changes = bill_diff.diff_sections(old_data.get('text', ''), new_data.get('text', ''))
+        changed_sections = bill_diff.render_changes(changes, COMPARE_DIFF_TOKENS)
+    print(f"AGENT: {len(changes)} sections differ between the two versions.")
+    if not changes:
+        return None, "No differences were found between the two versions of this bill."
+
     prompt = f"""
     Compare these bills simply. 
-    NEW: {new_text[:2500]}
-    OLD: {old_text[:2500]}
+    Only the sections that differ between the OLD and NEW versions are listed:
+    {changed_sections}
     
     CRITICAL: Be extremely brief for a citizen. Max 3 bullets per heading. 
     Each bullet point MUST be under 15 words. Avoid legal jargon.
@@ -213,16 +627,102 @@ def compare_bills(bill_name, older_year, language):
     ### Major Changes
     Answer in {language}.
     """
-    try: return model.generate_content(prompt).text
+    return (changed_sections, language), prompt
+
+
+@metrics.timed('step_compare')
+@coalesce('compare', _bill_key)
+def compare_bills(bill_name, older_year, language):
+    """AGENT STEP 4: Simplified comparison of two bill versions."""
+    inputs, prompt = _compare_prompt(bill_name, older_year, language)
+    if inputs is None:
+        return prompt
+    try: return generate_cached("gemini-2.5-flash", 'compare', inputs, prompt)
     except Exception as e: return str(e)
 
+
+def stream_compare_bills(bill_name, older_year, language):
+    """AGENT STEP 4 (streaming): Yields the comparison as Gemini generates it."""
+    inputs, prompt = _compare_prompt(bill_name, older_year, language)
+    if inputs is None:
+        yield prompt
+        return
+    try: yield from stream_cached("gemini-2.5-flash", 'compare', inputs, prompt)
+    except Exception as e: yield str(e)
+
+def profile_fingerprint(profile: dict) -> str:
+    """
+    Canonical hash of the eligibility-relevant profile fields. Age and income
+    are kept exact (only their formatting is normalized): scheme limits fall
+    anywhere, so two different values can qualify for different schemes.
+    """
+    canonical = {field: schemes_index.normalize_term(profile.get(field) or '') for field in SCHEME_PROFILE_FIELDS}
+    canonical['age'] = schemes_index.normalize_number(profile.get('age'))
+    canonical['income'] = schemes_index.normalize_number(profile.get('income'))
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _scheme_cache_key(profile: dict) -> str:
+    # Re-ingesting the catalogue retires every cached recommendation.
+    return f"{profile_fingerprint(profile)}|{schemes_index.catalogue_version()}"
+
+
+def invalidate_scheme_recommendations(profile: dict):
+    """Drops the cached recommendations for the fingerprint this profile maps to."""
+    try:
+        scheme_cache.delete(_scheme_cache_key(profile))
+    except Exception as e:
+        print(f"AGENT: Could not invalidate scheme cache. Error: {e}")
+
+
+@metrics.timed('step_schemes')
 def find_matching_schemes(profile: dict) -> dict:
     """
     AGENT STEP 5: Takes a user profile and finds matching government schemes.
+    Results are cached per profile fingerprint and shared across users.
+    """
+    try:
+        cache_key = _scheme_cache_key(profile)
+        cached = scheme_cache.get(cache_key)
+    except Exception as e:
+        print(f"AGENT: Scheme cache unavailable. Error: {e}")
+        cache_key, cached = None, None
+    if cached:
+        print("AGENT: Scheme cache hit.")
+        return cached
+
+    result = _match_schemes(profile)
+    if cache_key and not result.get('error'):
+        try:
+            scheme_cache.set(cache_key, result)
+        except Exception as e:
+            print(f"AGENT: Could not cache schemes. Error: {e}")
+    return result
+
+
+@coalesce('schemes', profile_fingerprint)
+def _match_schemes(profile: dict) -> dict:
+    """
+    Uncached scheme search behind find_matching_schemes.
     Enhanced to handle all 9+ profile fields and provide terminal debugging.
+    Checks the local scheme catalogue first; search + Gemini only run on a miss.
     """
     print(f"\nAGENT: --- STARTING SCHEME SEARCH ---")
     print(f"AGENT: Input Profile: {profile}")
+
+    # The local catalogue answers most profiles without any remote call
+    try:
+        local_matches = schemes_index.match_profile(profile)
+    except Exception as e:
+        print(f"AGENT: Scheme catalogue unavailable. Error: {e}")
+        local_matches = []
+    if local_matches:
+        print(f"AGENT: Matched {len(local_matches)} schemes from the local catalogue.")
+        return {
+            "schemes": json.dumps(local_matches),
+            "sources": [s['link'] for s in local_matches]
+        }
+    print("AGENT: No catalogue match, falling back to search.")
     
     if not all([GOOGLE_API_KEY, SEARCH_ENGINE_ID, GEMINI_API_KEY]):
         print("AGENT ERROR: Configuration keys missing in agent.py")
@@ -259,13 +759,14 @@ def find_matching_schemes(profile: dict) -> dict:
     print(f"AGENT: Final Search Query: {query}")
 
     try:
-        service = build("customsearch", "v1", developerKey=GOOGLE_API_KEY, static_discovery=False)
+        service = get_search_service()
         
         # Restricting search to official gov domains for better quality
         search_query = f"{query} -filetype:pdf (site:gov.in OR site:nic.in OR site:myScheme.gov.in)"
         print(f"AGENT: Executing Google CSE Search: {search_query}")
         
-        res = service.cse().list(q=search_query, cx=SEARCH_ENGINE_ID, num=5).execute()
+        with metrics.span('cse', purpose='schemes'):
+            res = governor.cse.call(service.cse().list(q=search_query, cx=SEARCH_ENGINE_ID, num=5).execute)
         
         if 'items' not in res or not res['items']:
             print("AGENT WARNING: Google CSE returned ZERO results.")
@@ -282,7 +783,7 @@ def find_matching_schemes(profile: dict) -> dict:
             })
         
         # Using the model name you confirmed works
-        model = genai.GenerativeModel('gemini-2.5-flash-lite')
+        model = get_gemini_model('gemini-2.5-flash-lite')
         
         prompt = f"""
         You are an AI assistant helping a citizen find government schemes. 
@@ -292,7 +793,7 @@ def find_matching_schemes(profile: dict) -> dict:
         {profile}
 
         GOOGLE SEARCH RESULTS:
-        {json.dumps(google_results, indent=2)}
+        {json.dumps(google_results, ensure_ascii=False)}
 
         TASK: 
         Find the top 3 schemes from the search results that are a direct match for this user.
@@ -308,7 +809,9 @@ def find_matching_schemes(profile: dict) -> dict:
         3. If NO schemes match, return an empty list: [].
         """
         
-        response = model.generate_content(prompt)
+        prompt = _prepare_prompt('schemes', prompt)
+        with metrics.span('gemini', template='schemes'):
+            response = governor.gemini.call(model.generate_content, prompt)
         print("AGENT: Gemini analysis complete.")
         
         # Clean the response text for JSON parsing
@@ -333,32 +836,66 @@ def find_matching_schemes(profile: dict) -> dict:
         return {'error': f"A critical error occurred while searching: {str(e)}"}
 
 
-def ask_sarkari_mitra(bill_text, query, language):
-    """
-    AGENT STEP 6: Context-aware AI chatbot assistant (Sarkari Mitra).
-    """
-    print(f"AGENT: Sarkari Mitra processing query in {language}...")
-    if not GEMINI_API_KEY:
-        return "Error: Gemini API key is not configured."
-
-    model = genai.GenerativeModel('gemini-2.5-flash')
-    
+def _mitra_prompt(bill_text, query, language, history):
+    history = history or []
+    # Follow-ups like "what about farmers?" retrieve better with the previous question included.
+    retrieval_query = f"{history[-1]['query']} {query}" if history else query
+    bill_excerpt = select_context(bill_text, retrieval_query, MITRA_CONTEXT_TOKENS)
+    # Keep the most recent turns that fit the history budget.
+    turns = []
+    for turn in reversed(history):
+        candidate = [f"User: {turn['query']}\nMitra: {turn['answer']}"] + turns
+        if count_tokens("\n".join(candidate)) > MITRA_HISTORY_TOKENS:
+            if not turns:
+                turns = [fit_to_budget(candidate[0], MITRA_HISTORY_TOKENS)]
+            break
+        turns = candidate
+    conversation = "\n".join(turns)
     prompt = f"""
     You are 'Sarkari Mitra', a helpful policy assistant. 
-    Context (Bill Text): {bill_text[:6000]} 
+    Context (Bill Text): {bill_excerpt} 
+    Conversation So Far: {conversation or "None"}
     User Question: {query}
     Provide a helpful, concise answer in {language}. 
     If the question is unrelated to the bill, politely guide them back.
     """
+    return (bill_excerpt, conversation, query, language), prompt
+
+
+@metrics.timed('step_chat')
+def ask_sarkari_mitra(bill_text, query, language, history=None):
+    """
+    AGENT STEP 6: Context-aware AI chatbot assistant (Sarkari Mitra).
+    `history` holds earlier {'query', 'answer'} turns about the same bill.
+    """
+    print(f"AGENT: Sarkari Mitra processing query in {language}...")
+    if not GEMINI_API_KEY:
+        return "Error: Gemini API key is not configured."
 
+    inputs, prompt = _mitra_prompt(bill_text, query, language, history)
     try:
-        response = model.generate_content(prompt)
-        return response.text
+        return generate_cached('gemini-2.5-flash', 'mitra', inputs, prompt)
     except Exception as e:
         print(f"AGENT ERROR (Sarkari Mitra): {e}")
         return f"Sorry, I encountered an error: {e}"
 
 
+def stream_sarkari_mitra(bill_text, query, language, history=None):
+    """AGENT STEP 6 (streaming): Yields Sarkari Mitra's answer as Gemini generates it."""
+    print(f"AGENT: Sarkari Mitra streaming answer in {language}...")
+    if not GEMINI_API_KEY:
+        yield "Error: Gemini API key is not configured."
+        return
+
+    inputs, prompt = _mitra_prompt(bill_text, query, language, history)
+    try:
+        yield from stream_cached('gemini-2.5-flash', 'mitra', inputs, prompt)
+    except Exception as e:
+        print(f"AGENT ERROR (Sarkari Mitra): {e}")
+        yield f"Sorry, I encountered an error: {e}"
+
+
+@coalesce('impact')
 def calculate_impact_scores(bill_text):
     """
     AGENT STEP 7: DYNAMIC Demographic-specific impact scorer.
@@ -368,10 +905,9 @@ def calculate_impact_scores(bill_text):
     if not GEMINI_API_KEY:
         return {}
 
-    model = genai.GenerativeModel('gemini-2.5-flash')
-    
+    bill_excerpt = select_context(bill_text, IMPACT_QUERY, IMPACT_CONTEXT_TOKENS)
     prompt = f"""
-    Analyze this bill text: {bill_text[:4000]}
+    Analyze this bill text: {bill_excerpt}
     
     TASK:
     1. Identify the 4 specific demographic groups or citizen categories most affected by this bill (e.g., 'Freelancers', 'Industrial Workers', 'Rural Women', 'Startups', etc.).
@@ -386,17 +922,28 @@ def calculate_impact_scores(bill_text):
         "Group_Name_2": {{"score": Y, "reason": "..."}}
     }}
     """
-    try:
-        response = model.generate_content(prompt)
+    def clean(text):
         # Clean JSON from markdown tags
-        clean_json = response.text.strip().replace('```json', '').replace('```', '')
-        raw_scores = json.loads(clean_json)
+        return text.strip().replace('```json', '').replace('```', '')
+
+    def is_valid(text):
+        try:
+            return isinstance(json.loads(clean(text)), dict)
+        except ValueError:
+            return False
+
+    try:
+        response_text = generate_cached('gemini-2.5-flash', 'impact', (bill_excerpt,), prompt, validate=is_valid)
+        raw_scores = json.loads(clean(response_text))
         
         return {k: v for k, v in raw_scores.items() if v['score'] > 20}
+    except governor.DeadlineError:
+        raise
     except Exception as e:
         print(f"AGENT ERROR (Impact Scorer): {e}")
         return {}
 
+@coalesce('news', _bill_key)
 def get_bill_news(bill_name):
     """
     AGENT STEP 8: Real-time news aggregator for the viewed bill.
@@ -406,9 +953,12 @@ def get_bill_news(bill_name):
         return []
 
     try:
-        service = build("customsearch", "v1", developerKey=GOOGLE_API_KEY)
+        service = get_search_service()
         # Query specifically for news/press releases
-        res = service.cse().list(q=f"{bill_name} latest news press releases India", cx=SEARCH_ENGINE_ID, num=3).execute()
+        with metrics.span('cse', purpose='news'):
+            res = governor.cse.call(
+                service.cse().list(q=f"{bill_name} latest news press releases India", cx=SEARCH_ENGINE_ID, num=3).execute
+            )
         news_items = []
         if 'items' in res:
             for item in res['items']:
@@ -418,6 +968,8 @@ def get_bill_news(bill_name):
                     'snippet': item['snippet']
                 })
         return news_items
+    except governor.DeadlineError:
+        raise
     except Exception as e:
         print(f"AGENT ERROR (News Aggregator): {e}")
         return []
\ No newline at end of file
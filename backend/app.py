@@ -1,39 +1,49 @@
-from flask import Flask, request, jsonify
+import time
+#Boot time is measured from here so it covers every import below
+_boot_started = time.perf_counter()
+
+from flask import Flask, Response, request, jsonify, stream_with_context, g
 from flask_cors import CORS
 from agent import (
     get_bill_text_from_web, 
-    generate_detailed_summary, 
-    get_social_media_sentiment, 
     compare_bills, 
+    stream_compare_bills,
     find_matching_schemes,
+    invalidate_scheme_recommendations,
     ask_sarkari_mitra,
-    calculate_impact_scores,
-    get_bill_news
+    stream_sarkari_mitra
 )
-import PyPDF2
-from io import BytesIO
-import firebase_admin
-from firebase_admin import credentials, auth, firestore
+from pipeline import build_analysis_stages, run_stages, iter_stages
+from pdf_text import extract_pdf_text
+import sessions
+import jobs
+import auth_cache
+import history
+import metrics
+import singleflight
+import bill_cache
+import schemes_index
+import batch_analysis
+import governor
+import warmup
+from storage import cache_path
+from bill_cache import normalize_bill_name
+from kv_cache import KVCache
+from clients import get_firebase_auth, get_firestore
 import os
+import json
+import uuid
+import hashlib
 import traceback
 
-
 try:
-    key_path = "backend/firebase-key.json"
-    if not os.path.exists(key_path):
-        key_path = "firebase-key.json"
-    
-    if os.path.exists(key_path):
-        cred = credentials.Certificate(key_path)
-        firebase_admin.initialize_app(cred)
-        db = firestore.client()
-        print("AGENT: Firebase connected successfully.")
-    else:
-        print("AGENT CRITICAL WARNING: 'firebase-key.json' not found. DB features will fail.")
-        db = None
-except Exception as e:
-    print(f"AGENT ERROR: Firebase initialization error: {e}")
-    db = None
+    from config import METRICS_TOKEN, ADMIN_TOKEN
+except ImportError:
+    METRICS_TOKEN, ADMIN_TOKEN = None, None
+
+
+#Firebase is initialized on the first request that needs it
+history.init(get_firestore)
 
 app = Flask(__name__)
 
@@ -51,6 +61,39 @@ CORS(app, resources={
     }
 })
 
+#Cache and coalescing counters exported on /metrics at scrape time
+metrics.register_collector('bill_cache', bill_cache.stats)
+metrics.register_collector('kv_cache', KVCache.all_stats)
+metrics.register_collector('singleflight', singleflight.stats)
+metrics.register_collector('auth_cache', auth_cache.stats)
+metrics.register_collector('history', history.stats)
+metrics.register_collector('schemes_index', schemes_index.stats)
+metrics.register_collector('batch_analysis', batch_analysis.stats)
+metrics.register_collector('governor', governor.stats)
+metrics.register_collector('warmup', warmup.stats)
+
+
+@app.before_request
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    g.metrics_token = metrics.start_request()
+
+
+@app.after_request
+def finish_request_metrics(response):
+    token = g.pop('metrics_token', None)
+    if token is None:
+        return response
+    server_timing = metrics.end_request(token)
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics.observe('http_request_seconds', time.perf_counter() - g.request_started,
+                    endpoint=endpoint, status=response.status_code)
+    #Streaming responses only report the work done before the stream started
+    if metrics.METRICS_SERVER_TIMING and server_timing:
+        response.headers['Server-Timing'] = server_timing
+    return response
+
+
 # Helper function to verify token
 def get_user_from_token(request):
     id_token = request.headers.get('Authorization')
@@ -59,7 +102,8 @@ def get_user_from_token(request):
     if id_token.startswith('Bearer '):
         id_token = id_token.split('Bearer ')[1]
     try:
-        decoded_token = auth.verify_id_token(id_token)
+        #Verified claims are cached until the token expires
+        decoded_token = auth_cache.verify(id_token)
         return decoded_token
     except Exception as e:
         print(f"AGENT: Error verifying token: {e}")
@@ -74,9 +118,12 @@ def register():
     password = data.get('password')
     if not email or not password:
         return jsonify({'error': 'Email and password are required.'}), 400
+    auth = get_firebase_auth()
     try:
         user = auth.create_user(email=email, password=password)
+        db = get_firestore()
         if db:
+            from firebase_admin import firestore
             user_ref = db.collection('users').document(user.uid)
             user_ref.set({
                 'email': user.email,
@@ -91,88 +138,373 @@ def register():
 
 
 
+def resolve_bill_text(bill_name, pdf_source=None, filename=None):
+    """
+    Resolves bill text from a PDF (path or stream) or, failing that, a bill name.
+    Returns (bill_text, source_url, bill_name_for_analysis, error, status_code).
+    """
+    bill_text, source_url, bill_name_for_analysis = "", "", bill_name
+
+    # Text extraction
+    if pdf_source is not None:
+        try:
+            bill_text = extract_pdf_text(pdf_source)
+            source_url = f"Uploaded File: {filename}"
+            if not bill_name_for_analysis:
+                bill_name_for_analysis = filename.replace('.pdf', '').replace('_', ' ')
+        except Exception as e:
+            return None, None, None, {'error': 'Could not read uploaded PDF.'}, 500
+    
+    elif bill_name:
+        web_data = get_bill_text_from_web(bill_name)
+        if web_data.get('error'):
+            return None, None, None, {'error': web_data['error'], 'source_url': web_data.get('url')}, 400
+        bill_text, source_url = web_data.get('text'), web_data.get('url')
+    
+    else:
+        return None, None, None, {'error': 'Provide a bill name or PDF file.'}, 400
+
+    if not bill_text:
+        return None, None, None, {'error': 'Could not extract text.'}, 500
+    return bill_text, source_url, bill_name_for_analysis, None, 200
+
+
+def extract_bill_input(request):
+    """
+    Resolves the bill text for an analyze request from an uploaded PDF or a bill name.
+    Returns (bill_text, source_url, bill_name_for_analysis, error_response).
+    """
+    file = request.files.get('bill_file')
+    has_file = file and file.filename != ''
+    bill_text, source_url, bill_name_for_analysis, error, status = resolve_bill_text(
+        request.form.get('bill_name'),
+        file.stream if has_file else None,
+        file.filename if has_file else None
+    )
+    if error:
+        return None, None, None, (jsonify(error), status)
+    return bill_text, source_url, bill_name_for_analysis, None
+
+
+def run_analysis(bill_text, source_url, bill_name, language, user):
+    """Runs the analysis stages, records history and opens a chat session. Returns the response body."""
+    #Concurrent analysis processing (per-stage timeouts, partial results)
+    results, timings = run_stages(build_analysis_stages(bill_text, bill_name, language))
+    summary = results['summary']
+    sentiment = results['sentiment']
+    impact_scores = results['impact_scores']
+    news = results['news']
+    
+    #History management
+    save_history(user, bill_name, summary, sentiment, source_url)
+
+    #Chat context stays server-side; the browser only keeps the ID
+    bill_id = sessions.create(bill_text, bill_name)
+
+    return {
+        'summary': summary, 
+        'sentiment': sentiment, 
+        'source_url': source_url,
+        'impact_scores': impact_scores,
+        'news': news,
+        'bill_id': bill_id,
+        'timings': timings
+    }
+
+
+def save_history(user, bill_name, summary, sentiment, source_url):
+    if not user or not get_firestore():
+        return
+    try:
+        #Buffered and batch-written off-thread; the response never waits on Firestore
+        history.record(user['uid'], bill_name, summary, sentiment, source_url)
+    except Exception as e:
+        print(f"AGENT: History Save Error: {e}")
+
+
+def find_batch_analysis(request, language):
+    """Returns the stored pre-analysis matching an analyze request's bill name or uploaded PDF, if any."""
+    try:
+        file = request.files.get('bill_file')
+        if file and file.filename != '':
+            return batch_analysis.lookup(language, pdf_digest=batch_analysis.file_digest(file.stream))
+        return batch_analysis.lookup(language, bill_name=request.form.get('bill_name'))
+    except Exception as e:
+        print(f"AGENT: Batch analysis lookup failed. Error: {e}")
+        return None
+
+
+def serve_batch_analysis(stored, user):
+    """Builds the /api/analyze response from a stored pre-analysis."""
+    result = stored['result']
+    save_history(user, stored['bill_name'], result['summary'], result['sentiment'], result['source_url'])
+    bill_id = sessions.create(stored['text'], stored['bill_name'])
+    timings = {name: {'ms': 0, 'status': 'prewarmed'} for name in batch_analysis.RESULT_FIELDS}
+    return dict(result, bill_id=bill_id, timings=timings)
+
+
+def sse(event, data):
+    """Formats one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def sse_response(events):
+    return Response(stream_with_context(events), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/api/logout', methods=['POST'])
+def logout():
+    user = get_user_from_token(request)
+    if not user: return jsonify({'error': 'Not authorized'}), 401
+    #Refuse this token on every worker even though it hasn't expired yet
+    auth_cache.revoke_token(request.headers['Authorization'].split('Bearer ')[-1], user)
+    #"Log out everywhere" also ends the sessions on the user's other devices
+    if (request.get_json(silent=True) or {}).get('all_devices'):
+        auth_cache.revoke_user(user['uid'])
+    return jsonify({'success': True}), 200
+
+
 @app.route('/api/analyze', methods=['POST'])
 def analyze_bill():
     try:
         user = get_user_from_token(request)
-        file = request.files.get('bill_file')
-        bill_name = request.form.get('bill_name')
         language = request.form.get('language', 'English')
-        bill_text, source_url, bill_name_for_analysis = "", "", bill_name
-
-        # Text extraction
-        if file and file.filename != '':
-            try:
-                pdf_reader = PyPDF2.PdfReader(BytesIO(file.read()))
-                for page in pdf_reader.pages:
-                    bill_text += page.extract_text() or ""
-                source_url = f"Uploaded File: {file.filename}"
-                if not bill_name_for_analysis:
-                    bill_name_for_analysis = file.filename.replace('.pdf', '').replace('_', ' ')
-            except Exception as e:
-                return jsonify({'error': 'Could not read uploaded PDF.'}), 500
-        
-        elif bill_name:
-            web_data = get_bill_text_from_web(bill_name)
-            if web_data.get('error'):
-                return jsonify({'error': web_data['error'], 'source_url': web_data.get('url')}), 400
-            bill_text, source_url = web_data.get('text'), web_data.get('url')
-        
-        else:
-            return jsonify({'error': 'Provide a bill name or PDF file.'}), 400
-
-        if not bill_text:
-            return jsonify({'error': 'Could not extract text.'}), 500
+        #Bills analyzed ahead of time by batch_analysis are served as stored
+        stored = find_batch_analysis(request, language)
+        if stored:
+            return jsonify(serve_batch_analysis(stored, user))
 
-        #Sequential analysis processing
-        summary = generate_detailed_summary(bill_text, bill_name_for_analysis, language)
-        sentiment = get_social_media_sentiment(bill_name_for_analysis)
-        impact_scores = calculate_impact_scores(bill_text)
-        news = get_bill_news(bill_name_for_analysis)
-        
-        #History management
-        if user and db:
-            try:
-                history_ref = db.collection('users').document(user['uid']).collection('history').document()
-                sentiment_data = sentiment.get('note') or sentiment.get('error') or sentiment
-                history_ref.set({
-                    'billName': bill_name_for_analysis, 
-                    'summary': summary,
-                    'sentiment': sentiment_data, 
-                    'source': source_url,
-                    'date': firestore.SERVER_TIMESTAMP
-                })
-            except Exception as e:
-                print(f"AGENT: History Save Error: {e}")
+        bill_text, source_url, bill_name_for_analysis, error_response = extract_bill_input(request)
+        if error_response:
+            return error_response
 
         #Final response construction
-        return jsonify({
-            'summary': summary, 
-            'sentiment': sentiment, 
-            'source_url': source_url,
-            'impact_scores': impact_scores,
-            'news': news,
-            'bill_text': bill_text[:8000]
-        })
+        return jsonify(run_analysis(bill_text, source_url, bill_name_for_analysis, language, user))
     except Exception as e:
         print("AGENT CRITICAL ERROR in /api/analyze:")
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
 
+def stored_analysis_events(body):
+    """Replays a stored analysis as the same event sequence /api/analyze/stream produces."""
+    yield sse('meta', {'source_url': body['source_url'], 'bill_id': body['bill_id']})
+    for name in batch_analysis.RESULT_FIELDS:
+        yield sse('stage', {'name': name, 'result': body[name], 'ms': 0, 'status': 'prewarmed'})
+    yield sse('done', {'timings': body['timings']})
+
+
+@app.route('/api/analyze/stream', methods=['POST'])
+def analyze_bill_stream():
+    """
+    Same input as /api/analyze, answered as server-sent events:
+    'meta' first, 'summary_chunk' pieces as Gemini writes, one 'stage' event
+    per finished stage, then 'done' with the timings.
+    """
+    try:
+        user = get_user_from_token(request)
+        language = request.form.get('language', 'English')
+        stored = find_batch_analysis(request, language)
+        if stored:
+            return sse_response(stored_analysis_events(serve_batch_analysis(stored, user)))
+
+        bill_text, source_url, bill_name_for_analysis, error_response = extract_bill_input(request)
+        if error_response:
+            return error_response
+        bill_id = sessions.create(bill_text, bill_name_for_analysis)
+    except Exception as e:
+        print("AGENT CRITICAL ERROR in /api/analyze/stream:")
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+    def events():
+        yield sse('meta', {'source_url': source_url, 'bill_id': bill_id})
+        results, timings = {}, {}
+        try:
+            stages = build_analysis_stages(bill_text, bill_name_for_analysis, language, stream=True)
+            for name, result, elapsed_ms, status in iter_stages(stages):
+                if status == 'partial':
+                    yield sse('summary_chunk', {'text': result})
+                    continue
+                results[name] = result
+                timings[name] = {'ms': elapsed_ms, 'status': status}
+                yield sse('stage', {'name': name, 'result': result, 'ms': elapsed_ms, 'status': status})
+            save_history(user, bill_name_for_analysis, results['summary'], results['sentiment'], source_url)
+        except Exception as e:
+            traceback.print_exc()
+            yield sse('error', {'error': str(e)})
+        yield sse('done', {'timings': timings})
+
+    return sse_response(events())
+
+
+def analysis_job(payload):
+    """Job handler behind /api/analyze/jobs."""
+    pdf_path = payload.get('pdf_path')
+    try:
+        bill_text, source_url, bill_name_for_analysis, error, _ = resolve_bill_text(
+            payload.get('bill_name'), pdf_path, payload.get('filename')
+        )
+    finally:
+        if pdf_path and os.path.exists(pdf_path):
+            os.remove(pdf_path)
+    if error:
+        raise ValueError(error['error'])
+    #History is written per owner once the job is done, see record_job_history
+    result = run_analysis(bill_text, source_url, bill_name_for_analysis, payload['language'], None)
+    result['bill_name'] = bill_name_for_analysis
+    return result
+
+
+def record_job_history(result, owners):
+    """Saves a finished analysis job to the history of every user who submitted it."""
+    for uid in owners:
+        save_history({'uid': uid}, result['bill_name'], result['summary'], result['sentiment'], result['source_url'])
+
+
+jobs.register('analyze', analysis_job, on_finish=record_job_history)
+#Workers start with the app so jobs queued before a restart are picked up
+jobs.start()
+
+
+@app.route('/api/analyze/jobs', methods=['POST'])
+def submit_analysis_job():
+    """
+    Queues an analysis and returns 202 with a job ID to poll at /api/jobs/<job_id>.
+    Identical in-flight requests (same bill and language) share one job; every
+    user who submitted it can poll it and gets it in their history.
+    """
+    user = get_user_from_token(request)
+    if not user:
+        return jsonify({'error': 'Not authorized'}), 401
+    file = request.files.get('bill_file')
+    bill_name = request.form.get('bill_name')
+    language = request.form.get('language', 'English')
+    payload = {'bill_name': bill_name, 'language': language}
+
+    if file and file.filename != '':
+        pdf_path = cache_path(os.path.join('uploads', f"{uuid.uuid4().hex}.pdf"))
+        os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
+        file.save(pdf_path)
+        digest = hashlib.sha256()
+        with open(pdf_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        digest = digest.hexdigest()
+        payload.update(pdf_path=pdf_path, filename=file.filename)
+        dedup_key = f"analyze|pdf:{digest}|{language}"
+    elif bill_name:
+        pdf_path = None
+        dedup_key = f"analyze|{normalize_bill_name(bill_name)}|{language}"
+    else:
+        return jsonify({'error': 'Provide a bill name or PDF file.'}), 400
+
+    try:
+        job = jobs.submit('analyze', payload, dedup_key=dedup_key, owner=user['uid'])
+    except jobs.QueueFullError:
+        if pdf_path:
+            os.remove(pdf_path)
+        return jsonify({'error': 'The server is busy. Please try again shortly.'}), 503, {'Retry-After': '10'}
+
+    if job['deduplicated'] and pdf_path:
+        os.remove(pdf_path)
+    job['status_url'] = f"/api/jobs/{job['job_id']}"
+    return jsonify(job), 202
+
+
+def is_admin(request):
+    return bool(ADMIN_TOKEN) and request.headers.get('Authorization') == f"Bearer {ADMIN_TOKEN}"
+
+
+@app.route('/api/admin/batch-analysis', methods=['POST'])
+def start_batch_analysis():
+    """
+    Pre-analyzes a list of bills in the background so /api/analyze can serve them directly.
+    Body: {"bills": ["Bill A", ...], "concurrency": 4} to start a run, or {"resume": run_id}.
+    PDF directories are handled by the CLI: python batch_analysis.py run <dir>.
+    """
+    if not is_admin(request):
+        return jsonify({'error': 'Not authorized'}), 401
+    data = request.get_json(silent=True) or {}
+    concurrency = data.get('concurrency')
+    if data.get('resume'):
+        run_id = data['resume']
+        if batch_analysis.report(run_id) is None:
+            return jsonify({'error': 'Unknown run.'}), 404
+    elif data.get('bills'):
+        items = [('name', name.strip()) for name in data['bills'] if name and name.strip()]
+        run_id = batch_analysis.create_run(items, concurrency or batch_analysis.BATCH_CONCURRENCY)
+    else:
+        return jsonify({'error': 'Provide a list of bills or a run to resume.'}), 400
+
+    batch_analysis.start(run_id, concurrency)
+    return jsonify({'run_id': run_id, 'status_url': f"/api/admin/batch-analysis/{run_id}"}), 202
+
+
+@app.route('/api/admin/batch-analysis/<run_id>', methods=['GET'])
+def get_batch_analysis(run_id):
+    if not is_admin(request):
+        return jsonify({'error': 'Not authorized'}), 401
+    report = batch_analysis.report(run_id)
+    if report is None:
+        return jsonify({'error': 'Unknown run.'}), 404
+    return jsonify(report), 200
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    user = get_user_from_token(request)
+    if not user:
+        return jsonify({'error': 'Not authorized'}), 401
+    job = jobs.get(job_id, user['uid'])
+    if not job:
+        return jsonify({'error': 'Job not found.'}), 404
+    return jsonify(job), 200
+
+
 @app.route('/api/chat', methods=['POST'])
 def chat_with_mitra():
     data = request.get_json()
-    bill_text = data.get('bill_text')
+    bill_id = data.get('bill_id')
     query = data.get('query')
     language = data.get('language', 'English')
     
-    if not bill_text or not query:
+    if not bill_id or not query:
         return jsonify({'error': 'Missing context/query'}), 400
+
+    session = sessions.get(bill_id)
+    if not session:
+        return jsonify({'error': 'This analysis has expired. Please analyze the bill again.'}), 404
         
-    answer = ask_sarkari_mitra(bill_text, query, language)
+    answer = ask_sarkari_mitra(session.text, query, language, session.history)
+    sessions.add_turn(session, query, answer)
     return jsonify({'answer': answer})
 
+@app.route('/api/chat/stream', methods=['POST'])
+def chat_with_mitra_stream():
+    data = request.get_json()
+    bill_id = data.get('bill_id')
+    query = data.get('query')
+    language = data.get('language', 'English')
+
+    if not bill_id or not query:
+        return jsonify({'error': 'Missing context/query'}), 400
+
+    session = sessions.get(bill_id)
+    if not session:
+        return jsonify({'error': 'This analysis has expired. Please analyze the bill again.'}), 404
+
+    def events():
+        parts = []
+        for text in stream_sarkari_mitra(session.text, query, language, session.history):
+            parts.append(text)
+            yield sse('chunk', {'text': text})
+        sessions.add_turn(session, query, "".join(parts))
+        yield sse('done', {})
+
+    return sse_response(events())
+
 @app.route('/api/compare', methods=['POST'])
 def compare_bill_versions():
     data = request.get_json()
@@ -188,11 +520,32 @@ def compare_bill_versions():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/compare/stream', methods=['POST'])
+def compare_bill_versions_stream():
+    data = request.get_json()
+    bill_name = data.get('bill_name')
+    older_year = data.get('older_year')
+    language = data.get('language', 'English')
+
+    if not bill_name or not older_year:
+        return jsonify({'error': 'Required: bill_name, older_year'}), 400
+
+    def events():
+        try:
+            for text in stream_compare_bills(bill_name, older_year, language):
+                yield sse('chunk', {'text': text})
+        except Exception as e:
+            yield sse('error', {'error': str(e)})
+        yield sse('done', {})
+
+    return sse_response(events())
+
 
 
 @app.route('/api/get-profile', methods=['GET'])
 def get_profile():
     user = get_user_from_token(request)
+    db = get_firestore()
     if not user or not db: return jsonify({'error': 'Not authorized'}), 401
     try:
         doc = db.collection('users').document(user['uid']).get()
@@ -203,10 +556,17 @@ def get_profile():
 @app.route('/api/update-profile', methods=['POST'])
 def update_profile():
     user = get_user_from_token(request)
+    db = get_firestore()
     if not user or not db: return jsonify({'error': 'Not authorized'}), 401
     profile_data = request.get_json()
     try:
-        db.collection('users').document(user['uid']).set({'profile': profile_data}, merge=True)
+        user_ref = db.collection('users').document(user['uid'])
+        #Drop the recommendations cached for the old profile before it changes
+        old_doc = user_ref.get()
+        old_profile = old_doc.to_dict().get('profile') if old_doc.exists else None
+        if old_profile:
+            invalidate_scheme_recommendations(old_profile)
+        user_ref.set({'profile': profile_data}, merge=True)
         return jsonify({'success': True}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -214,6 +574,7 @@ def update_profile():
 @app.route('/api/find-schemes', methods=['GET'])
 def find_schemes():
     user = get_user_from_token(request)
+    db = get_firestore()
     if not user or not db: return jsonify({'error': 'Not authorized'}), 401
     try:
         doc = db.collection('users').document(user['uid']).get()
@@ -228,23 +589,26 @@ def find_schemes():
 @app.route('/api/get-history', methods=['GET'])
 def get_history():
     user = get_user_from_token(request)
+    db = get_firestore()
     if not user or not db: return jsonify({'error': 'Not authorized'}), 401
     try:
-        docs = db.collection('users').document(user['uid']).collection('history').order_by('date', direction=firestore.Query.DESCENDING).limit(5).stream()
-        history = []
-        for doc in docs:
-            d = doc.to_dict()
-            if d.get('date'): d['date'] = d['date'].strftime('%Y-%m-%d %H:%M:%S')
-            d['id'] = doc.id
-            history.append(d)
-        return jsonify(history), 200
+        return jsonify(history.recent(user['uid'])), 200
     except Exception as e:
         return jsonify({'error': 'History fetch failed.'}), 500
 
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    if METRICS_TOKEN and request.headers.get('Authorization') != f"Bearer {METRICS_TOKEN}":
+        return jsonify({'error': 'Not authorized'}), 401
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/')
 def home():
     return "Sarkari Sanket Backend Online."
 
+#Heavy client libraries load lazily; warm them up now that the app is ready to serve
+warmup.start(boot_seconds=time.perf_counter() - _boot_started)
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port)
\ No newline at end of file
@@ -0,0 +1,165 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import metrics
+from clients import get_firebase_auth
+from storage import get_connection
+
+# Load Configuration
+try:
+    from config import AUTH_CACHE_MAX_ENTRIES
+except ImportError:
+    AUTH_CACHE_MAX_ENTRIES = 10000
+
+DB_FILE = "auth.sqlite3"
+# How often a worker picks up revocations recorded by other workers.
+REVOCATION_SYNC_INTERVAL = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS revocations (
+    subject TEXT PRIMARY KEY,
+    revoked_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+_claims = OrderedDict()  # token hash -> verified claims
+_lock = threading.Lock()
+_revoked_tokens = {}     # token hash -> revoked_at
+_revoked_users = {}      # uid -> revoked_at
+_last_sync = 0.0
+_initialized = False
+_stats = {'hits': 0, 'misses': 0, 'rejected': 0, 'hit_ms': 0.0, 'verify_ms': 0.0}
+
+
+def _db():
+    global _initialized
+    conn = get_connection(DB_FILE)
+    if not _initialized:
+        conn.executescript(_SCHEMA)
+        _initialized = True
+    return conn
+
+
+def _token_hash(id_token: str) -> str:
+    return hashlib.sha256(id_token.encode('utf-8')).hexdigest()
+
+
+def _sync_revocations(now):
+    global _last_sync
+    if now - _last_sync < REVOCATION_SYNC_INTERVAL:
+        return
+    _last_sync = now
+    try:
+        rows = _db().execute("SELECT subject, revoked_at FROM revocations WHERE expires_at > ?", (now,)).fetchall()
+    except Exception as e:
+        print(f"AGENT: Could not read token revocations. Error: {e}")
+        return
+    tokens, users = {}, {}
+    for row in rows:
+        kind, _, value = row['subject'].partition(':')
+        (users if kind == 'uid' else tokens)[value] = row['revoked_at']
+    with _lock:
+        _revoked_tokens.clear()
+        _revoked_tokens.update(tokens)
+        _revoked_users.clear()
+        _revoked_users.update(users)
+
+
+def _is_revoked(key, claims) -> bool:
+    if key in _revoked_tokens:
+        return True
+    revoked_at = _revoked_users.get(claims.get('uid'))
+    # Tokens issued before a user-wide revocation are refused; later sign-ins are fine.
+    return revoked_at is not None and claims.get('auth_time', claims.get('iat', 0)) <= revoked_at
+
+
+def verify(id_token: str):
+    """
+    Returns the verified claims for an ID token, or None if it has been
+    revoked. Claims are cached until the token's own `exp`, so only the
+    first request with a given token pays for signature verification.
+    Raises Firebase's errors for invalid or expired tokens.
+    """
+    started = time.perf_counter()
+    now = time.time()
+    key = _token_hash(id_token)
+    _sync_revocations(now)
+
+    with _lock:
+        claims = _claims.get(key)
+        if claims is not None and claims['exp'] <= now:
+            del _claims[key]
+            claims = None
+        if claims is not None:
+            _claims.move_to_end(key)
+            revoked = _is_revoked(key, claims)
+            _stats['hits'] += 1
+            _stats['rejected'] += revoked
+            _stats['hit_ms'] += (time.perf_counter() - started) * 1000
+            metrics.cache_lookup('auth', True)
+            return None if revoked else claims
+
+    metrics.cache_lookup('auth', False)
+    with metrics.span('auth_verify'):
+        claims = get_firebase_auth().verify_id_token(id_token)
+    with _lock:
+        _stats['misses'] += 1
+        _stats['verify_ms'] += (time.perf_counter() - started) * 1000
+        if _is_revoked(key, claims):
+            _stats['rejected'] += 1
+            return None
+        _claims[key] = claims
+        while len(_claims) > AUTH_CACHE_MAX_ENTRIES:
+            _claims.popitem(last=False)
+    return claims
+
+
+def _record_revocation(subject, expires_at):
+    now = time.time()
+    conn = _db()
+    conn.execute(
+        "INSERT OR REPLACE INTO revocations (subject, revoked_at, expires_at) VALUES (?, ?, ?)",
+        (subject, now, expires_at)
+    )
+    conn.execute("DELETE FROM revocations WHERE expires_at <= ?", (now,))
+    return now
+
+
+def revoke_token(id_token: str, claims: dict = None):
+    """Refuses this one token on every worker from now on (e.g. on logout)."""
+    key = _token_hash(id_token)
+    with _lock:
+        cached = _claims.pop(key, None)
+    claims = claims or cached or {}
+    # The entry only has to outlive the token itself; ID tokens last an hour.
+    expires_at = claims.get('exp', time.time() + 3600)
+    revoked_at = _record_revocation(f"token:{key}", expires_at)
+    with _lock:
+        _revoked_tokens[key] = revoked_at
+
+
+def revoke_user(uid: str):
+    """Revokes the user's refresh tokens in Firebase and refuses every ID token issued so far."""
+    get_firebase_auth().revoke_refresh_tokens(uid)
+    revoked_at = _record_revocation(f"uid:{uid}", time.time() + 3600)
+    with _lock:
+        _revoked_users[uid] = revoked_at
+        for key in [k for k, c in _claims.items() if c.get('uid') == uid]:
+            del _claims[key]
+
+
+def stats() -> dict:
+    """Cache counters plus the average auth overhead of cached and fully verified requests."""
+    with _lock:
+        hits, misses = _stats['hits'], _stats['misses']
+        return {
+            'entries': len(_claims),
+            'hits': hits,
+            'misses': misses,
+            'rejected': _stats['rejected'],
+            'avg_hit_ms': round(_stats['hit_ms'] / hits, 3) if hits else None,
+            'avg_verify_ms': round(_stats['verify_ms'] / misses, 3) if misses else None,
+        }
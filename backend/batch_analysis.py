@@ -0,0 +1,346 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import bill_cache
+from bill_cache import normalize_bill_name
+from storage import get_connection
+
+# Load Configuration
+try:
+    from config import BATCH_CONCURRENCY, BATCH_RESULT_TTL
+except ImportError:
+    BATCH_CONCURRENCY, BATCH_RESULT_TTL = 4, 6 * 3600
+
+DB_FILE = "batch_analysis.sqlite3"
+LANGUAGES = ('English', 'Hinglish')
+# Stages whose results make up an /api/analyze response.
+RESULT_FIELDS = ('summary', 'sentiment', 'impact_scores', 'news')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id TEXT PRIMARY KEY,
+    concurrency INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS items (
+    run_id TEXT NOT NULL REFERENCES runs(id),
+    position INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    status TEXT NOT NULL,
+    bill_name TEXT,
+    timings TEXT,
+    error TEXT,
+    started_at REAL,
+    finished_at REAL,
+    PRIMARY KEY (run_id, position)
+);
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT NOT NULL,
+    language TEXT NOT NULL,
+    bill_name TEXT NOT NULL,
+    result TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (key, language)
+);
+"""
+
+_initialized = False
+_running = set()
+_running_lock = threading.Lock()
+
+
+def _db():
+    global _initialized
+    conn = get_connection(DB_FILE)
+    if not _initialized:
+        conn.executescript(_SCHEMA)
+        _initialized = True
+    return conn
+
+
+def pdf_key(digest: str) -> str:
+    return f"pdf {digest}"
+
+
+def file_digest(stream) -> str:
+    """sha256 of a binary stream, which is rewound afterwards."""
+    digest = hashlib.sha256()
+    for block in iter(lambda: stream.read(1024 * 1024), b''):
+        digest.update(block)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def expand_items(sources):
+    """
+    Turns CLI/endpoint input into (kind, value) items: directories contribute
+    their PDFs, .txt files one bill name per line, anything else is a bill name.
+    """
+    items = []
+    for source in sources:
+        if os.path.isdir(source):
+            items.extend(('pdf', os.path.join(source, name))
+                         for name in sorted(os.listdir(source)) if name.lower().endswith('.pdf'))
+        elif source.lower().endswith('.pdf') and os.path.isfile(source):
+            items.append(('pdf', source))
+        elif source.lower().endswith('.txt') and os.path.isfile(source):
+            with open(source, encoding='utf-8') as f:
+                items.extend(('name', line.strip()) for line in f if line.strip() and not line.startswith('#'))
+        elif source.strip():
+            items.append(('name', source.strip()))
+    return items
+
+
+def create_run(items, concurrency: int = BATCH_CONCURRENCY) -> str:
+    """Records a new run over `items`; nothing is analyzed until run() is called."""
+    run_id = uuid.uuid4().hex[:12]
+    conn = _db()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("INSERT INTO runs (id, concurrency, created_at) VALUES (?, ?, ?)",
+                     (run_id, concurrency, time.time()))
+        conn.executemany(
+            "INSERT INTO items (run_id, position, kind, value, status) VALUES (?, ?, ?, ?, 'pending')",
+            [(run_id, position, kind, value) for position, (kind, value) in enumerate(items)]
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return run_id
+
+
+def _resolve(kind, value):
+    """Returns (bill_text, source_url, bill_name, result keys) for one item."""
+    if kind == 'pdf':
+        from pdf_text import extract_pdf_text
+
+        filename = os.path.basename(value)
+        bill_name = filename.replace('.pdf', '').replace('_', ' ')
+        with open(value, 'rb') as f:
+            digest = file_digest(f)
+        source_url = f"Uploaded File: {filename}"
+        bill_text = extract_pdf_text(value)
+        # Uploads of the same file and searches for its name are both served.
+        keys = [pdf_key(digest), bill_name]
+        for key in keys:
+            bill_cache.put(key, source_url, bill_text)
+        return bill_text, source_url, bill_name, keys
+
+    from agent import get_bill_text_from_web
+
+    data = get_bill_text_from_web(value)
+    if data.get('error'):
+        raise ValueError(data['error'])
+    return data['text'], data.get('url'), value, [value]
+
+
+def analyze_item(kind: str, value: str):
+    """
+    Runs the /api/analyze pipeline for one bill in every language and stores
+    the results. Returns (bill_name, timings); raises if any stage fell back.
+    """
+    from agent import generate_detailed_summary, is_failed_summary
+    from pipeline import build_analysis_stages, run_stages
+
+    started = time.perf_counter()
+    bill_text, source_url, bill_name, keys = _resolve(kind, value)
+    timings = {'text': {'ms': round((time.perf_counter() - started) * 1000), 'status': 'ok'}}
+
+    results, stage_timings = run_stages(build_analysis_stages(bill_text, bill_name, LANGUAGES[0]))
+    timings.update(stage_timings)
+    failed = [f"{name} ({t['status']})" for name, t in stage_timings.items() if t['status'] != 'ok']
+    # The agent steps catch their own errors and return a message or an empty
+    # fallback; none of those may be stored and served as the analysis.
+    if is_failed_summary(results['summary']):
+        failed.append("summary (error)")
+    if 'error' in results['sentiment']:
+        failed.append("sentiment (error)")
+    if not results['impact_scores']:
+        failed.append("impact_scores (empty)")
+    if not results['news']:
+        failed.append("news (empty)")
+    if failed:
+        raise RuntimeError(f"Stages did not complete: {', '.join(failed)}")
+
+    summaries = {LANGUAGES[0]: results['summary']}
+    for language in LANGUAGES[1:]:
+        stage_started = time.perf_counter()
+        summaries[language] = generate_detailed_summary(bill_text, bill_name, language)
+        timings[f"summary_{language.lower()}"] = {
+            'ms': round((time.perf_counter() - stage_started) * 1000), 'status': 'ok'
+        }
+        if is_failed_summary(summaries[language]):
+            raise RuntimeError(f"{language} summary failed: {summaries[language]}")
+
+    now = time.time()
+    rows = []
+    for language, summary in summaries.items():
+        body = dict(results, summary=summary, source_url=source_url)
+        result = json.dumps({field: body[field] for field in RESULT_FIELDS + ('source_url',)})
+        rows.extend((normalize_bill_name(key), language, bill_name, result, now) for key in keys)
+    _db().executemany(
+        "INSERT OR REPLACE INTO results (key, language, bill_name, result, created_at) VALUES (?, ?, ?, ?, ?)",
+        rows
+    )
+    return bill_name, timings
+
+
+def _mark(run_id, position, **fields):
+    assignments = ", ".join(f"{name} = ?" for name in fields)
+    _db().execute(f"UPDATE items SET {assignments} WHERE run_id = ? AND position = ?",
+                  (*fields.values(), run_id, position))
+
+
+def _process(run_id, position, kind, value):
+    _mark(run_id, position, status='running', started_at=time.time(), error=None)
+    try:
+        bill_name, timings = analyze_item(kind, value)
+        _mark(run_id, position, status='done', bill_name=bill_name,
+              timings=json.dumps(timings), finished_at=time.time())
+        print(f"AGENT: Batch {run_id}: analyzed '{value}'.")
+    except Exception as e:
+        _mark(run_id, position, status='failed', error=str(e), finished_at=time.time())
+        print(f"AGENT: Batch {run_id}: '{value}' failed. Error: {e}")
+
+
+def run(run_id: str, concurrency: int = None) -> dict:
+    """
+    Analyzes every item of a run that hasn't succeeded yet, `concurrency` at a
+    time, and returns the report. Calling it again resumes an interrupted run
+    and retries failed items.
+    """
+    conn = _db()
+    row = conn.execute("SELECT concurrency FROM runs WHERE id = ?", (run_id,)).fetchone()
+    if row is None:
+        raise KeyError(f"Unknown run: {run_id}")
+    concurrency = concurrency or row['concurrency']
+
+    with _running_lock:
+        if run_id in _running:
+            raise RuntimeError(f"Run {run_id} is already in progress.")
+        _running.add(run_id)
+    try:
+        conn.execute("UPDATE runs SET started_at = ?, finished_at = NULL WHERE id = ?", (time.time(), run_id))
+        todo = conn.execute(
+            "SELECT position, kind, value FROM items WHERE run_id = ? AND status != 'done' ORDER BY position",
+            (run_id,)
+        ).fetchall()
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch") as pool:
+            for item in todo:
+                pool.submit(_process, run_id, item['position'], item['kind'], item['value'])
+        conn.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (time.time(), run_id))
+    finally:
+        with _running_lock:
+            _running.discard(run_id)
+    return report(run_id)
+
+
+def start(run_id: str, concurrency: int = None):
+    """Runs (or resumes) a run on a background thread."""
+    threading.Thread(target=run, args=(run_id, concurrency), name=f"batch-{run_id}", daemon=True).start()
+
+
+def report(run_id: str):
+    """Per-item status and timings plus run totals, or None for an unknown run."""
+    conn = _db()
+    run_row = conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+    if run_row is None:
+        return None
+    items, counts, item_ms = [], {}, []
+    for row in conn.execute("SELECT * FROM items WHERE run_id = ? ORDER BY position", (run_id,)):
+        counts[row['status']] = counts.get(row['status'], 0) + 1
+        item = {'item': row['value'], 'status': row['status']}
+        if row['finished_at'] and row['started_at']:
+            item['ms'] = round((row['finished_at'] - row['started_at']) * 1000)
+            if row['status'] == 'done':
+                item_ms.append(item['ms'])
+        if row['timings']:
+            item['timings'] = json.loads(row['timings'])
+        if row['error']:
+            item['error'] = row['error']
+        items.append(item)
+
+    end = run_row['finished_at'] or time.time()
+    wall = end - run_row['started_at'] if run_row['started_at'] else 0
+    done = counts.get('done', 0)
+    return {
+        'run_id': run_id,
+        'state': 'finished' if run_row['finished_at'] else ('running' if run_row['started_at'] else 'created'),
+        'concurrency': run_row['concurrency'],
+        'counts': counts,
+        'wall_seconds': round(wall, 1),
+        'bills_per_minute': round(done / wall * 60, 2) if wall else 0,
+        'avg_item_ms': round(sum(item_ms) / len(item_ms)) if item_ms else 0,
+        'items': items,
+    }
+
+
+def lookup(language: str, bill_name: str = None, pdf_digest: str = None):
+    """
+    Returns a stored analysis as {'bill_name', 'text', 'result'} if one is
+    fresh for this bill name or uploaded file, else None.
+    """
+    key = pdf_key(pdf_digest) if pdf_digest else bill_name
+    if not key:
+        return None
+    row = _db().execute(
+        "SELECT bill_name, result, created_at FROM results WHERE key = ? AND language = ?",
+        (normalize_bill_name(key), language)
+    ).fetchone()
+    if row is None or time.time() - row['created_at'] > BATCH_RESULT_TTL:
+        return None
+    # Chat sessions need the text too; it lives in the bill cache.
+    cached = bill_cache.get(key)
+    if cached is None:
+        return None
+    return {'bill_name': row['bill_name'], 'text': cached['text'], 'result': json.loads(row['result'])}
+
+
+def stats() -> dict:
+    conn = _db()
+    stored = conn.execute("SELECT COUNT(*) FROM results WHERE created_at > ?",
+                          (time.time() - BATCH_RESULT_TTL,)).fetchone()[0]
+    return {'fresh_results': stored}
+
+
+def _print_report(result):
+    print(f"{'status':8} {'ms':>8}  item")
+    for item in result['items']:
+        line = f"{item['status']:8} {item.get('ms', ''):>8}  {item['item']}"
+        if item.get('error'):
+            line += f"  ({item['error']})"
+        print(line)
+    print(f"{result['counts']} in {result['wall_seconds']}s at concurrency {result['concurrency']}: "
+          f"{result['bills_per_minute']} bills/min, {result['avg_item_ms']} ms per bill on average")
+
+
+if __name__ == '__main__':
+    # Usage: python batch_analysis.py run bills.txt|pdf_dir|"Bill name" ... [--concurrency N]
+    #        | resume RUN_ID [--concurrency N] | report RUN_ID
+    args = sys.argv[1:]
+    concurrency = None
+    if '--concurrency' in args:
+        i = args.index('--concurrency')
+        concurrency = int(args[i + 1])
+        del args[i:i + 2]
+    command, args = (args[0] if args else 'report'), args[1:]
+    if command == 'run' and args:
+        run_id = create_run(expand_items(args), concurrency or BATCH_CONCURRENCY)
+        print(f"Run {run_id} (resume with: python batch_analysis.py resume {run_id})")
+        _print_report(run(run_id))
+    elif command == 'resume' and args:
+        _print_report(run(args[0], concurrency))
+    elif command == 'report' and args:
+        _print_report(report(args[0]))
+    else:
+        print(stats())
@@ -0,0 +1,49 @@
+"""
+Measures per-request auth overhead: a full auth.verify_id_token on every
+request (the old path) against the verified-token cache.
+
+Needs firebase-key.json and a live ID token for that project (copy one from
+the browser's Authorization header).
+
+Usage (from backend/): python -m benchmarks.bench_auth <id_token> [n_requests]
+"""
+import statistics
+import sys
+import time
+
+import auth_cache
+from clients import get_firebase_auth
+
+
+def timed_ms(func, token, n):
+    samples = []
+    for _ in range(n):
+        started = time.perf_counter()
+        func(token)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def describe(label, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1] if len(samples) >= 20 else samples[-1]
+    print(f"{label:18}: mean {statistics.mean(samples):8.3f} ms  p50 {statistics.median(samples):8.3f} ms  p95 {p95:8.3f} ms")
+
+
+def main():
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    token = sys.argv[1]
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    auth = get_firebase_auth()
+
+    # The first call pays for fetching the public keys on both paths; leave it out.
+    auth.verify_id_token(token)
+    describe("verify every time", timed_ms(auth.verify_id_token, token, n))
+    auth_cache.verify(token)
+    describe("cached claims", timed_ms(auth_cache.verify, token, n))
+    print(auth_cache.stats())
+
+
+if __name__ == '__main__':
+    main()
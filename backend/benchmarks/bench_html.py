@@ -0,0 +1,82 @@
+"""
+Micro-benchmark for HTML text extraction. Compares the old scraper path
+(BeautifulSoup, joining every <p>) with html_extract's streaming extractor
+on the standard-library parser and, when installed, on lxml.
+
+Pages: the synthetic bill page and gov.in-style portal page from
+fixtures.py, plus any *.html files in the directories given on the command
+line (e.g. pages saved from sansad.in or a ministry portal).
+
+Usage (from backend/):
+    python -m benchmarks.bench_html [--repeat 20] [pages_dir ...]
+"""
+import argparse
+import glob
+import os
+import time
+
+import html_extract
+from benchmarks import fixtures
+
+
+def soup_paragraphs(data: bytes) -> str:
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(data, 'html.parser')
+    return '\n'.join(p.get_text() for p in soup.find_all('p'))
+
+
+def streaming(use_lxml):
+    def extract(data: bytes) -> str:
+        extractor = html_extract.HTMLExtractor('text/html; charset=utf-8', use_lxml=use_lxml)
+        # Same chunk size as the scraper's download loop.
+        for start in range(0, len(data), 64 * 1024):
+            extractor.feed(data[start:start + 64 * 1024])
+        return extractor.close()
+    return extract
+
+
+def extractors():
+    found = []
+    try:
+        import bs4  # noqa: F401
+        found.append(('bs4 <p>', soup_paragraphs))
+    except ImportError:
+        print("beautifulsoup4 not installed; skipping the old extraction path.")
+    found.append(('stdlib', streaming(False)))
+    if html_extract.lxml_etree() is not None:
+        found.append(('lxml', streaming(True)))
+    else:
+        print("lxml not installed; skipping the lxml backend.")
+    return found
+
+
+def load_pages(directories):
+    pages = [('fixture bill page', fixtures.bill_html()), ('fixture portal page', fixtures.portal_html())]
+    for directory in directories:
+        for path in sorted(glob.glob(os.path.join(directory, '*.htm*'))):
+            with open(path, 'rb') as f:
+                pages.append((os.path.basename(path), f.read()))
+    return pages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('pages_dir', nargs='*', help="directories of saved *.html pages")
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    candidates = extractors()
+    print(f"{'page':28} {'extractor':10} {'KiB':>8} {'ms/page':>9} {'MB/s':>8} {'chars out':>10}")
+    for name, data in load_pages(args.pages_dir):
+        for label, extract in candidates:
+            text = extract(data)
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                extract(data)
+            elapsed = (time.perf_counter() - started) / args.repeat
+            print(f"{name[:28]:28} {label:10} {len(data) / 1024:>8.1f} {elapsed * 1000:>9.1f} "
+                  f"{len(data) / elapsed / 1e6:>8.2f} {len(text):>10}")
+
+
+if __name__ == '__main__':
+    main()
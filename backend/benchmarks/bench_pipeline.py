@@ -0,0 +1,154 @@
+"""
+Offline load benchmark for the agent pipeline. CSE, Gemini, Reddit and
+plain HTTP are replaced by recorded-response fakes with simulated latency
+(benchmarks/fakes.py), and all caches live in a throwaway directory.
+
+Scenarios: bill_text (get_bill_text_from_web), analyze (/api/analyze),
+compare (compare_bills), schemes (find_matching_schemes, search fallback)
+and chat (/api/chat). Each request uses a fresh bill/profile/question so the
+cold path is measured; --warm repeats one input to measure the cached path.
+The per-worker provider rate limits (governor.py) still apply, so under load
+the analyze sentiment stage runs up to its deadline and falls back to post
+titles for comments it can't fetch in time; raise REDDIT_REQUESTS_PER_MINUTE
+(and GEMINI_/CSE_REQUESTS_PER_MINUTE for long runs) to take them out of the
+measurement.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pipeline [--scenario all] [--requests 40]
+        [--concurrency 8] [--latency-scale 1.0] [--warm]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+# Everything below reads its configuration at import time.
+_cache_dir = tempfile.mkdtemp(prefix="sarkari-bench-")
+os.environ['CACHE_DIR'] = _cache_dir
+# Client warm-up would compete with the measured requests.
+os.environ.setdefault('WARMUP_MODE', 'lazy')
+for _key in ('GOOGLE_API_KEY', 'SEARCH_ENGINE_ID', 'GEMINI_API_KEY',
+             'REDDIT_CLIENT_ID', 'REDDIT_CLIENT_SECRET', 'REDDIT_USER_AGENT'):
+    os.environ.setdefault(_key, 'offline-benchmark')
+
+import io
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import fakes
+
+SCENARIOS = ('bill_text', 'analyze', 'compare', 'schemes', 'chat')
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+
+def make_request(scenario, i, warm, context):
+    """Returns a zero-argument callable performing request i; it returns True on success."""
+    import agent
+
+    n = 0 if warm else i
+    bill_name = f"Benchmark Data Protection Bill {n}"
+    if scenario == 'bill_text':
+        return lambda: not agent.get_bill_text_from_web(bill_name).get('error')
+    if scenario == 'compare':
+        return lambda: not agent.compare_bills(bill_name, 2019, 'English').startswith('Error')
+    if scenario == 'schemes':
+        profile = {
+            'state': 'Punjab', 'occupation': 'Farmer', 'age': '34', 'sex': 'male',
+            'income': str(120000 + n), 'category': 'obc', 'marital_status': 'married',
+            'is_only_girl_child': 'no', 'parental_status': 'both_alive',
+        }
+        return lambda: not agent.find_matching_schemes(profile).get('error')
+
+    client = context['client']
+    if scenario == 'analyze':
+        return lambda: client.post('/api/analyze', data={'bill_name': bill_name, 'language': 'English'}).status_code == 200
+    if scenario == 'chat':
+        query = f"How long can a company keep my data? (question {n})"
+        payload = {'bill_id': context['bill_id'], 'query': query, 'language': 'English'}
+        return lambda: client.post('/api/chat', json=payload).status_code == 200
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+
+def run_scenario(scenario, n_requests, concurrency, warm, context):
+    requests_ = [make_request(scenario, i, warm, context) for i in range(n_requests)]
+
+    def timed(request):
+        started = time.perf_counter()
+        try:
+            ok = request()
+        except Exception:
+            ok = False
+        return ok, (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(timed, requests_))
+    wall = time.perf_counter() - started
+
+    latencies = sorted(ms for _, ms in outcomes)
+    errors = sum(1 for ok, _ in outcomes if not ok)
+    return {
+        'scenario': scenario,
+        'requests': n_requests,
+        'errors': errors,
+        'throughput': n_requests / wall,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'wall': wall,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenario', default='all', choices=('all',) + SCENARIOS)
+    parser.add_argument('--requests', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency-scale', type=float, default=1.0,
+                        help="multiplier for the simulated latencies (0 measures local CPU cost only)")
+    parser.add_argument('--warm', action='store_true', help="repeat one input so caches are hit")
+    parser.add_argument('--verbose', action='store_true', help="keep the agent's log output")
+    args = parser.parse_args()
+
+    fakes.install(scale=args.latency_scale)
+    scenarios = SCENARIOS if args.scenario == 'all' else (args.scenario,)
+
+    report = sys.stdout
+    if not args.verbose:
+        # Background threads keep logging after a scenario ends; silence them for the whole run.
+        sys.stdout = io.StringIO()
+
+    results = []
+    try:
+        import app
+        import sessions
+        from benchmarks import fixtures
+        from pdf_text import extract_pdf_text
+
+        context = {
+            'client': app.app.test_client(),
+            'bill_id': sessions.create(extract_pdf_text(fixtures.bill_pdf()), "Benchmark Data Protection Bill"),
+        }
+        for scenario in scenarios:
+            results.append(run_scenario(scenario, args.requests, args.concurrency, args.warm, context))
+    finally:
+        shutil.rmtree(_cache_dir, ignore_errors=True)
+
+    mode = "warm" if args.warm else "cold"
+    print(f"{args.requests} requests per scenario, concurrency {args.concurrency}, "
+          f"latency scale {args.latency_scale}, {mode} caches", file=report)
+    print(f"{'scenario':10} {'errors':>6} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}", file=report)
+    for r in results:
+        print(f"{r['scenario']:10} {r['errors']:>6} {r['throughput']:>8.2f} "
+              f"{r['p50']:>9.1f} {r['p95']:>9.1f} {r['p99']:>9.1f}", file=report)
+
+
+if __name__ == '__main__':
+    main()
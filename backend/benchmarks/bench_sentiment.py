@@ -0,0 +1,69 @@
+"""
+Compares the batched lexicon sentiment engine against the original per-item
+TextBlob path on a synthetic Reddit-style corpus.
+
+Usage (from backend/): python -m benchmarks.bench_sentiment [n_items]
+"""
+import random
+import sys
+import time
+
+from sentiment import LexiconSentimentEngine, TextBlobSentimentEngine
+
+OPINION_WORDS = [
+    "good", "great", "excellent", "amazing", "fair", "useful", "bad", "terrible", "awful",
+    "corrupt", "stupid", "unfair", "helpful", "dangerous", "brilliant", "poor", "strong", "weak",
+]
+MODIFIERS = ["very", "really", "extremely", "not", "never", "so", ""]
+FILLER = (
+    "the bill government parliament tax farmers data privacy citizens law india policy state "
+    "minister act amendment people this will for and about it is of in on rules new"
+).split()
+EMOTICONS = [":)", ":(", ":D", ""]
+
+
+def synthetic_corpus(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(n):
+        words = rng.choices(FILLER, k=rng.randint(6, 40))
+        for _ in range(rng.randint(0, 3)):
+            phrase = f"{rng.choice(MODIFIERS)} {rng.choice(OPINION_WORDS)}".strip()
+            words.insert(rng.randrange(len(words) + 1), phrase)
+        text = " ".join(words) + rng.choice(["", "!", "."]) + " " + rng.choice(EMOTICONS)
+        corpus.append(text.strip())
+    return corpus
+
+
+def timed(engine, corpus):
+    started = time.perf_counter()
+    batch = engine.score_batch(corpus)
+    return batch, time.perf_counter() - started
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    corpus = synthetic_corpus(n)
+
+    started = time.perf_counter()
+    lexicon = LexiconSentimentEngine()
+    build_time = time.perf_counter() - started
+
+    fast, fast_time = timed(lexicon, corpus)
+    slow, slow_time = timed(TextBlobSentimentEngine(), corpus)
+
+    def bucket(scores):
+        return [1 if s > 0.1 else -1 if s < -0.1 else 0 for s in scores]
+
+    agreement = sum(a == b for a, b in zip(bucket(fast.scores), bucket(slow.scores))) / n
+
+    print(f"Corpus: {n} items")
+    print(f"TextBlob per item : {slow_time:8.3f}s  ({n / slow_time:10.0f} items/s)  {slow.buckets()}")
+    print(f"Lexicon batch     : {fast_time:8.3f}s  ({n / fast_time:10.0f} items/s)  {fast.buckets()}")
+    print(f"Lexicon build     : {build_time:8.3f}s (once per process)")
+    print(f"Speedup           : {slow_time / fast_time:8.1f}x")
+    print(f"Bucket agreement  : {agreement:8.2%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Worker startup report. Imports app.py in a fresh interpreter under
+`python -X importtime`, with warm-up disabled, and prints the time to a
+servable app plus the heaviest top-level packages it pulls in. Then times
+each warm-up task (warmup.py) in that same fresh process, i.e. what the
+first request needing each client would otherwise pay.
+
+Clients are built with placeholder credentials: none of the tasks call
+their service, except that the search task fetches the discovery document
+(falling back to the bundled copy offline). Firebase is skipped without
+firebase-key.json.
+
+Usage (from backend/):
+    python -m benchmarks.bench_startup [--top 15]
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+_CHILD = """
+import sys, time
+started = time.perf_counter()
+import app
+print(f"BOOT {time.perf_counter() - started:.4f}")
+print("BOOTED", file=sys.stderr, flush=True)
+import warmup
+warmup.run()
+for name, value in warmup.stats().items():
+    print(f"TASK {name} {value}")
+"""
+
+
+def parse_importtime(stderr: str):
+    """Microseconds spent importing each top-level package's own modules while app loads."""
+    packages = {}
+    for line in stderr.split("BOOTED")[0].splitlines():
+        match = _LINE.match(line)
+        if match:
+            name = match.group(4).split('.')[0]
+            packages[name] = packages.get(name, 0) + int(match.group(1))
+    return packages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ, WARMUP_MODE='lazy', CACHE_DIR=tempfile.mkdtemp(prefix="sarkari-startup-"))
+    for key in ('GOOGLE_API_KEY', 'SEARCH_ENGINE_ID', 'GEMINI_API_KEY',
+                'REDDIT_CLIENT_ID', 'REDDIT_CLIENT_SECRET', 'REDDIT_USER_AGENT'):
+        env.setdefault(key, 'offline-benchmark')
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', _CHILD],
+                            capture_output=True, text=True, env=env)
+    if result.returncode:
+        print(result.stderr[-2000:])
+        sys.exit(result.returncode)
+
+    boot = next(float(line.split()[1]) for line in result.stdout.splitlines() if line.startswith('BOOT '))
+    print(f"import app: {boot * 1000:.0f} ms")
+    print(f"\n{'package':28} {'self ms':>14}")
+    packages = parse_importtime(result.stderr)
+    for name, micros in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:28} {micros / 1000:>14.1f}")
+
+    print(f"\n{'warm-up task':28} {'ms':>14}")
+    for line in result.stdout.splitlines():
+        if not line.startswith('TASK '):
+            continue
+        _, name, value = line.split()
+        if name.endswith('_seconds') and name != 'boot_seconds':
+            print(f"{name[:-len('_seconds')]:28} {float(value) * 1000:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
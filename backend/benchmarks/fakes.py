@@ -0,0 +1,201 @@
+"""
+Offline stand-ins for the external clients, replaying recorded responses
+with configurable latency. install() registers them in the clients registry
+so agent.py runs unchanged without a network.
+"""
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+import clients
+from benchmarks import fixtures
+
+# Default simulated latencies in seconds, roughly what production sees.
+LATENCY = {
+    'cse': 0.35,
+    'http_first_byte': 0.25,
+    'http_per_mb': 0.40,
+    'gemini_first_token': 1.2,
+    'gemini_per_chunk': 0.08,
+    'reddit': 0.15,
+}
+
+
+class Latency:
+    """Sleeps for a base latency times `scale`, with +/-`jitter` spread."""
+
+    def __init__(self, scale=1.0, jitter=0.2, seed=1):
+        self.scale = scale
+        self.jitter = jitter
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def wait(self, name, factor=1.0):
+        with self._lock:
+            spread = 1 + self._rng.uniform(-self.jitter, self.jitter)
+        delay = LATENCY[name] * factor * self.scale * spread
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _slug(query):
+    return "-".join(query.lower().split())[:60] or "bill"
+
+
+class FakeSearchService:
+    """googleapiclient-shaped: service.cse().list(q=..., cx=..., num=...).execute()."""
+
+    def __init__(self, recorded, latency):
+        self.recorded = recorded
+        self.latency = latency
+
+    def cse(self):
+        return self
+
+    def list(self, q, cx=None, num=10):
+        if 'site:gov.in' in q:
+            kind = 'schemes'
+        elif 'latest news' in q:
+            kind = 'news'
+        else:
+            kind = 'bill_text'
+        items = [
+            {key: value.format(slug=_slug(q), year=2023) for key, value in item.items()}
+            for item in self.recorded[kind][:num]
+        ]
+        return SimpleNamespace(execute=lambda: self.latency.wait('cse') or {'items': items})
+
+
+class FakeResponse:
+    def __init__(self, body, content_type, latency):
+        self.body = body
+        self.headers = {'Content-Type': content_type, 'Content-Length': str(len(body))}
+        self.status_code = 200
+        self.latency = latency
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    @property
+    def content(self):
+        return self.body
+
+    @property
+    def text(self):
+        return self.body.decode('utf-8', errors='replace')
+
+    def iter_content(self, chunk_size=64 * 1024):
+        for start in range(0, len(self.body), chunk_size):
+            self.latency.wait('http_per_mb', chunk_size / (1024 * 1024))
+            yield self.body[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+class FakeHTTPSession:
+    """
+    Serves the PDF fixture for .pdf URLs (the older version when the URL names
+    a year, as comparison lookups do) and the HTML fixture for everything else.
+    """
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.pdf = fixtures.bill_pdf()
+        self.older_pdf = fixtures.bill_pdf(older=True)
+        self.html = fixtures.bill_html()
+
+    def get(self, url, headers=None, timeout=None, stream=False, **kwargs):
+        self.latency.wait('http_first_byte')
+        if url.lower().endswith('.pdf'):
+            body = self.older_pdf if re.search(r'-(?:19|20)\d\d\b', url) else self.pdf
+            return FakeResponse(body, 'application/pdf', self.latency)
+        return FakeResponse(self.html, 'text/html; charset=utf-8', self.latency)
+
+
+class FakeGeminiModel:
+    """generate_content() returning the recorded answer for the prompt's template."""
+
+    def __init__(self, recorded, latency):
+        self.recorded = recorded
+        self.latency = latency
+
+    def _answer(self, prompt):
+        if 'JSON list' in prompt:
+            return self.recorded['schemes']
+        if 'Impact Score' in prompt:
+            return self.recorded['impact']
+        if 'Compare these bills' in prompt:
+            return self.recorded['compare']
+        if 'Sarkari Mitra' in prompt:
+            return self.recorded['mitra']
+        return self.recorded['summary']
+
+    def generate_content(self, prompt, stream=False):
+        text = self._answer(prompt)
+        self.latency.wait('gemini_first_token')
+        chunks = [text[i:i + 200] for i in range(0, len(text), 200)]
+        if not stream:
+            self.latency.wait('gemini_per_chunk', len(chunks))
+            return SimpleNamespace(text=text)
+
+        def generate():
+            for chunk in chunks:
+                self.latency.wait('gemini_per_chunk')
+                yield SimpleNamespace(text=chunk)
+        return generate()
+
+
+class FakeReddit:
+    """praw-shaped: subreddit().search() and submission().comments."""
+
+    def __init__(self, recorded, latency):
+        self.recorded = recorded
+        self.latency = latency
+
+    def subreddit(self, name):
+        return self
+
+    def search(self, query, sort=None, time_filter=None, limit=25):
+        self.latency.wait('reddit')
+        posts = self.recorded['posts']
+        return [SimpleNamespace(id=str(i), title=posts[i % len(posts)]) for i in range(limit)]
+
+    def submission(self, id):
+        comments = self.recorded['comments']
+        offset = int(id)
+        bodies = [comments[(offset + i) % len(comments)] for i in range(8)]
+
+        def replace_more(limit=None):
+            self.latency.wait('reddit')
+
+        forest = SimpleNamespace(
+            replace_more=replace_more,
+            list=lambda: [SimpleNamespace(body=body) for body in bodies],
+        )
+        return SimpleNamespace(comments=forest)
+
+
+def install(scale: float = 1.0, jitter: float = 0.2):
+    """Points every client factory at the offline fakes. Returns the shared Latency."""
+    recorded = fixtures.recorded()
+    latency = Latency(scale, jitter)
+    search = FakeSearchService(recorded['cse'], latency)
+    session = FakeHTTPSession(latency)
+    reddit = FakeReddit(recorded['reddit'], latency)
+    model = FakeGeminiModel(recorded['gemini'], latency)
+    clients.override(
+        http=lambda: session,
+        search=lambda: search,
+        reddit=lambda: reddit,
+        gemini=lambda model_name: model,
+    )
+    return latency
@@ -0,0 +1,170 @@
+"""
+Deterministic fixtures of realistic size for the offline benchmarks: a bill
+PDF (80 pages, which takes the parallel extraction path) plus an older
+version of it for comparisons, an HTML page with the usual navigation and
+boilerplate around the bill's paragraphs, a larger gov.in-style portal page,
+and the recorded API responses in fixtures/recorded.json.
+"""
+import json
+import os
+import random
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+PDF_PAGES = 80
+LINES_PER_PAGE = 48
+HTML_PARAGRAPHS = 400
+
+_SUBJECTS = [
+    "the Data Fiduciary", "a Data Principal", "the Board", "the Central Government",
+    "a Consent Manager", "a Significant Data Fiduciary", "the appropriate authority", "any person",
+]
+_VERBS = [
+    "shall process personal data only for", "may, by notification, exempt", "shall take reasonable security safeguards to prevent",
+    "shall have the right to obtain", "shall, within such period as may be prescribed, furnish", "may impose a penalty for",
+    "shall erase personal data relating to", "shall not be liable for",
+]
+_OBJECTS = [
+    "a lawful purpose for which the Data Principal has given consent", "any breach of personal data",
+    "a summary of personal data being processed", "the processing of personal data of a child",
+    "such information as the Board may require", "the grievance redressal mechanism",
+    "the purposes specified in the Schedule", "any transfer of personal data outside India",
+]
+
+
+def _sentence(rng):
+    return f"{rng.choice(_SUBJECTS).capitalize()} {rng.choice(_VERBS)} {rng.choice(_OBJECTS)}."
+
+
+def bill_lines(n_lines, seed=7, older=False):
+    """
+    Bill-like lines: numbered sections, lettered clauses and long sentences.
+    `older` gives an earlier version of the same bill in which every ninth
+    section reads differently.
+    """
+    rng = random.Random(seed)
+    older_rng = random.Random(seed + 1)
+    lines, section = [], 0
+    while len(lines) < n_lines:
+        section += 1
+        lines.append(f"{section}. Obligations under this Act, part {section}.")
+        for clause in "abcdefgh"[:rng.randint(3, 8)]:
+            text = f"({clause}) {_sentence(rng)} {_sentence(rng)}"
+            if older and section % 9 == 0:
+                text = f"({clause}) {_sentence(older_rng)} {_sentence(older_rng)}"
+            lines.append(text)
+    return lines[:n_lines]
+
+
+def _escape_pdf(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def make_pdf(pages) -> bytes:
+    """Minimal valid PDF with one Helvetica text stream per page."""
+    n = len(pages)
+    kids = ' '.join(f'{4 + 2 * i} 0 R' for i in range(n))
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        f'<< /Type /Pages /Kids [{kids}] /Count {n} >>'.encode(),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    for i, lines in enumerate(pages):
+        objects.append(
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+            f'/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>'.encode()
+        )
+        body = 'BT /F1 8 Tf 10 TL 40 770 Td ' + ' '.join(f"({_escape_pdf(line)}) '" for line in lines) + ' ET'
+        data = body.encode('latin-1')
+        objects.append(b'<< /Length %d >>\nstream\n' % len(data) + data + b'\nendstream')
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for i, obj in enumerate(objects):
+        offsets.append(len(out))
+        out += f'{i + 1} 0 obj\n'.encode() + obj + b'\nendobj\n'
+    xref = len(out)
+    out += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    for offset in offsets:
+        out += f'{offset:010d} 00000 n \n'.encode()
+    out += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode()
+    return bytes(out)
+
+
+def bill_pdf(older=False) -> bytes:
+    lines = bill_lines(PDF_PAGES * (LINES_PER_PAGE - 2), older=older)
+    pages = []
+    for page in range(PDF_PAGES):
+        body = lines[page * (LINES_PER_PAGE - 2):(page + 1) * (LINES_PER_PAGE - 2)]
+        # Running header and page number, as in gazette prints.
+        pages.append(["THE GAZETTE OF INDIA EXTRAORDINARY [PART II-SEC. 1]", *body, f"{page + 1}"])
+    return make_pdf(pages)
+
+
+def bill_html() -> bytes:
+    nav = "".join(f'<li><a href="/section/{i}">Section {i}</a></li>' for i in range(60))
+    paragraphs = "".join(f"<p>{line}</p>\n" for line in bill_lines(HTML_PARAGRAPHS, seed=11))
+    page = (
+        "<!DOCTYPE html><html><head><title>Bill text</title>"
+        "<style>" + "body{font-family:sans-serif}" * 200 + "</style>"
+        "<script>" + "var tracking = {};" * 300 + "</script></head><body>"
+        f"<header><nav><ul>{nav}</ul></nav></header>"
+        f"<main><article><h1>The Digital Personal Data Protection Bill</h1>{paragraphs}</article></main>"
+        "<footer><p>Copyright. All rights reserved. Terms of use. Privacy policy.</p></footer>"
+        "</body></html>"
+    )
+    return page.encode('utf-8')
+
+
+def portal_html(sections=120) -> bytes:
+    """
+    A bill page laid out like a large gov.in portal: accessibility bar, mega
+    menu, breadcrumbs, a link-heavy sidebar and footer around a content area
+    where the bill text sits in nested divs and tables rather than <p> tags.
+    """
+    rng = random.Random(13)
+    menu = "".join(
+        f'<li class="dropdown"><a href="/m/{i}">Ministry Menu {i}</a><ul>'
+        + "".join(f'<li><a href="/m/{i}/{j}">Division {i}.{j} of the Department</a></li>' for j in range(12))
+        + "</ul></li>"
+        for i in range(14)
+    )
+    sidebar = "".join(f'<li><a href="/notice/{i}">Notice regarding tender number {1000 + i}</a></li>' for i in range(80))
+    footer = "".join(f'<a href="/f/{i}">Footer link {i}</a> | ' for i in range(60))
+    body = []
+    for section in range(1, sections + 1):
+        clauses = "".join(
+            f"<tr><td>({clause})</td><td>{_sentence(rng)} {_sentence(rng)}</td></tr>"
+            for clause in "abcde"[:rng.randint(2, 5)]
+        )
+        body.append(f'<div class="section"><h3>{section}. Obligations under this Act, part {section}.</h3>'
+                    f'<table class="clauses">{clauses}</table></div>')
+    page = (
+        '<!DOCTYPE html><html lang="en"><head><meta charset="utf-8"><title>Bill | Government of India</title>'
+        + '<link rel="stylesheet" href="/s.css">' * 20
+        + "<style>" + ".menu li a{color:#036}" * 400 + "</style>"
+        + "<script>" + "window.dataLayer=window.dataLayer||[];" * 500 + "</script></head><body>"
+        '<div class="access-bar"><a href="#main">Skip to main content</a> <a href="#">Screen Reader Access</a> '
+        '<a href="#">A-</a> <a href="#">A</a> <a href="#">A+</a> <a href="/hi">हिन्दी</a></div>'
+        f'<div id="mega-menu"><ul>{menu}</ul></div>'
+        '<div class="breadcrumb"><a href="/">Home</a> &gt; <a href="/acts">Acts &amp; Rules</a> &gt; Bill</div>'
+        '<div class="container"><div class="row">'
+        f'<div class="col-3 sidebar"><h4>Latest Notices</h4><ul>{sidebar}</ul></div>'
+        '<div class="col-9" id="main"><h1>The Digital Personal Data Protection Bill</h1>'
+        '<div class="content">' + "".join(body) + "</div></div></div></div>"
+        f'<div class="site-footer"><div>{footer}</div><div>Content owned by the Ministry. '
+        "Last updated on 01-01-2024. Visitors: 1234567</div></div>"
+        "</body></html>"
+    )
+    return page.encode('utf-8')
+
+
+def recorded() -> dict:
+    with open(os.path.join(FIXTURE_DIR, "recorded.json"), encoding='utf-8') as f:
+        return json.load(f)
+
+
+if __name__ == '__main__':
+    print(f"PDF:  {len(bill_pdf()) / 1024:8.1f} KiB, {PDF_PAGES} pages")
+    print(f"HTML: {len(bill_html()) / 1024:8.1f} KiB, {HTML_PARAGRAPHS} paragraphs")
+    print(f"Portal page: {len(portal_html()) / 1024:8.1f} KiB")
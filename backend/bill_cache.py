@@ -0,0 +1,185 @@
+import hashlib
+import re
+import sys
+import time
+
+import metrics
+from storage import get_connection
+
+# Load Configuration
+try:
+    from config import BILL_CACHE_TTL, BILL_CACHE_MAX_ENTRIES, BILL_CACHE_MAX_BYTES
+except ImportError:
+    BILL_CACHE_TTL, BILL_CACHE_MAX_ENTRIES, BILL_CACHE_MAX_BYTES = 7 * 24 * 3600, 2000, 512 * 1024 * 1024
+
+DB_FILE = "bill_cache.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS contents (
+    hash TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    url TEXT,
+    hash TEXT NOT NULL REFERENCES contents(hash),
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed_at);
+"""
+
+_initialized = False
+
+
+def _db():
+    global _initialized
+    conn = get_connection(DB_FILE)
+    if not _initialized:
+        conn.executescript(_SCHEMA)
+        _initialized = True
+    return conn
+
+
+def normalize_bill_name(bill_name: str) -> str:
+    """'The  Digital Personal Data Protection Bill, 2023' -> 'the digital personal data protection bill 2023'"""
+    return " ".join(re.sub(r'[^\w\s]', ' ', bill_name.lower()).split())
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def get(bill_name: str, track: bool = True):
+    """
+    Returns the cached {'text', 'url', 'error'} for a bill, or None on a miss.
+    Expired entries are treated as misses and removed. track=False leaves the
+    hit/miss metrics alone, for re-checking a lookup that was already counted.
+    """
+    key = normalize_bill_name(bill_name)
+    conn = _db()
+    row = conn.execute(
+        "SELECT e.url, e.created_at, c.text FROM entries e JOIN contents c ON c.hash = e.hash WHERE e.key = ?",
+        (key,)
+    ).fetchone()
+    if row is None:
+        if track:
+            metrics.cache_lookup('bill_text', False)
+        return None
+
+    now = time.time()
+    if now - row['created_at'] > BILL_CACHE_TTL:
+        invalidate(bill_name)
+        if track:
+            metrics.cache_lookup('bill_text', False)
+        return None
+
+    conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+    if track:
+        metrics.cache_lookup('bill_text', True)
+    return {'text': row['text'], 'url': row['url'], 'error': None}
+
+
+def put(bill_name: str, url: str, text: str):
+    """Stores a resolved bill. Identical texts found under different names are stored once."""
+    key = normalize_bill_name(bill_name)
+    digest = content_hash(text)
+    now = time.time()
+    conn = _db()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            "INSERT OR IGNORE INTO contents (hash, text, size) VALUES (?, ?, ?)",
+            (digest, text, len(text.encode('utf-8')))
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO entries (key, url, hash, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+            (key, url, digest, now, now)
+        )
+        _evict(conn, now)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _evict(conn, now):
+    """Drops expired entries, then least-recently-used ones until both size limits hold."""
+    conn.execute("DELETE FROM entries WHERE created_at < ?", (now - BILL_CACHE_TTL,))
+
+    count = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+    if count > BILL_CACHE_MAX_ENTRIES:
+        conn.execute(
+            "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed_at LIMIT ?)",
+            (count - BILL_CACHE_MAX_ENTRIES,)
+        )
+
+    conn.execute("DELETE FROM contents WHERE hash NOT IN (SELECT hash FROM entries)")
+
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM contents").fetchone()[0]
+    if total <= BILL_CACHE_MAX_BYTES:
+        return
+    for row in conn.execute(
+        "SELECT e.key, c.size, c.hash FROM entries e JOIN contents c ON c.hash = e.hash ORDER BY e.accessed_at"
+    ).fetchall():
+        conn.execute("DELETE FROM entries WHERE key = ?", (row['key'],))
+        still_used = conn.execute("SELECT 1 FROM entries WHERE hash = ? LIMIT 1", (row['hash'],)).fetchone()
+        if not still_used:
+            conn.execute("DELETE FROM contents WHERE hash = ?", (row['hash'],))
+            total -= row['size']
+        if total <= BILL_CACHE_MAX_BYTES:
+            break
+
+
+def invalidate(bill_name: str = None):
+    """Removes one bill from the cache, or everything when no name is given."""
+    conn = _db()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if bill_name is None:
+            conn.execute("DELETE FROM entries")
+        else:
+            conn.execute("DELETE FROM entries WHERE key = ?", (normalize_bill_name(bill_name),))
+        conn.execute("DELETE FROM contents WHERE hash NOT IN (SELECT hash FROM entries)")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def prewarm(bill_names, refresh: bool = False) -> dict:
+    """
+    Resolves each bill through the normal agent path so later lookups are local.
+    With refresh=True existing entries are fetched again.
+    """
+    from agent import get_bill_text_from_web
+
+    report = {}
+    for name in bill_names:
+        if refresh:
+            invalidate(name)
+        data = get_bill_text_from_web(name)
+        report[name] = data.get('error') or data.get('url')
+    return report
+
+
+def stats() -> dict:
+    conn = _db()
+    entries = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+    contents, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM contents").fetchone()
+    return {'entries': entries, 'unique_texts': contents, 'bytes': size}
+
+
+if __name__ == '__main__':
+    # Usage: python bill_cache.py prewarm "Bill A" "Bill B" | invalidate ["Bill A"] | stats
+    command, names = (sys.argv[1] if len(sys.argv) > 1 else 'stats'), sys.argv[2:]
+    if command == 'prewarm':
+        for name, outcome in prewarm(names).items():
+            print(f"{name}: {outcome}")
+    elif command == 'invalidate':
+        for name in names or [None]:
+            invalidate(name)
+        print("Invalidated.")
+    else:
+        print(stats())
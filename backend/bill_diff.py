@@ -0,0 +1,127 @@
+import difflib
+import hashlib
+import re
+
+from compaction import count_tokens, fit_to_budget
+from kv_cache import KVCache
+from retrieval import get_index, section_spans
+
+# Load Configuration
+try:
+    from config import BILL_CACHE_TTL, BILL_CACHE_MAX_ENTRIES
+except ImportError:
+    BILL_CACHE_TTL, BILL_CACHE_MAX_ENTRIES = 7 * 24 * 3600, 2000
+
+# Replaced sections less similar than this are reported as a removal plus an addition.
+MODIFIED_MIN_RATIO = 0.35
+SIMILARITY_MAX_WORDS = 4000
+
+# Section hashes per compacted bill text, so comparing against a known base version only
+# has to split and hash the new one.
+_section_cache = KVCache('bill_sections', ttl=BILL_CACHE_TTL, max_entries=BILL_CACHE_MAX_ENTRIES)
+
+# A section's own number changes whenever an earlier section is inserted or dropped.
+_LEADING_NUMBER = re.compile(r'^\s*(?:section\s+)?(?:\d{1,3}[a-z]?\.|\(\d{1,3}\))\s*', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _section_hash(section: str) -> str:
+    normalized = _WHITESPACE.sub(' ', _LEADING_NUMBER.sub('', section)).strip().lower()
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+def sections(bill_text: str):
+    """
+    Returns (compacted text, [(start, end, hash), ...]) for a bill. The compacted
+    text comes from the retrieval index cache; the spans and hashes from the
+    shared section cache.
+    """
+    text = get_index(bill_text).text
+    key = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    try:
+        cached = _section_cache.get(key)
+    except Exception as e:
+        print(f"AGENT: Section cache unavailable. Error: {e}")
+        cached = None
+    if cached is not None:
+        return text, [tuple(entry) for entry in cached]
+
+    entries = [(a, b, _section_hash(text[a:b])) for a, b in section_spans(text)]
+    try:
+        _section_cache.set(key, entries)
+    except Exception as e:
+        print(f"AGENT: Could not cache sections. Error: {e}")
+    return text, entries
+
+
+def _similarity(old: str, new: str) -> float:
+    matcher = difflib.SequenceMatcher(None, old.split(), new.split(), autojunk=False)
+    # The exact ratio is quadratic; unstructured texts that come out as one huge
+    # "section" are compared by word overlap only.
+    if len(matcher.a) + len(matcher.b) > SIMILARITY_MAX_WORDS:
+        return matcher.quick_ratio()
+    return matcher.ratio()
+
+
+def _changed_lines(old: str, new: str) -> str:
+    """The heading of a modified section followed by only its differing lines, diff-style."""
+    old_lines, new_lines = old.splitlines(), new.splitlines()
+    lines = [new_lines[0]]
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op != 'equal':
+            lines.extend(f"- {line}" for line in old_lines[i1:i2])
+            lines.extend(f"+ {line}" for line in new_lines[j1:j2])
+    return "\n".join(lines)
+
+
+def diff_sections(old_text: str, new_text: str):
+    """
+    Aligns the sections of two bill versions by hash and returns the changes,
+    in document order, as (kind, old_section, new_section) with kind one of
+    'added', 'removed' or 'modified'. Unchanged and merely renumbered
+    sections are left out.
+    """
+    old_full, old_entries = sections(old_text)
+    new_full, new_entries = sections(new_text)
+    old_sections = [old_full[a:b].strip() for a, b, _ in old_entries]
+    new_sections = [new_full[a:b].strip() for a, b, _ in new_entries]
+
+    matcher = difflib.SequenceMatcher(None, [h for _, _, h in old_entries], [h for _, _, h in new_entries], autojunk=False)
+    changes = []
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op == 'equal':
+            continue
+        olds, news = old_sections[i1:i2], new_sections[j1:j2]
+        # Pair replaced sections in order while they still look like edits of each other.
+        while olds and news and _similarity(olds[0], news[0]) >= MODIFIED_MIN_RATIO:
+            changes.append(('modified', olds.pop(0), news.pop(0)))
+        changes.extend(('removed', old, None) for old in olds)
+        changes.extend(('added', None, new) for new in news)
+    return changes
+
+
+def render_changes(changes, budget_tokens: int) -> str:
+    """
+    Formats the changes for a prompt, fitting them into `budget_tokens`. Each
+    change gets at most an even share of the budget so one long schedule
+    cannot crowd out the rest; changes that still don't fit are counted.
+    """
+    if not changes:
+        return ""
+    share = max(60, budget_tokens // len(changes))
+    lines, used = [], 0
+    for n, (kind, old, new) in enumerate(changes):
+        if kind == 'modified':
+            block = f"MODIFIED (- old, + new)\n{fit_to_budget(_changed_lines(old, new), share)}"
+        elif kind == 'added':
+            block = f"ADDED\nNEW: {fit_to_budget(new, share)}"
+        else:
+            block = f"REMOVED\nOLD: {fit_to_budget(old, share)}"
+        size = count_tokens(block) + 1
+        if used + size > budget_tokens:
+            lines.append(f"({len(changes) - n} more changed sections omitted)")
+            break
+        lines.append(block)
+        used += size
+    return "\n\n".join(lines)
@@ -0,0 +1,197 @@
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Load Configuration
+try:
+    from config import (
+        GOOGLE_API_KEY, GEMINI_API_KEY,
+        REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USER_AGENT
+    )
+except ImportError:
+    GOOGLE_API_KEY, GEMINI_API_KEY = None, None
+    REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USER_AGENT = None, None, None
+
+try:
+    from config import FETCH_MAX_WORKERS
+except ImportError:
+    FETCH_MAX_WORKERS = 10
+
+# Client registry: every external client is built once per worker process and
+# reused. Clients that are not thread-safe (googleapiclient's httplib2
+# transport, praw) get one instance per thread, built from shared state.
+# The client libraries themselves are imported on first use, so a worker
+# boots without them and only pays for the ones its requests need.
+
+# Looked up relative to the repo root first, then to backend/.
+FIREBASE_KEY_PATHS = ("backend/firebase-key.json", "firebase-key.json")
+
+_lock = threading.RLock()
+_local = threading.local()
+_http_session = None
+_reddit_session = None
+_search_discovery_doc = None
+_gemini_models = {}
+_gemini_configured = False
+_firebase_ready = False
+_firebase_app = None
+_firestore = None
+# Factories registered through override() replace the real clients (offline benchmarks).
+_overrides = {}
+
+
+def override(**factories):
+    """
+    Swaps client factories by name: http, search, reddit, gemini. Each takes
+    the same arguments as its get_* function. Used to run the agent offline.
+    """
+    _overrides.update(factories)
+
+
+def get_http_session() -> requests.Session:
+    """Shared keep-alive session for scraping and any other plain HTTP calls."""
+    global _http_session
+    if 'http' in _overrides:
+        return _overrides['http']()
+    if _http_session is None:
+        with _lock:
+            if _http_session is None:
+                _http_session = _new_session()
+    return _http_session
+
+
+def _new_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=20, pool_maxsize=max(FETCH_MAX_WORKERS, 20))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def _get_reddit_session() -> requests.Session:
+    """
+    Keep-alive session for praw only: prawcore overwrites the session's
+    User-Agent, which must not leak into scraping and search requests.
+    """
+    global _reddit_session
+    if _reddit_session is None:
+        with _lock:
+            if _reddit_session is None:
+                _reddit_session = _new_session()
+    return _reddit_session
+
+
+def _get_search_discovery_doc() -> str:
+    """The Custom Search discovery document, fetched over the network once per process."""
+    global _search_discovery_doc
+    if _search_discovery_doc is None:
+        with _lock:
+            if _search_discovery_doc is None:
+                from googleapiclient.discovery import V2_DISCOVERY_URI
+                from googleapiclient.discovery_cache import get_static_doc
+
+                url = V2_DISCOVERY_URI.format(api='customsearch', apiVersion='v1')
+                try:
+                    response = get_http_session().get(url, timeout=10)
+                    response.raise_for_status()
+                    _search_discovery_doc = response.text
+                except Exception as e:
+                    print(f"AGENT: Could not fetch Custom Search discovery document, using bundled copy. Error: {e}")
+                    _search_discovery_doc = get_static_doc('customsearch', 'v1')
+    return _search_discovery_doc
+
+
+def get_search_service():
+    """This thread's Google Custom Search client (no discovery round trip after the first)."""
+    if 'search' in _overrides:
+        return _overrides['search']()
+    service = getattr(_local, 'search_service', None)
+    if service is None:
+        from googleapiclient.discovery import build_from_document
+
+        service = build_from_document(_get_search_discovery_doc(), developerKey=GOOGLE_API_KEY)
+        _local.search_service = service
+    return service
+
+
+def get_reddit():
+    """This thread's praw.Reddit client, on a pooled session of its own."""
+    if 'reddit' in _overrides:
+        return _overrides['reddit']()
+    reddit = getattr(_local, 'reddit', None)
+    if reddit is None:
+        import praw
+
+        reddit = praw.Reddit(
+            client_id=REDDIT_CLIENT_ID,
+            client_secret=REDDIT_CLIENT_SECRET,
+            user_agent=REDDIT_USER_AGENT,
+            requestor_kwargs={'session': _get_reddit_session()},
+        )
+        _local.reddit = reddit
+    return reddit
+
+
+def get_gemini_model(model_name: str):
+    """Shared GenerativeModel per model name."""
+    global _gemini_configured
+    if 'gemini' in _overrides:
+        return _overrides['gemini'](model_name)
+    model = _gemini_models.get(model_name)
+    if model is None:
+        import google.generativeai as genai
+
+        with _lock:
+            if not _gemini_configured and GEMINI_API_KEY:
+                genai.configure(api_key=GEMINI_API_KEY)
+                _gemini_configured = True
+            model = _gemini_models.get(model_name)
+            if model is None:
+                model = _gemini_models[model_name] = genai.GenerativeModel(model_name)
+    return model
+
+
+def get_firebase_app():
+    """
+    The default Firebase app, initialized from firebase-key.json on first use.
+    Returns None when the key is missing or initialization fails.
+    """
+    global _firebase_ready
+    if not _firebase_ready:
+        with _lock:
+            if not _firebase_ready:
+                _init_firebase()
+                _firebase_ready = True
+    return _firebase_app
+
+
+def _init_firebase():
+    global _firebase_app, _firestore
+    key_path = next((path for path in FIREBASE_KEY_PATHS if os.path.exists(path)), None)
+    if key_path is None:
+        print("AGENT CRITICAL WARNING: 'firebase-key.json' not found. DB features will fail.")
+        return
+    try:
+        import firebase_admin
+        from firebase_admin import credentials, firestore
+
+        _firebase_app = firebase_admin.initialize_app(credentials.Certificate(key_path))
+        _firestore = firestore.client(_firebase_app)
+        print("AGENT: Firebase connected successfully.")
+    except Exception as e:
+        print(f"AGENT ERROR: Firebase initialization error: {e}")
+
+
+def get_firestore():
+    """Shared Firestore client, or None when Firebase isn't configured."""
+    get_firebase_app()
+    return _firestore
+
+
+def get_firebase_auth():
+    """The firebase_admin.auth module, with the Firebase app initialized."""
+    get_firebase_app()
+    from firebase_admin import auth
+    return auth
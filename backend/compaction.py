@@ -0,0 +1,101 @@
+import math
+import re
+import unicodedata
+from collections import Counter
+
+# A line repeated this many times is a running header, footer or
+# site boilerplate rather than bill content.
+REPEAT_THRESHOLD = 3
+# Only short lines of a few words are treated as boilerplate; repeated
+# clauses and markers such as "Explanation." are kept.
+BOILERPLATE_MAX_CHARS = 200
+BOILERPLATE_MIN_WORDS = 3
+
+_CONTROL = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f\u200b-\u200f\ufeff]')
+_HYPHEN_BREAK = re.compile(r'(\w)-\n(\w)')
+_SPACES = re.compile(r'[ \t\xa0]+')
+_BLANK_LINES = re.compile(r'\n{3,}')
+# Page numbers, "Page 3 of 40", margin line numbers and similar lines with no words.
+_NOISE_LINE = re.compile(r'^[-|\s]*(?:page\s*)?\d{1,4}(?:\s*(?:of|/)\s*\d{1,4})?[-|\s]*$', re.IGNORECASE)
+_EDGE_DIGITS = re.compile(r'^[\d\s]+|[\d\s]+$')
+
+# Token estimate: words cost about one token per five letters, numbers about
+# one per three digits, and every other non-space character one token.
+_TOKEN_PIECES = re.compile(r'[^\W\d_]+|\d+|[^\w\s]|_', re.UNICODE)
+
+
+def count_tokens(text: str) -> int:
+    """Fast local estimate of how many tokens Gemini will count for `text`."""
+    if not text:
+        return 0
+    total = 0
+    for piece in _TOKEN_PIECES.findall(text):
+        if piece.isascii():
+            total += math.ceil(len(piece) / (3 if piece.isdigit() else 5))
+        else:
+            # Devanagari and other scripts tokenize far less efficiently.
+            total += math.ceil(len(piece) / 2)
+    return total
+
+
+def _is_boilerplate_candidate(line):
+    return len(line) <= BOILERPLATE_MAX_CHARS and len(line.split()) >= BOILERPLATE_MIN_WORDS
+
+
+def _boilerplate_key(line):
+    # Running headers differ only by a page number at either end, which PyPDF2
+    # often glues onto the next page's header. Numbers inside the line are kept
+    # so headings like "Amendment of section 5." stay distinct.
+    return _EDGE_DIGITS.sub('', line.lower()).strip()
+
+
+def compact_text(text: str) -> str:
+    """
+    Normalizes scraped bill text: drops control characters, rejoins words
+    hyphenated across lines, removes page-number/line-number lines and
+    running headers, footers or site boilerplate (keeping their first
+    occurrence), and collapses whitespace runs.
+    """
+    if not text:
+        return ""
+    text = unicodedata.normalize('NFKC', text)
+    text = _CONTROL.sub('', text.replace('\r\n', '\n').replace('\r', '\n'))
+    text = _HYPHEN_BREAK.sub(r'\1\2', text)
+    text = _SPACES.sub(' ', text)
+
+    lines = [line.strip() for line in text.split('\n')]
+    counts = Counter(_boilerplate_key(line) for line in lines if _is_boilerplate_candidate(line))
+
+    kept, seen = [], set()
+    for line in lines:
+        if _NOISE_LINE.match(line):
+            continue
+        if _is_boilerplate_candidate(line):
+            key = _boilerplate_key(line)
+            if counts[key] >= REPEAT_THRESHOLD:
+                if key in seen:
+                    continue
+                seen.add(key)
+        kept.append(line)
+
+    return _BLANK_LINES.sub('\n\n', '\n'.join(kept)).strip()
+
+
+def fit_to_budget(text: str, budget_tokens: int) -> str:
+    """Cuts `text` to at most `budget_tokens`, preferring to end at a sentence or line break."""
+    if count_tokens(text) <= budget_tokens:
+        return text
+    # Start from the character estimate and shrink until the count fits.
+    end = min(len(text), budget_tokens * 4)
+    while end > 0 and count_tokens(text[:end]) > budget_tokens:
+        end = int(end * 0.9)
+    cut = text[:end]
+    boundary = max(cut.rfind('. '), cut.rfind('\n'))
+    if boundary > end * 0.8:
+        cut = cut[:boundary + 1]
+    return cut.rstrip()
+
+
+def tidy_prompt(prompt: str) -> str:
+    """Drops the source-code indentation and trailing spaces of an f-string prompt template."""
+    return "\n".join(line.strip() for line in prompt.strip().splitlines())
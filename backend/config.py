@@ -11,4 +11,114 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
 REDDIT_CLIENT_ID = os.getenv("REDDIT_CLIENT_ID")
 REDDIT_CLIENT_SECRET = os.getenv("REDDIT_CLIENT_SECRET")
-REDDIT_USER_AGENT = os.getenv("REDDIT_USER_AGENT")
\ No newline at end of file
+REDDIT_USER_AGENT = os.getenv("REDDIT_USER_AGENT")
+
+## Analysis pipeline tuning
+ANALYZE_MAX_WORKERS = int(os.getenv("ANALYZE_MAX_WORKERS", "16"))
+ANALYZE_STAGE_TIMEOUT = float(os.getenv("ANALYZE_STAGE_TIMEOUT", "45"))
+SENTIMENT_STAGE_TIMEOUT = float(os.getenv("SENTIMENT_STAGE_TIMEOUT", "20"))
+NEWS_STAGE_TIMEOUT = float(os.getenv("NEWS_STAGE_TIMEOUT", "10"))
+FETCH_MAX_WORKERS = int(os.getenv("FETCH_MAX_WORKERS", "10"))
+SOURCE_RACE_GRACE = float(os.getenv("SOURCE_RACE_GRACE", "1.5"))
+SCRAPE_MAX_HTML_BYTES = int(os.getenv("SCRAPE_MAX_HTML_BYTES", str(5 * 1024 * 1024)))
+SCRAPE_MAX_PDF_BYTES = int(os.getenv("SCRAPE_MAX_PDF_BYTES", str(50 * 1024 * 1024)))
+
+
+## PDF extraction
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "200000"))
+
+
+## Sentiment scoring ('lexicon' or 'textblob')
+SENTIMENT_ENGINE = os.getenv("SENTIMENT_ENGINE", "lexicon")
+REDDIT_MAX_WORKERS = int(os.getenv("REDDIT_MAX_WORKERS", "6"))
+REDDIT_REQUESTS_PER_MINUTE = int(os.getenv("REDDIT_REQUESTS_PER_MINUTE", "90"))
+REDDIT_BURST = int(os.getenv("REDDIT_BURST", "60"))
+REDDIT_POSTS_PER_SEARCH = int(os.getenv("REDDIT_POSTS_PER_SEARCH", "25"))
+SENTIMENT_CACHE_TTL = int(os.getenv("SENTIMENT_CACHE_TTL", str(3 * 3600)))
+SENTIMENT_REFRESH_INTERVAL = int(os.getenv("SENTIMENT_REFRESH_INTERVAL", "600"))
+SENTIMENT_TRENDING_MIN_HITS = int(os.getenv("SENTIMENT_TRENDING_MIN_HITS", "3"))
+
+
+## Prompt token budgets (compacted bill text per prompt, chat history for Sarkari Mitra,
+## changed sections for comparisons)
+SUMMARY_CONTEXT_TOKENS = int(os.getenv("SUMMARY_CONTEXT_TOKENS", "1000"))
+IMPACT_CONTEXT_TOKENS = int(os.getenv("IMPACT_CONTEXT_TOKENS", "1000"))
+MITRA_CONTEXT_TOKENS = int(os.getenv("MITRA_CONTEXT_TOKENS", "1500"))
+MITRA_HISTORY_TOKENS = int(os.getenv("MITRA_HISTORY_TOKENS", "600"))
+COMPARE_DIFF_TOKENS = int(os.getenv("COMPARE_DIFF_TOKENS", "1500"))
+
+
+## Server-side bill sessions for Sarkari Mitra chat
+SESSION_TTL = int(os.getenv("SESSION_TTL", str(2 * 3600)))
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "500"))
+SESSION_MAX_TURNS = int(os.getenv("SESSION_MAX_TURNS", "6"))
+
+
+## Background analysis jobs
+JOB_MAX_WORKERS = int(os.getenv("JOB_MAX_WORKERS", "4"))
+JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", "50"))
+JOB_TIMEOUT = int(os.getenv("JOB_TIMEOUT", "600"))
+JOB_RETENTION = int(os.getenv("JOB_RETENTION", str(24 * 3600)))
+
+
+## Single-flight request coalescing (seconds a worker may hold a computation lease)
+SINGLEFLIGHT_LEASE_TTL = int(os.getenv("SINGLEFLIGHT_LEASE_TTL", "180"))
+
+
+## Scheme catalogue (ingest with: python schemes_index.py ingest schemes.json)
+SCHEME_MATCH_LIMIT = int(os.getenv("SCHEME_MATCH_LIMIT", "3"))
+SCHEME_CACHE_TTL = int(os.getenv("SCHEME_CACHE_TTL", str(24 * 3600)))
+SCHEME_CACHE_MAX_ENTRIES = int(os.getenv("SCHEME_CACHE_MAX_ENTRIES", "5000"))
+
+
+## Verified ID-token cache
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+
+
+## Analysis history (write-behind to Firestore, cached reads)
+HISTORY_BATCH_SIZE = int(os.getenv("HISTORY_BATCH_SIZE", "100"))
+HISTORY_FLUSH_INTERVAL = float(os.getenv("HISTORY_FLUSH_INTERVAL", "1.0"))
+HISTORY_CACHE_TTL = int(os.getenv("HISTORY_CACHE_TTL", "3600"))
+HISTORY_CACHE_MAX_USERS = int(os.getenv("HISTORY_CACHE_MAX_USERS", "5000"))
+
+
+## Batch pre-analysis (python batch_analysis.py run bills.txt, or POST /api/admin/batch-analysis)
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+BATCH_RESULT_TTL = int(os.getenv("BATCH_RESULT_TTL", str(6 * 3600)))
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+
+## Outbound call governor (per-provider rate limits and concurrency caps, retries, circuit breakers)
+GEMINI_REQUESTS_PER_MINUTE = int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "120"))
+GEMINI_BURST = int(os.getenv("GEMINI_BURST", "20"))
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "16"))
+CSE_REQUESTS_PER_MINUTE = int(os.getenv("CSE_REQUESTS_PER_MINUTE", "100"))
+CSE_BURST = int(os.getenv("CSE_BURST", "10"))
+CSE_MAX_CONCURRENCY = int(os.getenv("CSE_MAX_CONCURRENCY", "8"))
+REDDIT_MAX_CONCURRENCY = int(os.getenv("REDDIT_MAX_CONCURRENCY", "8"))
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "0.5"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "8"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))
+GOVERNOR_WAIT_TIMEOUT = float(os.getenv("GOVERNOR_WAIT_TIMEOUT", "15"))
+
+
+## Worker startup (client libraries load on first use; WARMUP_MODE is background, eager or lazy)
+WARMUP_MODE = os.getenv("WARMUP_MODE", "background")
+WARMUP_TASKS = tuple(t.strip() for t in os.getenv("WARMUP_TASKS", "firebase,gemini,search,reddit,pdf,html,sentiment").split(",") if t.strip())
+
+
+## Metrics (sample rate for per-span JSON log lines; 0 disables them)
+METRICS_SAMPLE_RATE = float(os.getenv("METRICS_SAMPLE_RATE", "0"))
+METRICS_SERVER_TIMING = os.getenv("METRICS_SERVER_TIMING", "false").lower() == "true"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+
+## Local cache storage
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache"))
+BILL_CACHE_TTL = int(os.getenv("BILL_CACHE_TTL", str(7 * 24 * 3600)))
+BILL_CACHE_MAX_ENTRIES = int(os.getenv("BILL_CACHE_MAX_ENTRIES", "2000"))
+BILL_CACHE_MAX_BYTES = int(os.getenv("BILL_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+GEN_CACHE_TTL = int(os.getenv("GEN_CACHE_TTL", str(30 * 24 * 3600)))
+GEN_CACHE_MAX_ENTRIES = int(os.getenv("GEN_CACHE_MAX_ENTRIES", "5000"))
\ No newline at end of file
@@ -0,0 +1,292 @@
+import contextvars
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+import metrics
+from ratelimit import TokenBucket
+
+# Load Configuration
+try:
+    from config import (
+        GEMINI_REQUESTS_PER_MINUTE, GEMINI_BURST, GEMINI_MAX_CONCURRENCY,
+        CSE_REQUESTS_PER_MINUTE, CSE_BURST, CSE_MAX_CONCURRENCY,
+        REDDIT_REQUESTS_PER_MINUTE, REDDIT_BURST, REDDIT_MAX_CONCURRENCY, REDDIT_POSTS_PER_SEARCH
+    )
+except ImportError:
+    GEMINI_REQUESTS_PER_MINUTE, GEMINI_BURST, GEMINI_MAX_CONCURRENCY = 120, 20, 16
+    CSE_REQUESTS_PER_MINUTE, CSE_BURST, CSE_MAX_CONCURRENCY = 100, 10, 8
+    REDDIT_REQUESTS_PER_MINUTE, REDDIT_BURST, REDDIT_MAX_CONCURRENCY = 90, 60, 8
+    REDDIT_POSTS_PER_SEARCH = 25
+
+try:
+    from config import (
+        RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY,
+        BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT, GOVERNOR_WAIT_TIMEOUT
+    )
+except ImportError:
+    RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY = 3, 0.5, 8.0
+    BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT, GOVERNOR_WAIT_TIMEOUT = 5, 30.0, 15.0
+
+# HTTP statuses worth retrying: timeouts, quota pushback and server-side failures.
+RETRYABLE_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+# Exception class names from google-api-core, googleapiclient, requests and prawcore
+# that signal a transient failure. Matched by name so no client library is imported here.
+RETRYABLE_ERRORS = frozenset({
+    'ResourceExhausted', 'ServiceUnavailable', 'DeadlineExceeded', 'InternalServerError',
+    'TooManyRequests', 'ServerError', 'RequestException', 'ConnectionError', 'Timeout',
+    'ConnectTimeout', 'ReadTimeout', 'ChunkedEncodingError', 'TimeoutError',
+})
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the provider while its circuit breaker is open."""
+
+
+class ProviderBusyError(Exception):
+    """Raised when no rate-limit token or concurrency slot frees up in time."""
+
+
+class DeadlineError(Exception):
+    """Raised without calling the provider once the caller's deadline can't be met or its work was abandoned."""
+
+
+# (time.monotonic() deadline, cancellation Event or None) of the work in progress.
+_deadline = contextvars.ContextVar('governor_deadline', default=None)
+
+
+@contextmanager
+def deadline(at: float, cancelled: threading.Event = None):
+    """
+    Bounds every governed call made in this context, including pool tasks
+    started with metrics.submit, by a time.monotonic() deadline. Calls stop
+    waiting for a token or slot they can't get in time, and once `cancelled`
+    is set the remaining calls are refused. Nested deadlines can only tighten
+    the enclosing one and keep its cancellation.
+    """
+    outer = _deadline.get()
+    if outer is not None:
+        at = min(at, outer[0])
+        cancelled = cancelled or outer[1]
+    token = _deadline.set((at, cancelled))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def abandoned() -> bool:
+    """True once the work in this context has been cancelled by its owner."""
+    bound = _deadline.get()
+    return bound is not None and bound[1] is not None and bound[1].is_set()
+
+
+def time_left():
+    """Seconds until the current deadline (None without one); 0 once it has passed or the work was abandoned."""
+    bound = _deadline.get()
+    if bound is None:
+        return None
+    if abandoned():
+        return 0
+    return max(0.0, bound[0] - time.monotonic())
+
+
+def _status_code(exc):
+    for candidate in (
+        getattr(exc, 'status_code', None),
+        getattr(exc, 'code', None),
+        getattr(getattr(exc, 'resp', None), 'status', None),
+        getattr(getattr(exc, 'response', None), 'status_code', None),
+    ):
+        try:
+            return int(candidate)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    status = _status_code(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUSES
+    return any(cls.__name__ in RETRYABLE_ERRORS for cls in type(exc).__mro__)
+
+
+class Provider:
+    """
+    Outbound-call governor for one external service: a token bucket for its
+    rate limit, a cap on concurrent calls, retries with jittered exponential
+    backoff for transient errors, and a circuit breaker that fails fast after
+    BREAKER_FAILURE_THRESHOLD consecutive transient failures. The breaker lets
+    one trial call through every BREAKER_RESET_TIMEOUT seconds.
+    """
+
+    def __init__(self, key, name, requests_per_minute, burst, max_concurrency):
+        self.key = key
+        self.name = name
+        self.bucket = TokenBucket(rate=requests_per_minute / 60.0, capacity=burst)
+        self.max_concurrency = max_concurrency
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._in_flight = 0
+        self._counts = {'calls': 0, 'retries': 0, 'failures': 0, 'rejected': 0, 'opened': 0}
+
+    def _reject(self, reason, error):
+        with self._lock:
+            self._counts['rejected'] += 1
+        metrics.incr('governor_rejections_total', provider=self.key, reason=reason)
+        raise error
+
+    def _wait_limit(self):
+        """
+        How long to wait for a token or slot, and whether the caller's deadline
+        is what bounds it. Refuses the call outright once that deadline is gone.
+        """
+        left = time_left()
+        if left is None or left >= GOVERNOR_WAIT_TIMEOUT:
+            return GOVERNOR_WAIT_TIMEOUT, False
+        if left <= 0:
+            self._reject('deadline', DeadlineError(f"Stopped waiting for {self.name}: the request ran out of time."))
+        return left, True
+
+    def _admit(self):
+        """Deadline, breaker check, then a rate-limit token, then a concurrency slot. Returns whether this is a trial call."""
+        self._wait_limit()
+        with self._lock:
+            trial = False
+            if self._opened_at is not None:
+                if time.monotonic() - self._opened_at < BREAKER_RESET_TIMEOUT or self._trial_running:
+                    trial = None
+                else:
+                    trial = self._trial_running = True
+        if trial is None:
+            self._reject('circuit_open', CircuitOpenError(f"{self.name} is temporarily unavailable. Please try again shortly."))
+
+        try:
+            wait, bounded = self._wait_limit()
+            if not self.bucket.acquire(timeout=wait):
+                if bounded:
+                    self._reject('deadline', DeadlineError(f"{self.name} rate limit can't be met before the request's deadline."))
+                self._reject('rate_limited', ProviderBusyError(f"{self.name} rate limit reached. Please try again shortly."))
+            wait, bounded = self._wait_limit()
+            if not self._slots.acquire(timeout=wait):
+                if bounded:
+                    self._reject('deadline', DeadlineError(f"No {self.name} slot freed up before the request's deadline."))
+                self._reject('busy', ProviderBusyError(f"Too many {self.name} calls in progress. Please try again shortly."))
+        except Exception:
+            if trial:
+                with self._lock:
+                    self._trial_running = False
+            raise
+        with self._lock:
+            self._in_flight += 1
+            self._counts['calls'] += 1
+        return trial
+
+    def _release(self, trial, error=None):
+        self._slots.release()
+        with self._lock:
+            self._in_flight -= 1
+            if trial:
+                self._trial_running = False
+            if error is None:
+                self._failures = 0
+                if self._opened_at is not None:
+                    print(f"AGENT: {self.name} recovered; circuit closed.")
+                self._opened_at = None
+                return
+            if not is_retryable(error):
+                return
+            self._counts['failures'] += 1
+            self._failures += 1
+            if trial or (self._opened_at is None and self._failures >= BREAKER_FAILURE_THRESHOLD):
+                if not trial:
+                    print(f"AGENT: {self.name} failed {self._failures} times in a row; circuit opened.")
+                    self._counts['opened'] += 1
+                    metrics.incr('circuit_opened_total', provider=self.key)
+                self._opened_at = time.monotonic()
+
+    def _backoff(self, attempt, error):
+        if not is_retryable(error) or attempt + 1 >= RETRY_MAX_ATTEMPTS:
+            return False
+        # Full jitter keeps retries from many threads from landing together.
+        delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+        left = time_left()
+        if left is not None and delay >= left:
+            return False
+        with self._lock:
+            if self._opened_at is not None:
+                return False
+            self._counts['retries'] += 1
+        metrics.incr('retries_total', provider=self.key)
+        print(f"AGENT: {self.name} call failed ({error}); retrying in {delay:.1f}s.")
+        time.sleep(delay)
+        return True
+
+    def call(self, func, *args, **kwargs):
+        """Runs func(*args, **kwargs) under this provider's limits, retrying transient errors."""
+        attempt = 0
+        while True:
+            trial = self._admit()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                self._release(trial, e)
+                if self._backoff(attempt, e):
+                    attempt += 1
+                    continue
+                raise
+            self._release(trial)
+            return result
+
+    def stream(self, func, *args, **kwargs):
+        """
+        Like call() for a function returning an iterator: yields its items while
+        holding a concurrency slot. Only failures before the first item are
+        retried, since output already yielded can't be taken back.
+        """
+        attempt = 0
+        while True:
+            trial = self._admit()
+            started = False
+            try:
+                for item in func(*args, **kwargs):
+                    started = True
+                    yield item
+            except Exception as e:
+                self._release(trial, e)
+                if not started and self._backoff(attempt, e):
+                    attempt += 1
+                    continue
+                raise
+            except BaseException:
+                # Consumer stopped early (GeneratorExit); not the provider's fault.
+                self._release(trial)
+                raise
+            self._release(trial)
+            return
+
+    def stats(self) -> dict:
+        with self._lock:
+            state = 0 if self._opened_at is None else (2 if self._trial_running else 1)
+            return dict(self._counts, in_flight=self._in_flight, circuit_state=state,
+                        consecutive_failures=self._failures)
+
+
+gemini = Provider('gemini', 'Gemini', GEMINI_REQUESTS_PER_MINUTE, GEMINI_BURST, GEMINI_MAX_CONCURRENCY)
+cse = Provider('cse', 'Google Search', CSE_REQUESTS_PER_MINUTE, CSE_BURST, CSE_MAX_CONCURRENCY)
+# One cold sentiment analysis makes a search plus a comments call per post; the
+# burst always covers at least that so a lone analysis never waits on refill.
+reddit = Provider('reddit', 'Reddit', REDDIT_REQUESTS_PER_MINUTE,
+                  max(REDDIT_BURST, REDDIT_POSTS_PER_SEARCH + 1), REDDIT_MAX_CONCURRENCY)
+
+_providers = {provider.key: provider for provider in (gemini, cse, reddit)}
+
+
+def stats() -> dict:
+    """Per-provider counters; circuit_state is 0 closed, 1 open, 2 half-open (trial call running)."""
+    return {name: provider.stats() for name, provider in _providers.items()}
@@ -0,0 +1,193 @@
+import atexit
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+
+import metrics
+from kv_cache import KVCache
+
+# Load Configuration
+try:
+    from config import HISTORY_BATCH_SIZE, HISTORY_FLUSH_INTERVAL, HISTORY_CACHE_TTL, HISTORY_CACHE_MAX_USERS
+except ImportError:
+    HISTORY_BATCH_SIZE, HISTORY_FLUSH_INTERVAL, HISTORY_CACHE_TTL, HISTORY_CACHE_MAX_USERS = 100, 1.0, 3600, 5000
+
+# Number of entries the History page shows.
+HISTORY_LIMIT = 5
+# Firestore rejects batches with more than 500 writes.
+FIRESTORE_MAX_BATCH = 500
+FLUSH_RETRIES = 3
+
+# Recent history per user, shared by every worker and updated on write.
+# An entry is 'partial' when it only holds writes made since the last read.
+_cache = KVCache('history', ttl=HISTORY_CACHE_TTL, max_entries=HISTORY_CACHE_MAX_USERS)
+
+_get_client = lambda: None
+_pending = queue.Queue()
+_flusher_started = False
+_flusher_lock = threading.Lock()
+_stats = {'queued': 0, 'written': 0, 'batches': 0, 'failed': 0}
+_stats_lock = threading.Lock()
+
+
+def init(get_client):
+    """
+    Sets the function returning the Firestore client history is written to
+    (None when Firestore isn't configured). Call once at startup; the client
+    itself is only built on first use.
+    """
+    global _get_client
+    _get_client = get_client
+
+
+def _history_ref(uid):
+    return _get_client().collection('users').document(uid).collection('history')
+
+
+def _format_date(date):
+    return date.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _merge(*lists):
+    entries = {}
+    for items in lists:
+        for item in items:
+            entries[item['id']] = item
+    return sorted(entries.values(), key=lambda item: item.get('date') or '', reverse=True)[:HISTORY_LIMIT]
+
+
+def _count(**increments):
+    with _stats_lock:
+        for name, n in increments.items():
+            _stats[name] += n
+
+
+def _cache_prepend(uid, item):
+    # One transaction, so prepends from different gunicorn workers can't overwrite each other.
+    def prepend(cached):
+        cached = cached or {'items': [], 'partial': True}
+        return {'items': _merge([item], cached['items']), 'partial': cached['partial']}
+    _cache.update(uid, prepend)
+
+
+def record(uid, bill_name, summary, sentiment, source_url):
+    """
+    Queues one history entry for a background batch write and makes it
+    visible to recent() straight away. Never waits on Firestore.
+    """
+    if not uid or not _get_client():
+        return
+    doc_id = _history_ref(uid).document().id  # Generated locally, no round trip
+    date = datetime.now(timezone.utc)
+    sentiment_data = sentiment.get('note') or sentiment.get('error') or sentiment
+    data = {
+        'billName': bill_name,
+        'summary': summary,
+        'sentiment': sentiment_data,
+        'source': source_url,
+        'date': date
+    }
+    _start_flusher()
+    _pending.put((uid, doc_id, data))
+    _count(queued=1)
+    try:
+        _cache_prepend(uid, dict(data, id=doc_id, date=_format_date(date)))
+    except Exception as e:
+        print(f"AGENT: Could not update history cache. Error: {e}")
+
+
+def recent(uid):
+    """The user's latest history entries, newest first. Firestore is only read on a cache miss."""
+    try:
+        cached = _cache.get(uid)
+    except Exception as e:
+        print(f"AGENT: History cache unavailable. Error: {e}")
+        cached = None
+    if cached and not cached['partial']:
+        return cached['items']
+
+    stored = []
+    with metrics.span('firestore_read'):
+        docs = _history_ref(uid).order_by('date', direction='DESCENDING').limit(HISTORY_LIMIT).stream()
+        for doc in docs:
+            d = doc.to_dict()
+            if d.get('date'): d['date'] = _format_date(d['date'])
+            d['id'] = doc.id
+            stored.append(d)
+
+    # Writes still in the buffer (or made by another worker) are merged in.
+    def fill(latest):
+        return {'items': _merge(stored, latest['items'] if latest else []), 'partial': False}
+    try:
+        return _cache.update(uid, fill)['items']
+    except Exception as e:
+        print(f"AGENT: Could not update history cache. Error: {e}")
+        return stored
+
+
+def _commit(batch_items):
+    for attempt in range(FLUSH_RETRIES):
+        if attempt:
+            metrics.incr('retries_total', call='firestore_history')
+        try:
+            batch = _get_client().batch()
+            for uid, doc_id, data in batch_items:
+                batch.set(_history_ref(uid).document(doc_id), data)
+            with metrics.span('firestore_write'):
+                batch.commit()
+            _count(written=len(batch_items), batches=1)
+            return
+        except Exception as e:
+            print(f"AGENT: History batch write failed (attempt {attempt + 1}). Error: {e}")
+            time.sleep(2 ** attempt)
+    _count(failed=len(batch_items))
+
+
+def flush(block_seconds: float = 0):
+    """Writes everything currently buffered. Waits up to block_seconds for the first entry."""
+    batch_items = []
+    try:
+        batch_items.append(_pending.get(timeout=block_seconds) if block_seconds else _pending.get_nowait())
+    except queue.Empty:
+        return 0
+    # Give concurrent analyses a moment to join this batch.
+    deadline = time.monotonic() + (HISTORY_FLUSH_INTERVAL if block_seconds else 0)
+    limit = min(HISTORY_BATCH_SIZE, FIRESTORE_MAX_BATCH)
+    while len(batch_items) < limit:
+        try:
+            batch_items.append(_pending.get(timeout=max(0, deadline - time.monotonic())))
+        except queue.Empty:
+            break
+    _commit(batch_items)
+    return len(batch_items)
+
+
+def _flusher():
+    while True:
+        try:
+            flush(block_seconds=60)
+        except Exception as e:
+            print(f"AGENT: History flusher error: {e}")
+
+
+def _drain():
+    while flush():
+        pass
+
+
+def _start_flusher():
+    global _flusher_started
+    with _flusher_lock:
+        if _flusher_started:
+            return
+        _flusher_started = True
+    threading.Thread(target=_flusher, name="history-flush", daemon=True).start()
+    # Don't lose buffered entries when gunicorn recycles the worker.
+    atexit.register(_drain)
+
+
+def stats() -> dict:
+    with _stats_lock:
+        counts = dict(_stats)
+    return dict(counts, pending=_pending.qsize(), cache=_cache.stats())
@@ -0,0 +1,257 @@
+import codecs
+import re
+from html.parser import HTMLParser
+
+# Text inside these is never bill content.
+SKIP_TAGS = frozenset({
+    'script', 'style', 'noscript', 'template', 'svg', 'nav', 'header', 'footer',
+    'aside', 'form', 'select', 'button', 'iframe', 'head',
+})
+# Tags that end the current text block.
+BLOCK_TAGS = frozenset({
+    'p', 'div', 'li', 'ul', 'ol', 'tr', 'table', 'section', 'article', 'main',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'pre', 'blockquote', 'br', 'dd', 'dt', 'body',
+})
+VOID_TAGS = frozenset({'br', 'img', 'hr', 'meta', 'link', 'input', 'area', 'base', 'col', 'wbr', 'source'})
+HEADING_TAGS = frozenset({'h1', 'h2', 'h3', 'h4', 'h5', 'h6'})
+
+# Blocks shorter than this (headings excepted) are menu items, buttons and captions.
+MIN_BLOCK_CHARS = 25
+# Blocks that are mostly link text are navigation.
+MAX_LINK_DENSITY = 0.5
+# The main body is the deepest element holding at least this share of the page's content.
+MAIN_CONTENT_SHARE = 0.6
+
+_UNLOADED = object()
+_etree = _UNLOADED
+
+_WHITESPACE = re.compile(r'\s+')
+_CHARSET = re.compile(r'charset=["\']?([\w-]+)', re.IGNORECASE)
+# An opening or closing tag, or a comment, in a body served as text/plain.
+_MARKUP = re.compile(rb'<(?:!--|/?[a-z][a-z0-9]*[\s/>])')
+
+
+def sniff(content_type: str, head: bytes, url: str = "") -> str:
+    """
+    Classifies a download as 'pdf', 'html', 'text' (plain text, no markup) or
+    'other' from its first bytes and Content-Type, falling back to the URL only
+    when both are inconclusive.
+    """
+    if b'%PDF-' in head[:1024]:
+        return 'pdf'
+    mime = (content_type or "").split(';')[0].strip().lower()
+    if mime == 'application/pdf':
+        return 'pdf'
+    if mime in ('text/html', 'application/xhtml+xml'):
+        return 'html'
+    start = head[:512].lstrip().lower()
+    if start.startswith((b'<!doctype html', b'<html', b'<?xml')) or b'<body' in start:
+        return 'html'
+    if mime == 'text/plain':
+        return 'html' if _MARKUP.search(start) else 'text'
+    if mime and mime not in ('application/octet-stream', 'binary/octet-stream'):
+        return 'other'
+    return 'pdf' if url.lower().split('?')[0].endswith('.pdf') else 'html'
+
+
+def lxml_etree():
+    """lxml.etree, imported on first use (it is a heavy import), or None when lxml isn't installed."""
+    global _etree
+    if _etree is _UNLOADED:
+        try:
+            from lxml import etree
+        except ImportError:
+            etree = None
+        _etree = etree
+    return _etree
+
+
+def charset_of(content_type: str, default: str = 'utf-8'):
+    match = _CHARSET.search(content_type or "")
+    if match:
+        try:
+            return codecs.lookup(match.group(1)).name
+        except LookupError:
+            pass
+    return default
+
+
+class _BlockCollector:
+    """
+    Parser-agnostic sink for start/end/text events. Splits the page into text
+    blocks, remembering each block's enclosing elements and how much of it is
+    link text, then picks the main-content subtree by text density.
+    """
+
+    def __init__(self):
+        self.stack = []        # (tag, element id) of open elements
+        self.next_id = 0
+        self.skip_depth = 0
+        self.link_depth = 0
+        self.parts = []
+        self.link_chars = 0
+        self.blocks = []       # (text, link_chars, ancestor ids, is_heading)
+
+    def start(self, tag, attrs=None):
+        tag = tag.lower() if isinstance(tag, str) else ''
+        if tag in BLOCK_TAGS:
+            self._flush()
+        elif tag in ('td', 'th'):
+            # A table row is one block, e.g. a clause label and its text.
+            self.parts.append(' ')
+        if tag in VOID_TAGS:
+            return
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag == 'a':
+            self.link_depth += 1
+        self.stack.append((tag, self.next_id))
+        self.next_id += 1
+
+    def end(self, tag):
+        tag = tag.lower() if isinstance(tag, str) else ''
+        if tag in VOID_TAGS or not any(open_tag == tag for open_tag, _ in self.stack):
+            return
+        if tag in BLOCK_TAGS:
+            self._flush()
+        # Unclosed children are closed along with their parent.
+        while self.stack:
+            open_tag, _ = self.stack.pop()
+            if open_tag in SKIP_TAGS:
+                self.skip_depth -= 1
+            elif open_tag == 'a':
+                self.link_depth -= 1
+            if open_tag == tag:
+                break
+
+    def data(self, text):
+        if self.skip_depth or not text:
+            return
+        self.parts.append(text)
+        if self.link_depth:
+            self.link_chars += len(text.strip())
+
+    def _flush(self):
+        text = _WHITESPACE.sub(' ', ''.join(self.parts)).strip()
+        if text:
+            heading = any(tag in HEADING_TAGS for tag, _ in self.stack[-2:])
+            self.blocks.append((text, self.link_chars, tuple(i for _, i in self.stack), heading))
+        self.parts, self.link_chars = [], 0
+
+    def main_text(self) -> str:
+        self._flush()
+        good = [
+            block for block in self.blocks
+            if (len(block[0]) >= MIN_BLOCK_CHARS or block[3]) and block[1] <= MAX_LINK_DENSITY * len(block[0])
+        ]
+        if not good:
+            return ""
+
+        scores, depth = {}, {}
+        for text, link_chars, ancestors, _ in good:
+            weight = len(text) - link_chars
+            for level, element in enumerate(ancestors):
+                scores[element] = scores.get(element, 0) + weight
+                depth[element] = level
+        total = sum(len(text) - link_chars for text, link_chars, _, _ in good)
+        candidates = [element for element, score in scores.items() if score >= MAIN_CONTENT_SHARE * total]
+        if not candidates:
+            return "\n".join(block[0] for block in good)
+        main = max(candidates, key=lambda element: depth[element])
+        return "\n".join(text for text, _, ancestors, _ in good if main in ancestors)
+
+
+class _StdlibParser(HTMLParser):
+    def __init__(self, sink):
+        super().__init__(convert_charrefs=True)
+        self.sink = sink
+
+    def handle_starttag(self, tag, attrs):
+        self.sink.start(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.sink.start(tag)
+        self.sink.end(tag)
+
+    def handle_endtag(self, tag):
+        self.sink.end(tag)
+
+    def handle_data(self, data):
+        self.sink.data(data)
+
+
+class _LxmlTarget:
+    def __init__(self, sink):
+        self.sink = sink
+
+    def start(self, tag, attrib):
+        self.sink.start(tag)
+
+    def end(self, tag):
+        self.sink.end(tag)
+
+    def data(self, data):
+        self.sink.data(data)
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        pass
+
+
+class HTMLExtractor:
+    """
+    Incremental main-content extractor: feed() raw bytes as they download and
+    call close() for the text. Uses lxml's C parser when it is installed and
+    the standard library's HTMLParser otherwise.
+    """
+
+    def __init__(self, content_type: str = "", use_lxml: bool = None):
+        self._sink = _BlockCollector()
+        etree = lxml_etree() if use_lxml is not False else None
+        use_lxml = etree is not None
+        if use_lxml:
+            # Without a declared charset lxml detects it from the page's own <meta> tag.
+            self._parser = etree.HTMLParser(target=_LxmlTarget(self._sink), encoding=charset_of(content_type, None))
+            self._decoder = None
+        else:
+            self._parser = _StdlibParser(self._sink)
+            self._decoder = codecs.getincrementaldecoder(charset_of(content_type))(errors='replace')
+        self.backend = 'lxml' if use_lxml else 'stdlib'
+
+    def feed(self, chunk: bytes):
+        if self._decoder is None:
+            self._parser.feed(chunk)
+        else:
+            self._parser.feed(self._decoder.decode(chunk))
+
+    def close(self) -> str:
+        if self._decoder is not None:
+            self._parser.feed(self._decoder.decode(b'', final=True))
+        self._parser.close()
+        return self._sink.main_text()
+
+
+class PlainTextReader:
+    """Same feed()/close() interface as HTMLExtractor for bodies that are already plain text."""
+
+    backend = 'text'
+
+    def __init__(self, content_type: str = ""):
+        self._decoder = codecs.getincrementaldecoder(charset_of(content_type))(errors='replace')
+        self._parts = []
+
+    def feed(self, chunk: bytes):
+        self._parts.append(self._decoder.decode(chunk))
+
+    def close(self) -> str:
+        self._parts.append(self._decoder.decode(b'', final=True))
+        return "".join(self._parts)
+
+
+def extract_html_text(data: bytes, content_type: str = "", use_lxml: bool = None) -> str:
+    """Main-content text of a whole HTML document, one block per line."""
+    extractor = HTMLExtractor(content_type, use_lxml)
+    extractor.feed(data)
+    return extractor.close()
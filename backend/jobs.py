@@ -0,0 +1,286 @@
+import json
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+
+from storage import get_connection
+
+# Load Configuration
+try:
+    from config import JOB_MAX_WORKERS, JOB_MAX_PENDING, JOB_TIMEOUT, JOB_RETENTION
+except ImportError:
+    JOB_MAX_WORKERS, JOB_MAX_PENDING, JOB_TIMEOUT, JOB_RETENTION = 4, 50, 600, 24 * 3600
+
+DB_FILE = "jobs.sqlite3"
+POLL_INTERVAL = 1.0
+# A job whose worker died is re-queued this many times before it is failed.
+MAX_ATTEMPTS = 2
+# Identifies this process in the jobs it claims, so a restart can find its orphans.
+HOSTNAME = socket.gethostname()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    dedup_key TEXT,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    owners TEXT NOT NULL DEFAULT '[]',
+    claimed_by TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, created_at);
+CREATE INDEX IF NOT EXISTS jobs_dedup ON jobs(dedup_key, status);
+"""
+
+# Columns added after the first release; older databases get them on open.
+_ADDED_COLUMNS = {
+    'owners': "TEXT NOT NULL DEFAULT '[]'",
+    'claimed_by': "TEXT",
+    'attempts': "INTEGER NOT NULL DEFAULT 0",
+}
+
+_handlers = {}
+_finishers = {}
+_initialized = False
+_workers_started = False
+_workers_lock = threading.Lock()
+_wakeup = threading.Event()
+
+
+class QueueFullError(Exception):
+    """Raised when too many jobs are already waiting; callers should retry later."""
+
+
+def _db():
+    global _initialized
+    conn = get_connection(DB_FILE)
+    if not _initialized:
+        conn.executescript(_SCHEMA)
+        existing = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+        for column, definition in _ADDED_COLUMNS.items():
+            if column not in existing:
+                conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+        _initialized = True
+    return conn
+
+
+def register(kind: str, handler, on_finish=None):
+    """
+    Registers the function that runs jobs of `kind`. It receives the payload dict
+    and returns a JSON-able result. on_finish(result, owners), if given, runs after
+    a job succeeds with every owner that submitted or joined it.
+    """
+    _handlers[kind] = handler
+    if on_finish:
+        _finishers[kind] = on_finish
+
+
+def _claimant():
+    return f"{HOSTNAME}:{os.getpid()}"
+
+
+def submit(kind: str, payload: dict, dedup_key: str = None, owner: str = None) -> dict:
+    """
+    Queues a job owned by `owner` and returns {'job_id', 'status', 'deduplicated'}.
+    If an identical job (same dedup_key) is already queued or running, the owner
+    joins it and its ID is returned instead. Raises QueueFullError when
+    JOB_MAX_PENDING jobs are already in flight.
+    """
+    start()
+    conn = _db()
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (now - JOB_RETENTION,))
+        if dedup_key:
+            row = conn.execute(
+                "SELECT id, status, owners FROM jobs WHERE dedup_key = ? AND status IN ('queued', 'running') LIMIT 1",
+                (dedup_key,)
+            ).fetchone()
+            if row:
+                owners = json.loads(row['owners'])
+                if owner and owner not in owners:
+                    conn.execute("UPDATE jobs SET owners = ? WHERE id = ?", (json.dumps(owners + [owner]), row['id']))
+                conn.execute("COMMIT")
+                return {'job_id': row['id'], 'status': row['status'], 'deduplicated': True}
+
+        in_flight = conn.execute("SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')").fetchone()[0]
+        if in_flight >= JOB_MAX_PENDING:
+            conn.execute("ROLLBACK")
+            raise QueueFullError(f"{in_flight} jobs are already in progress.")
+
+        job_id = uuid.uuid4().hex
+        conn.execute(
+            "INSERT INTO jobs (id, kind, dedup_key, status, payload, created_at, owners) VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+            (job_id, kind, dedup_key, json.dumps(payload), now, json.dumps([owner] if owner else []))
+        )
+        conn.execute("COMMIT")
+    except QueueFullError:
+        raise
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    _wakeup.set()
+    return {'job_id': job_id, 'status': 'queued', 'deduplicated': False}
+
+
+def get(job_id: str, owner: str):
+    """Returns the public view of a job, or None if it is unknown, expired or not one of `owner`'s."""
+    conn = _db()
+    row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None or owner not in json.loads(row['owners']):
+        return None
+    job = {'job_id': row['id'], 'status': row['status']}
+    if row['status'] == 'queued':
+        job['position'] = conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created_at < ?", (row['created_at'],)
+        ).fetchone()[0] + 1
+    elif row['status'] == 'done':
+        job['result'] = json.loads(row['result'])
+    elif row['status'] == 'failed':
+        job['error'] = row['error']
+    if row['finished_at']:
+        job['duration_ms'] = round((row['finished_at'] - row['started_at']) * 1000)
+    return job
+
+
+def _claim():
+    """Atomically moves the oldest queued job to 'running'. Safe across gunicorn workers."""
+    conn = _db()
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Jobs whose worker died mid-run would otherwise block deduplication forever.
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', error = 'The job was interrupted. Please try again.', finished_at = ? "
+            "WHERE status = 'running' AND started_at < ?",
+            (now, now - JOB_TIMEOUT)
+        )
+        row = conn.execute(
+            "SELECT id, kind, payload FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+        ).fetchone()
+        if row:
+            conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = ?, claimed_by = ?, attempts = attempts + 1 WHERE id = ?",
+                (now, _claimant(), row['id'])
+            )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return row
+
+
+def _finish(job_id, status, result=None, error=None):
+    """Records the outcome and returns the job's owners as of that moment (nobody can join it afterwards)."""
+    conn = _db()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+            (status, json.dumps(result) if result is not None else None, error, time.time(), job_id)
+        )
+        row = conn.execute("SELECT owners FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return json.loads(row['owners']) if row else []
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _requeue_orphans():
+    """
+    Puts back jobs left 'running' by a dead process on this host (a restart or
+    crashed worker), or fails them once they have used up MAX_ATTEMPTS.
+    """
+    conn = _db()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        rows = conn.execute(
+            "SELECT id, claimed_by, attempts FROM jobs WHERE status = 'running' AND claimed_by LIKE ?",
+            (f"{HOSTNAME}:%",)
+        ).fetchall()
+        orphans = [row for row in rows if not _process_alive(int(row['claimed_by'].rsplit(':', 1)[1]))]
+        for row in orphans:
+            if row['attempts'] < MAX_ATTEMPTS:
+                conn.execute("UPDATE jobs SET status = 'queued', started_at = NULL, claimed_by = NULL WHERE id = ?",
+                             (row['id'],))
+            else:
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = 'The job was interrupted. Please try again.', "
+                    "finished_at = ? WHERE id = ?", (time.time(), row['id'])
+                )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    if orphans:
+        print(f"AGENT: Recovered {len(orphans)} job(s) interrupted by a restart.")
+
+
+def _worker_loop():
+    while True:
+        try:
+            row = _claim()
+        except Exception as e:
+            print(f"AGENT: Job queue unavailable. Error: {e}")
+            row = None
+        if row is None:
+            _wakeup.wait(POLL_INTERVAL)
+            _wakeup.clear()
+            continue
+
+        job_id, kind = row['id'], row['kind']
+        print(f"AGENT: Job {job_id} ({kind}) started in worker {os.getpid()}.")
+        try:
+            handler = _handlers[kind]
+            result = handler(json.loads(row['payload']))
+            owners = _finish(job_id, 'done', result=result)
+            print(f"AGENT: Job {job_id} finished.")
+        except Exception as e:
+            traceback.print_exc()
+            _finish(job_id, 'failed', error=str(e))
+            continue
+        if kind in _finishers:
+            try:
+                _finishers[kind](result, owners)
+            except Exception as e:
+                print(f"AGENT: Job {job_id} finish hook failed. Error: {e}")
+
+
+def start():
+    """
+    Starts this process's worker threads, after re-queueing jobs a previous
+    process left running. Called at app startup; safe to call again.
+    """
+    global _workers_started
+    with _workers_lock:
+        if _workers_started:
+            return
+        _workers_started = True
+    try:
+        _requeue_orphans()
+    except Exception as e:
+        print(f"AGENT: Could not recover interrupted jobs. Error: {e}")
+    for i in range(JOB_MAX_WORKERS):
+        threading.Thread(target=_worker_loop, name=f"job-worker-{i}", daemon=True).start()
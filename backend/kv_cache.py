@@ -0,0 +1,185 @@
+import atexit
+import json
+import re
+import threading
+import time
+
+import metrics
+from storage import get_connection
+
+DB_FILE = "kv_cache.sqlite3"
+# Hit/miss counters and last-access times are buffered in memory and written
+# at most this often (or with the next set), so a cache hit never takes the
+# database's single write lock.
+ACCESS_FLUSH_INTERVAL = 5.0
+
+_instances = {}
+
+
+class KVCache:
+    """
+    Small JSON key-value cache on a local SQLite file, shared by every
+    gunicorn worker on the machine. Bounded by TTL and an LRU entry limit,
+    with hit/miss counters kept alongside the data. Reads are read-only
+    queries; access bookkeeping is batched (see ACCESS_FLUSH_INTERVAL).
+    """
+
+    def __init__(self, name: str, ttl: int, max_entries: int):
+        if not re.fullmatch(r'[a-z_]+', name):
+            raise ValueError(f"Invalid cache name: {name}")
+        self.name = name
+        self.table = f"kv_{name}"
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._initialized = False
+        self._lock = threading.Lock()
+        self._accessed = {}   # key -> last hit time not yet written
+        self._hits = self._misses = 0
+        self._flushed_at = time.monotonic()
+        _instances[name] = self
+
+    def _db(self):
+        conn = get_connection(DB_FILE)
+        if not self._initialized:
+            conn.executescript(f"""
+                CREATE TABLE IF NOT EXISTS {self.table} (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS {self.table}_accessed ON {self.table}(accessed_at);
+                CREATE TABLE IF NOT EXISTS kv_stats (
+                    name TEXT PRIMARY KEY,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    misses INTEGER NOT NULL DEFAULT 0
+                );
+                INSERT OR IGNORE INTO kv_stats (name) VALUES ('{self.name}');
+            """)
+            self._initialized = True
+        return conn
+
+    def get(self, key: str, default=None):
+        conn = self._db()
+        now = time.time()
+        row = conn.execute(f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        hit = row is not None and row['expires_at'] >= now
+        with self._lock:
+            if hit:
+                self._hits += 1
+                self._accessed[key] = now
+            else:
+                self._misses += 1
+            due = time.monotonic() - self._flushed_at >= ACCESS_FLUSH_INTERVAL
+        if due:
+            self.flush()
+        metrics.cache_lookup(self.name, hit)
+        return json.loads(row['value']) if hit else default
+
+    def _take_pending(self):
+        with self._lock:
+            pending = self._accessed, self._hits, self._misses
+            self._accessed, self._hits, self._misses = {}, 0, 0
+            self._flushed_at = time.monotonic()
+        return pending
+
+    def _write_pending(self, conn, accessed, hits, misses):
+        conn.executemany(
+            f"UPDATE {self.table} SET accessed_at = MAX(accessed_at, ?) WHERE key = ?",
+            [(at, key) for key, at in accessed.items()]
+        )
+        if hits or misses:
+            conn.execute("UPDATE kv_stats SET hits = hits + ?, misses = misses + ? WHERE name = ?",
+                         (hits, misses, self.name))
+
+    def flush(self):
+        """Writes the buffered access times and hit/miss counts in one transaction."""
+        accessed, hits, misses = self._take_pending()
+        if not (accessed or hits or misses):
+            return
+        conn = self._db()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._write_pending(conn, accessed, hits, misses)
+            conn.execute("COMMIT")
+        except Exception as e:
+            conn.execute("ROLLBACK")
+            print(f"AGENT: Could not record {self.name} cache accesses. Error: {e}")
+
+    def _store(self, conn, key, value, ttl, now):
+        # Already holding the write lock: bring access times up to date before evicting.
+        self._write_pending(conn, *self._take_pending())
+        conn.execute(
+            f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value), now + (ttl or self.ttl), now)
+        )
+        conn.execute(f"DELETE FROM {self.table} WHERE expires_at < ?", (now,))
+        count = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        if count > self.max_entries:
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN "
+                f"(SELECT key FROM {self.table} ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def set(self, key: str, value, ttl: int = None):
+        conn = self._db()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._store(conn, key, value, ttl, now)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def update(self, key: str, func, ttl: int = None):
+        """
+        Atomic read-modify-write across every process: stores func(current value,
+        or None if absent/expired) and returns it. The write lock is held
+        throughout, so func must be quick and must not touch this cache.
+        """
+        conn = self._db()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            current = json.loads(row['value']) if row is not None and row['expires_at'] >= now else None
+            value = func(current)
+            self._store(conn, key, value, ttl, now)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return value
+
+    def delete(self, key: str):
+        self._db().execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self):
+        self._db().execute(f"DELETE FROM {self.table}")
+
+    def stats(self) -> dict:
+        conn = self._db()
+        entries = conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        row = conn.execute("SELECT hits, misses FROM kv_stats WHERE name = ?", (self.name,)).fetchone()
+        with self._lock:
+            hits, misses = row['hits'] + self._hits, row['misses'] + self._misses
+        return {'entries': entries, 'hits': hits, 'misses': misses}
+
+    @staticmethod
+    def all_stats() -> dict:
+        """stats() of every cache created in this process, by name."""
+        return {name: cache.stats() for name, cache in _instances.items()}
+
+
+def _flush_all():
+    for cache in list(_instances.values()):
+        try:
+            cache.flush()
+        except Exception as e:
+            print(f"AGENT: Could not flush {cache.name} cache accesses. Error: {e}")
+
+
+# Don't lose buffered counters when gunicorn recycles the worker.
+atexit.register(_flush_all)
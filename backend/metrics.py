@@ -0,0 +1,169 @@
+import contextvars
+import functools
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+# Load Configuration
+try:
+    from config import METRICS_SAMPLE_RATE, METRICS_SERVER_TIMING
+except ImportError:
+    METRICS_SAMPLE_RATE, METRICS_SERVER_TIMING = 0.0, False
+
+PREFIX = "sarkari_"
+# Histogram buckets in seconds, from cache lookups up to slow Gemini calls.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_lock = threading.Lock()
+_counters = {}     # (name, labels) -> value
+_histograms = {}   # (name, labels) -> [count per bucket..., sum, count]
+_collectors = {}   # name -> callable returning a dict of gauge values
+# Spans recorded while serving the current request, for the Server-Timing header.
+_request_spans = contextvars.ContextVar('request_spans', default=None)
+
+
+def _labels(labels):
+    return tuple(sorted(labels.items()))
+
+
+def incr(name: str, value: float = 1, **labels):
+    """Adds to a counter. Keep label values low-cardinality (no URLs or user IDs)."""
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name: str, seconds: float, **labels):
+    """Records one duration in a histogram."""
+    key = (name, _labels(labels))
+    with _lock:
+        series = _histograms.get(key)
+        if series is None:
+            series = _histograms[key] = [0] * (len(BUCKETS) + 2)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                series[i] += 1
+                break
+        series[-2] += seconds
+        series[-1] += 1
+
+
+@contextmanager
+def span(name: str, **labels):
+    """
+    Times a block as span `name`: feeds the span histogram, the current
+    request's Server-Timing entries and, when sampled, one JSON log line.
+    """
+    started = time.perf_counter()
+    status = 'ok'
+    try:
+        yield
+    except BaseException:
+        status = 'error'
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        observe('span_seconds', elapsed, span=name, status=status, **labels)
+        spans = _request_spans.get()
+        if spans is not None:
+            spans.append((name, elapsed))
+        if METRICS_SAMPLE_RATE and random.random() < METRICS_SAMPLE_RATE:
+            print(json.dumps({'span': name, 'ms': round(elapsed * 1000, 1), 'status': status, **labels}))
+
+
+def timed(name: str, **labels):
+    """Decorator form of span()."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def cache_lookup(cache: str, hit: bool):
+    incr('cache_requests_total', cache=cache, result='hit' if hit else 'miss')
+
+
+def submit(executor, func, *args):
+    """executor.submit that keeps the caller's request context, so spans in pool threads count toward it."""
+    return executor.submit(contextvars.copy_context().run, func, *args)
+
+
+def start_request():
+    """Starts collecting spans for Server-Timing; returns the token for end_request()."""
+    return _request_spans.set([])
+
+
+def end_request(token) -> str:
+    """Stops collecting and returns the Server-Timing header value (durations summed per span name)."""
+    spans = _request_spans.get() or []
+    _request_spans.reset(token)
+    totals, counts = {}, {}
+    for name, elapsed in spans:
+        totals[name] = totals.get(name, 0) + elapsed
+        counts[name] = counts.get(name, 0) + 1
+    return ", ".join(
+        f'{name};desc="{counts[name]}x";dur={totals[name] * 1000:.1f}' for name in totals
+    )
+
+
+def register_collector(name: str, func):
+    """Adds a callable whose dict of numbers is exported as gauges on every scrape."""
+    _collectors[name] = func
+
+
+def _format_labels(labels, extra=()):
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{str(v)}"' for k, v in pairs) + "}"
+
+
+def _flatten(prefix, values):
+    for key, value in values.items():
+        if isinstance(value, dict):
+            yield from _flatten(f"{prefix}_{key}", value)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield f"{prefix}_{key}", value
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: list(series) for key, series in _histograms.items()}
+
+    lines = []
+    typed = set()
+    for (name, labels), value in sorted(counters.items()):
+        if name not in typed:
+            lines.append(f"# TYPE {PREFIX}{name} counter")
+            typed.add(name)
+        lines.append(f"{PREFIX}{name}{_format_labels(labels)} {value}")
+
+    for (name, labels), series in sorted(histograms.items()):
+        if name not in typed:
+            lines.append(f"# TYPE {PREFIX}{name} histogram")
+            typed.add(name)
+        cumulative = 0
+        for bound, count in zip(BUCKETS, series):
+            cumulative += count
+            lines.append(f"{PREFIX}{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+        lines.append(f"{PREFIX}{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {series[-1]}")
+        lines.append(f"{PREFIX}{name}_sum{_format_labels(labels)} {series[-2]:.6f}")
+        lines.append(f"{PREFIX}{name}_count{_format_labels(labels)} {series[-1]}")
+
+    for collector, func in sorted(_collectors.items()):
+        try:
+            values = func()
+        except Exception as e:
+            print(f"AGENT: Metrics collector '{collector}' failed. Error: {e}")
+            continue
+        for name, value in _flatten(f"{PREFIX}{collector}", values):
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
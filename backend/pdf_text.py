@@ -0,0 +1,41 @@
+import mmap
+from io import BytesIO
+
+import metrics
+
+# Load Configuration
+try:
+    from config import PDF_MAX_CHARS
+except ImportError:
+    PDF_MAX_CHARS = 200000
+
+
+def _extract(reader, max_chars):
+    # The cap is reached within the first few dozen pages of a bill, so one
+    # sequential pass is faster than handing page ranges to worker processes.
+    parts, total = [], 0
+    for page in reader.pages:
+        text = page.extract_text() or ""
+        parts.append(text)
+        total += len(text)
+        if max_chars and total >= max_chars:
+            break
+    return "".join(parts)
+
+
+def extract_pdf_text(source, max_chars: int = PDF_MAX_CHARS) -> str:
+    """
+    Extracts text from a PDF given as a file path, bytes, or a seekable binary
+    stream (e.g. an upload's spooled temp file). Stops once `max_chars` of text
+    has been read; pass max_chars=None for the whole document.
+    """
+    import PyPDF2
+
+    if isinstance(source, (bytes, bytearray)):
+        source = BytesIO(source)
+
+    with metrics.span('pdf_parse'):
+        if isinstance(source, str):
+            with open(source, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return _extract(PyPDF2.PdfReader(mm), max_chars)
+        return _extract(PyPDF2.PdfReader(source), max_chars)
@@ -0,0 +1,139 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import governor
+import metrics
+from agent import (
+    generate_detailed_summary,
+    stream_detailed_summary,
+    get_social_media_sentiment,
+    calculate_impact_scores,
+    get_bill_news
+)
+
+# Load Configuration
+try:
+    from config import (
+        ANALYZE_MAX_WORKERS, ANALYZE_STAGE_TIMEOUT,
+        SENTIMENT_STAGE_TIMEOUT, NEWS_STAGE_TIMEOUT
+    )
+except ImportError:
+    ANALYZE_MAX_WORKERS, ANALYZE_STAGE_TIMEOUT = 16, 45.0
+    SENTIMENT_STAGE_TIMEOUT, NEWS_STAGE_TIMEOUT = 20.0, 10.0
+
+# One bounded pool per worker process, shared by every request.
+_executor = ThreadPoolExecutor(max_workers=ANALYZE_MAX_WORKERS, thread_name_prefix="analyze")
+
+
+class Stage:
+    """
+    A single independent unit of the analysis pipeline. A streaming stage's
+    func is a generator of text pieces; its result is the joined text.
+    """
+
+    def __init__(self, name, func, args=(), timeout=ANALYZE_STAGE_TIMEOUT, fallback=None, stream=False):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.timeout = timeout
+        self.fallback = fallback
+        self.stream = stream
+
+
+def build_analysis_stages(bill_text, bill_name, language, stream=False):
+    """
+    The four independent network-bound stages behind /api/analyze.
+    Fallbacks mirror what each agent step returns on its own errors.
+    With stream=True the summary is produced piece by piece.
+    """
+    return [
+        Stage('summary', stream_detailed_summary if stream else generate_detailed_summary,
+              (bill_text, bill_name, language), stream=stream,
+              fallback="Sorry, the summary took too long to generate. Please try again."),
+        Stage('sentiment', get_social_media_sentiment, (bill_name,),
+              timeout=SENTIMENT_STAGE_TIMEOUT,
+              fallback={'note': "Public sentiment is taking too long to load. Please try again later."}),
+        Stage('impact_scores', calculate_impact_scores, (bill_text,), fallback={}),
+        Stage('news', get_bill_news, (bill_name,), timeout=NEWS_STAGE_TIMEOUT, fallback=[]),
+    ]
+
+
+def _run_stage(stage, events, deadline, cancelled):
+    # Outbound calls made by the stage give up once it has timed out.
+    with governor.deadline(deadline, cancelled):
+        if not stage.stream:
+            return stage.func(*stage.args)
+        parts = []
+        for text in stage.func(*stage.args):
+            parts.append(text)
+            events.put(('partial', stage.name, text))
+        return "".join(parts)
+
+
+def iter_stages(stages):
+    """
+    Runs all stages concurrently and yields (name, result, elapsed_ms, status)
+    as each one finishes. A stage that overruns its own timeout (or raises)
+    yields its fallback so the caller always gets a partial result.
+    Streaming stages also yield each piece as it arrives with status 'partial'.
+    Timed-out work is told to stop: its governed outbound calls are refused
+    from then on, so it winds down instead of holding tokens and pool threads.
+    """
+    started, started_monotonic = time.perf_counter(), time.monotonic()
+    events = queue.Queue()
+    pending = {}
+    cancelled = {}
+    for stage in stages:
+        cancelled[stage.name] = threading.Event()
+        future = metrics.submit(_executor, _run_stage, stage, events,
+                                started_monotonic + stage.timeout, cancelled[stage.name])
+        pending[stage.name] = (stage, future, started + stage.timeout)
+        future.add_done_callback(lambda _, name=stage.name: events.put(('done', name, None)))
+
+    while pending:
+        next_deadline = min(deadline for _, _, deadline in pending.values())
+        try:
+            kind, name, payload = events.get(timeout=max(0, next_deadline - time.perf_counter()))
+        except queue.Empty:
+            kind = name = None
+
+        elapsed_ms = round((time.perf_counter() - started) * 1000)
+        if name in pending:
+            stage, future, _ = pending[name]
+            if kind == 'partial':
+                yield name, payload, elapsed_ms, 'partial'
+            else:
+                del pending[name]
+                try:
+                    result, status = future.result(), 'ok'
+                except Exception as e:
+                    print(f"AGENT ERROR (Pipeline stage '{name}'): {e}")
+                    result, status = stage.fallback, 'error'
+                metrics.observe('stage_seconds', elapsed_ms / 1000, stage=name, status=status)
+                yield name, result, elapsed_ms, status
+
+        now = time.perf_counter()
+        for name, (stage, future, deadline) in list(pending.items()):
+            if deadline <= now:
+                del pending[name]
+                future.cancel()
+                cancelled[name].set()
+                print(f"AGENT: Stage '{name}' timed out after {stage.timeout}s. Using partial result.")
+                metrics.observe('stage_seconds', now - started, stage=name, status='timeout')
+                yield name, stage.fallback, round((now - started) * 1000), 'timeout'
+
+
+def run_stages(stages):
+    """
+    Runs all stages concurrently and returns (results, timings) once every
+    stage has either finished or hit its timeout.
+    """
+    results, timings = {}, {}
+    for name, result, elapsed_ms, status in iter_stages(stages):
+        if status == 'partial':
+            continue
+        results[name] = result
+        timings[name] = {'ms': elapsed_ms, 'status': status}
+    return results, timings
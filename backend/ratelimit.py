@@ -0,0 +1,42 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: allows bursts of up to `capacity` calls and
+    `rate` calls per second on average. acquire() blocks until a token is free,
+    or returns False at once if its turn would come after the timeout.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def acquire(self, timeout: float = None) -> bool:
+        # Reserves the next token even if it has yet to accrue (the balance may
+        # go negative), so waiters are served in order and each knows its wait.
+        with self._lock:
+            self._refill(time.monotonic())
+            wait = max(0.0, (1 - self._tokens) / self.rate)
+            if timeout is not None and wait > timeout:
+                return False
+            self._tokens -= 1
+        if wait:
+            time.sleep(wait)
+        return True
@@ -0,0 +1,156 @@
+import hashlib
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+
+from compaction import compact_text, count_tokens, fit_to_budget
+
+CHUNK_TARGET_CHARS = 1200
+INDEX_CACHE_SIZE = 64
+
+# Lines that usually open a new section of an Indian bill or act.
+_SECTION_START = re.compile(
+    r'^\s*(?:CHAPTER\b|PART\b|SCHEDULE\b|THE\s+\w+\s+SCHEDULE\b|STATEMENT OF OBJECTS|'
+    r'Section\s+\d+|\d{1,3}[A-Z]?\.\s|\(\d{1,3}\)\s)',
+    re.IGNORECASE | re.MULTILINE
+)
+_SENTENCE_END = re.compile(r'(?<=[.;:])\s+')
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+_STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or shall that the this to was were which with
+any such may under said other than into where there been being not no all also made
+""".split())
+
+SUMMARY_QUERY = "objects reasons purpose scope applies persons citizens establishment key provisions amendment"
+IMPACT_QUERY = ("citizens workers farmers women students employees business startups consumers tax penalty "
+                "benefit rights obligations compliance employment welfare")
+
+
+def tokenize(text: str):
+    return [t for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS and len(t) > 1]
+
+
+def section_spans(text: str):
+    """(start, end) offsets of the sections/clauses of `text`, skipping empty ones."""
+    starts = [m.start() for m in _SECTION_START.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    return [(a, b) for a, b in zip(starts, starts[1:] + [len(text)]) if text[a:b].strip()]
+
+
+def split_sections(text: str):
+    """Splits bill text where a section, clause, chapter or schedule begins."""
+    return [text[a:b].strip() for a, b in section_spans(text)]
+
+
+def chunk_text(text: str, target_chars: int = CHUNK_TARGET_CHARS):
+    """
+    Splits bill text on section/clause boundaries, then packs neighbouring
+    small sections together and breaks oversized ones at sentence ends so
+    chunks stay close to `target_chars`.
+    """
+    chunks, current = [], ""
+    for section in split_sections(text):
+        if len(section) > target_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            piece = ""
+            for sentence in _SENTENCE_END.split(section):
+                if piece and len(piece) + len(sentence) + 1 > target_chars:
+                    chunks.append(piece)
+                    piece = ""
+                piece = f"{piece} {sentence}" if piece else sentence
+            if piece:
+                chunks.append(piece)
+        elif current and len(current) + len(section) + 1 > target_chars:
+            chunks.append(current)
+            current = section
+        else:
+            current = f"{current}\n{section}" if current else section
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class BillIndex:
+    """BM25 index over the section-aware chunks of one bill's compacted text."""
+
+    K1 = 1.5
+    B = 0.75
+
+    def __init__(self, text: str):
+        self.text = compact_text(text)
+        self.tokens = count_tokens(self.text)
+        self.chunks = chunk_text(self.text)
+        self.chunk_tokens = [count_tokens(chunk) for chunk in self.chunks]
+        self.term_freqs = [Counter(tokenize(chunk)) for chunk in self.chunks]
+        self.lengths = [sum(tf.values()) for tf in self.term_freqs]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0
+        doc_freq = Counter()
+        for tf in self.term_freqs:
+            doc_freq.update(tf.keys())
+        n = len(self.chunks)
+        self.idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in doc_freq.items()}
+
+    def scores(self, query: str):
+        terms = set(tokenize(query))
+        results = []
+        for tf, length in zip(self.term_freqs, self.lengths):
+            score = 0.0
+            norm = self.K1 * (1 - self.B + self.B * length / (self.avg_length or 1))
+            for term in terms:
+                freq = tf.get(term)
+                if freq:
+                    score += self.idf[term] * freq * (self.K1 + 1) / (freq + norm)
+            results.append(score)
+        return results
+
+
+_index_cache = OrderedDict()
+_index_lock = threading.Lock()
+
+
+def get_index(bill_text: str) -> BillIndex:
+    """Builds the index once per distinct bill text and keeps the most recent ones in memory."""
+    key = hashlib.sha256(bill_text.encode('utf-8')).hexdigest()
+    with _index_lock:
+        index = _index_cache.get(key)
+        if index is not None:
+            _index_cache.move_to_end(key)
+            return index
+
+    index = BillIndex(bill_text)
+    with _index_lock:
+        _index_cache[key] = index
+        while len(_index_cache) > INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return index
+
+
+def select_context(bill_text: str, query: str, budget_tokens: int) -> str:
+    """
+    Returns the chunks of the compacted bill most relevant to `query` that
+    fit within `budget_tokens`, in their original order. The opening chunk
+    (title and preamble) is always kept. Short bills are returned whole.
+    """
+    index = get_index(bill_text)
+    if index.tokens <= budget_tokens:
+        return index.text
+
+    scores = index.scores(query)
+    ranked = sorted(range(1, len(index.chunks)), key=lambda i: scores[i], reverse=True)
+
+    separator_tokens = count_tokens("\n...\n")
+    chosen, used = [0], index.chunk_tokens[0]
+    for i in ranked:
+        size = index.chunk_tokens[i] + separator_tokens
+        if used + size > budget_tokens:
+            continue
+        chosen.append(i)
+        used += size
+
+    context = "\n...\n".join(index.chunks[i] for i in sorted(chosen))
+    return fit_to_budget(context, budget_tokens)
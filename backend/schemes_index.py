@@ -0,0 +1,317 @@
+import csv
+import json
+import math
+import re
+import sys
+import threading
+import time
+
+from storage import get_connection
+
+# Load Configuration
+try:
+    from config import SCHEME_MATCH_LIMIT
+except ImportError:
+    SCHEME_MATCH_LIMIT = 3
+
+DB_FILE = "schemes.sqlite3"
+# How often a worker checks whether the catalogue was re-ingested.
+RELOAD_CHECK_INTERVAL = 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS schemes (
+    id INTEGER PRIMARY KEY,
+    record TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Eligibility fields that are matched exactly through an inverted index.
+# An empty list on a scheme means "open to everyone".
+INDEXED_FIELDS = ('states', 'categories', 'sexes', 'occupations', 'marital_statuses', 'parental_statuses')
+
+# Annual income bands (upper bounds, in rupees) used to index income limits.
+INCOME_BANDS = (100000, 250000, 500000, 800000, 1200000, 2500000, float('inf'))
+
+# Input column aliases accepted from JSON/CSV dumps.
+_ALIASES = {
+    'scheme_name': ('scheme_name', 'name', 'title'),
+    'summary': ('summary', 'description', 'benefits'),
+    'eligibility': ('eligibility', 'eligibility_text', 'who_can_apply'),
+    'link': ('link', 'url', 'official_link'),
+    'states': ('states', 'state'),
+    'categories': ('categories', 'category', 'social_category'),
+    'sexes': ('sexes', 'sex', 'gender'),
+    'occupations': ('occupations', 'occupation'),
+    'marital_statuses': ('marital_statuses', 'marital_status'),
+    'parental_statuses': ('parental_statuses', 'parental_status'),
+    'only_girl_child': ('only_girl_child', 'is_only_girl_child'),
+    'income_min': ('income_min', 'min_income'),
+    'income_max': ('income_max', 'max_income', 'income_limit'),
+    'age_min': ('age_min', 'min_age'),
+    'age_max': ('age_max', 'max_age'),
+}
+_OPEN_VALUES = {'', 'all', 'any', 'india', 'all india', 'pan india', 'everyone', '*'}
+_TRUE_VALUES = {'yes', 'true', '1', 'y'}
+
+_initialized = False
+
+
+def _db():
+    global _initialized
+    conn = get_connection(DB_FILE)
+    if not _initialized:
+        conn.executescript(_SCHEMA)
+        _initialized = True
+    return conn
+
+
+def normalize_term(value) -> str:
+    """Lowercases, collapses punctuation and strips a plural 's' so 'Farmers' matches 'farmer'."""
+    term = re.sub(r'[^a-z0-9]+', ' ', str(value).lower()).strip()
+    if len(term) > 3 and term.endswith('s') and not term.endswith('ss'):
+        term = term[:-1]
+    return term
+
+
+def _terms(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = re.split(r'[;|,]', value)
+    terms = {normalize_term(v) for v in value}
+    if terms & _OPEN_VALUES:
+        return []
+    return sorted(terms)
+
+
+def normalize_number(value):
+    """Parses '4,50,000' or 450000 to a float; None when empty, unparseable or not finite ('nan', 'inf')."""
+    if value in (None, ''):
+        return None
+    try:
+        number = float(str(value).replace(',', ''))
+    except ValueError:
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _pick(raw, field):
+    for alias in _ALIASES[field]:
+        if alias in raw and raw[alias] not in (None, ''):
+            return raw[alias]
+    return None
+
+
+def normalize_record(raw: dict) -> dict:
+    """Maps one JSON object or CSV row onto the catalogue's structured schema."""
+    record = {
+        'scheme_name': str(_pick(raw, 'scheme_name') or '').strip(),
+        'summary': str(_pick(raw, 'summary') or '').strip(),
+        'eligibility': str(_pick(raw, 'eligibility') or '').strip(),
+        'link': str(_pick(raw, 'link') or '').strip(),
+        'only_girl_child': str(_pick(raw, 'only_girl_child') or '').strip().lower() in _TRUE_VALUES,
+    }
+    for field in INDEXED_FIELDS:
+        record[field] = _terms(_pick(raw, field))
+    for field in ('income_min', 'income_max', 'age_min', 'age_max'):
+        record[field] = normalize_number(_pick(raw, field))
+    return record
+
+
+def load_dump(path: str):
+    """Reads a catalogue dump: a JSON list (or {"schemes": [...]}) or a CSV with a header row."""
+    if path.lower().endswith('.csv'):
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            return list(csv.DictReader(f))
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    return data.get('schemes', []) if isinstance(data, dict) else data
+
+
+def ingest(path: str, replace: bool = True) -> dict:
+    """
+    Loads a JSON/CSV dump into the local catalogue. With replace=True the
+    previous catalogue is dropped. Every worker reloads its index within
+    RELOAD_CHECK_INTERVAL seconds.
+    """
+    records, skipped = [], 0
+    for raw in load_dump(path):
+        record = normalize_record(raw)
+        if record['scheme_name'] and record['link']:
+            records.append(record)
+        else:
+            skipped += 1
+
+    conn = _db()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if replace:
+            conn.execute("DELETE FROM schemes")
+        conn.executemany("INSERT INTO schemes (record) VALUES (?)", [(json.dumps(r),) for r in records])
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (str(time.time()),))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return {'ingested': len(records), 'skipped': skipped}
+
+
+def _within(value, low, high) -> bool:
+    return (low is None or value >= low) and (high is None or value <= high)
+
+
+def _income_band(income: float) -> int:
+    for band, upper in enumerate(INCOME_BANDS):
+        if income <= upper:
+            return band
+    return len(INCOME_BANDS) - 1
+
+
+class SchemeIndex:
+    """
+    In-memory catalogue with one inverted index per eligibility field
+    (value -> scheme ids) plus the set of schemes open on that field, so a
+    profile resolves to candidates with a few set intersections.
+    """
+
+    def __init__(self, records):
+        self.records = records
+        self.all_ids = set(range(len(records)))
+        self.index = {field: {} for field in INDEXED_FIELDS}
+        self.open = {field: set() for field in INDEXED_FIELDS}
+        self.income_bands = [set() for _ in INCOME_BANDS]
+        self.girl_child_only = set()
+
+        for i, record in enumerate(records):
+            for field in INDEXED_FIELDS:
+                if record[field]:
+                    for term in record[field]:
+                        self.index[field].setdefault(term, set()).add(i)
+                else:
+                    self.open[field].add(i)
+
+            low = record['income_min'] or 0
+            high = record['income_max'] if record['income_max'] is not None else float('inf')
+            lower_bound = 0
+            for band, upper in enumerate(INCOME_BANDS):
+                if low <= upper and high >= lower_bound:
+                    self.income_bands[band].add(i)
+                lower_bound = upper
+
+            if record['only_girl_child']:
+                self.girl_child_only.add(i)
+
+    def _field_candidates(self, field, terms):
+        matched = set()
+        for term in terms:
+            matched |= self.index[field].get(term, set())
+        return matched
+
+    def match(self, profile: dict, limit: int = SCHEME_MATCH_LIMIT):
+        """Returns the best matching records for a profile, most specific first."""
+        candidates = set(self.all_ids)
+        specific = {}
+
+        occupation = normalize_term(profile.get('occupation') or '')
+        occupation_terms = {occupation, *(normalize_term(w) for w in occupation.split())} - {''}
+        category = normalize_term(profile.get('category') or '')
+        wanted = {
+            'states': {normalize_term(profile.get('state') or '')} - {''},
+            'categories': {category} if category and category != 'general' else set(),
+            'sexes': {normalize_term(profile.get('sex') or '')} - {''},
+            'occupations': occupation_terms,
+            'marital_statuses': {normalize_term(profile.get('marital_status') or '')} - {''},
+            'parental_statuses': {normalize_term(profile.get('parental_status') or '')} - {''},
+        }
+        for field, terms in wanted.items():
+            matched = self._field_candidates(field, terms)
+            candidates &= matched | self.open[field]
+            for i in matched:
+                specific[i] = specific.get(i, 0) + 1
+
+        income = normalize_number(profile.get('income'))
+        if income is not None:
+            candidates &= self.income_bands[_income_band(income)]
+        if str(profile.get('is_only_girl_child', '')).lower() not in _TRUE_VALUES:
+            candidates -= self.girl_child_only
+
+        age = normalize_number(profile.get('age'))
+        results = []
+        for i in candidates:
+            record = self.records[i]
+            if income is not None and not _within(income, record['income_min'], record['income_max']):
+                continue
+            if age is not None and not _within(age, record['age_min'], record['age_max']):
+                continue
+            score = specific.get(i, 0) + (1 if i in self.girl_child_only else 0)
+            results.append((-score, record['scheme_name'], record))
+        results.sort(key=lambda r: r[:2])
+        return [record for _, _, record in results[:limit]]
+
+
+_index = None
+_index_version = None
+_index_checked_at = 0.0
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """This worker's SchemeIndex, rebuilt when the catalogue has been re-ingested."""
+    global _index, _index_version, _index_checked_at
+    now = time.time()
+    if _index is not None and now - _index_checked_at < RELOAD_CHECK_INTERVAL:
+        return _index
+    with _index_lock:
+        if _index is not None and now - _index_checked_at < RELOAD_CHECK_INTERVAL:
+            return _index
+        conn = _db()
+        row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        version = row['value'] if row else None
+        if _index is None or version != _index_version:
+            records = [json.loads(r['record']) for r in conn.execute("SELECT record FROM schemes ORDER BY id")]
+            _index = SchemeIndex(records)
+            _index_version = version
+            print(f"AGENT: Loaded scheme catalogue with {len(records)} schemes.")
+        _index_checked_at = now
+        return _index
+
+
+def catalogue_version():
+    """Stamp of the catalogue this worker has loaded; changes on every ingest."""
+    get_index()
+    return _index_version
+
+
+def match_profile(profile: dict, limit: int = SCHEME_MATCH_LIMIT):
+    """Catalogue matches as the find_matching_schemes list shape, or [] on a miss."""
+    return [
+        {
+            'scheme_name': record['scheme_name'],
+            'summary': record['summary'],
+            'eligibility': record['eligibility'],
+            'link': record['link'],
+        }
+        for record in get_index().match(profile, limit)
+    ]
+
+
+def stats() -> dict:
+    conn = _db()
+    row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+    count = conn.execute("SELECT COUNT(*) FROM schemes").fetchone()[0]
+    return {'schemes': count, 'ingested_at': float(row['value']) if row else None}
+
+
+if __name__ == '__main__':
+    # Usage: python schemes_index.py ingest schemes.json|schemes.csv [--append] | match '{"state": ...}' | stats
+    command, args = (sys.argv[1] if len(sys.argv) > 1 else 'stats'), sys.argv[2:]
+    if command == 'ingest' and args:
+        print(ingest(args[0], replace='--append' not in args))
+    elif command == 'match' and args:
+        print(json.dumps(match_profile(json.loads(args[0])), indent=2))
+    else:
+        print(stats())
@@ -0,0 +1,152 @@
+import re
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+# Load Configuration
+try:
+    from config import SENTIMENT_ENGINE
+except ImportError:
+    SENTIMENT_ENGINE = 'lexicon'
+
+# Same three-bucket thresholds the original per-item TextBlob loop used.
+POSITIVE_THRESHOLD = 0.1
+NEGATIVE_THRESHOLD = -0.1
+
+_TOKEN = re.compile(r"\w+(?=n't)|n't|\w+|!|[:;=8][-^o']?[()\[\]dDpP/\\|]")
+
+
+class SentimentBatch:
+    """Per-item polarity scores (-1..1) and confidence (0..1) for one corpus."""
+
+    def __init__(self, scores, confidence):
+        self.scores = np.asarray(scores, dtype=float)
+        self.confidence = np.asarray(confidence, dtype=float)
+
+    def buckets(self) -> dict:
+        """Percentages of positive, negative and neutral items."""
+        total = len(self.scores)
+        if not total:
+            return {'positive': 0, 'negative': 0, 'neutral': 0}
+        positive = int(np.count_nonzero(self.scores > POSITIVE_THRESHOLD))
+        negative = int(np.count_nonzero(self.scores < NEGATIVE_THRESHOLD))
+        neutral = total - positive - negative
+        return {
+            'positive': round((positive / total) * 100),
+            'negative': round((negative / total) * 100),
+            'neutral': round((neutral / total) * 100)
+        }
+
+
+class SentimentEngine(ABC):
+    """Scores a whole corpus of titles and comments in one call."""
+
+    @abstractmethod
+    def score_batch(self, texts) -> SentimentBatch:
+        """Polarity and confidence for each text, in order."""
+
+
+class TextBlobSentimentEngine(SentimentEngine):
+    """The original path: one TextBlob per item. Kept for comparison and fallback."""
+
+    def score_batch(self, texts) -> SentimentBatch:
+        from textblob import TextBlob
+
+        scores, confidence = [], []
+        for text in texts:
+            sentiment = TextBlob(text).sentiment
+            scores.append(sentiment.polarity)
+            confidence.append(sentiment.subjectivity)
+        return SentimentBatch(scores, confidence)
+
+
+class LexiconSentimentEngine(SentimentEngine):
+    """
+    Single-pass port of TextBlob's pattern analyzer over a vocabulary compiled
+    once per process: known words carry a polarity, a preceding modifier
+    ("very") scales it, a preceding negation ("not") flips and halves it, and
+    "!" boosts it. Per-item means are aggregated with NumPy. Confidence grows
+    with the number of sentiment-bearing words found in the item.
+    """
+
+    def __init__(self):
+        from textblob.en import sentiment as lexicon
+        from textblob._text import EMOTICONS
+
+        self.polarity = {}
+        self.intensity = {}
+        for word, senses in lexicon.items():
+            p, _, i = senses.get(None) or next(iter(senses.values()))
+            self.polarity[word] = p
+            self.intensity[word] = i
+        self.modifiers = frozenset(w for w, senses in lexicon.items() if any(m in senses for m in lexicon.modifiers))
+        self.negations = frozenset(lexicon.negations)
+        self.emoticons = {e.lower(): p for (_, p), faces in EMOTICONS.items() for e in faces}
+
+    def _assess(self, text, item, items, polarities):
+        assessments = []  # [polarity, intensity, negated]
+        modifier = False
+        negation = False
+        for token in _TOKEN.findall(text.lower()):
+            p = self.polarity.get(token)
+            if p is not None:
+                if modifier and assessments:
+                    last = assessments[-1]
+                    last[0] = max(-1.0, min(p * last[1], 1.0))
+                    last[1] = self.intensity[token]
+                else:
+                    assessments.append([p, self.intensity[token], False])
+                if negation:
+                    last = assessments[-1]
+                    last[1] = 1.0 / last[1] if last[1] else 1.0
+                    last[2] = True
+                modifier = token in self.modifiers
+                negation = token in self.negations
+                continue
+
+            if token in self.negations:
+                negation = True
+            elif negation and len(token.strip("'")) > 1:
+                negation = False
+            if negation and modifier and assessments:
+                assessments[-1][2] = True
+                negation = False
+            elif modifier and len(token) > 2:
+                modifier = False
+            if token == '!' and assessments:
+                assessments[-1][0] = max(-1.0, min(assessments[-1][0] * 1.25, 1.0))
+            face = self.emoticons.get(token)
+            if face is not None:
+                assessments.append([face, 1.0, False])
+
+        for p, _, negated in assessments:
+            items.append(item)
+            polarities.append(p * -0.5 if negated else p)
+
+    def score_batch(self, texts) -> SentimentBatch:
+        items, polarities = [], []
+        for item, text in enumerate(texts):
+            self._assess(text, item, items, polarities)
+
+        n = len(texts)
+        items = np.asarray(items, dtype=np.intp)
+        counts = np.bincount(items, minlength=n)
+        sums = np.bincount(items, weights=np.asarray(polarities, dtype=float), minlength=n)
+        scores = np.divide(sums, counts, out=np.zeros(n), where=counts > 0)
+        confidence = 1.0 - np.power(0.5, counts)
+        return SentimentBatch(scores, confidence)
+
+
+_ENGINES = {
+    'lexicon': LexiconSentimentEngine,
+    'textblob': TextBlobSentimentEngine,
+}
+_engine = None
+
+
+def get_sentiment_engine() -> SentimentEngine:
+    """The configured engine, built once per process."""
+    global _engine
+    if _engine is None:
+        _engine = _ENGINES.get(SENTIMENT_ENGINE, LexiconSentimentEngine)()
+    return _engine
@@ -0,0 +1,92 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from kv_cache import KVCache
+from retrieval import get_index
+
+# Load Configuration
+try:
+    from config import SESSION_TTL, SESSION_MAX_ENTRIES, SESSION_MAX_TURNS
+except ImportError:
+    SESSION_TTL, SESSION_MAX_ENTRIES, SESSION_MAX_TURNS = 2 * 3600, 500, 6
+
+# Sessions are written through to the shared on-disk store so a chat turn
+# routed to a different gunicorn worker can still find its bill.
+_store = KVCache('bill_sessions', ttl=SESSION_TTL, max_entries=SESSION_MAX_ENTRIES * 4)
+
+
+class BillSession:
+    """Everything Sarkari Mitra needs to answer questions about one analyzed bill."""
+
+    def __init__(self, bill_id, bill_name, text, history=None):
+        self.bill_id = bill_id
+        self.bill_name = bill_name
+        self.text = text
+        self.history = list(history or [])
+        self.accessed_at = time.time()
+        # Build the chunk index now so the first question doesn't pay for it.
+        get_index(text)
+
+    def to_dict(self):
+        return {'bill_name': self.bill_name, 'text': self.text, 'history': self.history}
+
+
+_sessions = OrderedDict()
+_lock = threading.Lock()
+
+
+def _remember(session):
+    with _lock:
+        _sessions[session.bill_id] = session
+        _sessions.move_to_end(session.bill_id)
+        while len(_sessions) > SESSION_MAX_ENTRIES:
+            _sessions.popitem(last=False)
+
+
+def create(bill_text: str, bill_name: str) -> str:
+    """Stores an analyzed bill and returns the ID the frontend sends back with chat questions."""
+    session = BillSession(uuid.uuid4().hex, bill_name, bill_text)
+    _remember(session)
+    try:
+        _store.set(session.bill_id, session.to_dict())
+    except Exception as e:
+        print(f"AGENT: Could not persist bill session. Error: {e}")
+    return session.bill_id
+
+
+def get(bill_id: str):
+    """Returns the live session for `bill_id`, or None if it expired or never existed."""
+    now = time.time()
+    with _lock:
+        session = _sessions.get(bill_id)
+        if session is not None:
+            if now - session.accessed_at > SESSION_TTL:
+                del _sessions[bill_id]
+                session = None
+            else:
+                session.accessed_at = now
+                _sessions.move_to_end(bill_id)
+                return session
+
+    try:
+        data = _store.get(bill_id)
+    except Exception as e:
+        print(f"AGENT: Bill session store unavailable. Error: {e}")
+        data = None
+    if data is None:
+        return None
+    session = BillSession(bill_id, data['bill_name'], data['text'], data['history'])
+    _remember(session)
+    return session
+
+
+def add_turn(session: BillSession, query: str, answer: str):
+    """Appends a question/answer pair, keeping only the most recent turns."""
+    session.history.append({'query': query, 'answer': answer})
+    del session.history[:-SESSION_MAX_TURNS]
+    try:
+        _store.set(session.bill_id, session.to_dict())
+    except Exception as e:
+        print(f"AGENT: Could not persist bill session. Error: {e}")
@@ -0,0 +1,260 @@
+import contextvars
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+import governor
+from storage import get_connection
+
+# Load Configuration
+try:
+    from config import SINGLEFLIGHT_LEASE_TTL
+except ImportError:
+    SINGLEFLIGHT_LEASE_TTL = 180
+
+DB_FILE = "singleflight.sqlite3"
+POLL_INTERVAL = 0.2
+# Published results only need to outlive the waiters polling for them.
+RESULT_TTL = 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+_NO_RESULT = object()
+_initialized = False
+# Set by the computation running in this context when its result is for its own caller only.
+_private = contextvars.ContextVar('singleflight_private', default=None)
+_inflight = {}
+_lock = threading.Lock()
+_stats = {'calls': 0, 'cached': 0, 'executions': 0, 'coalesced': 0, 'coalesced_cross_worker': 0}
+
+
+def _db():
+    global _initialized
+    conn = get_connection(DB_FILE)
+    if not _initialized:
+        conn.executescript(_SCHEMA)
+        _initialized = True
+    return conn
+
+
+def _count(name):
+    with _lock:
+        _stats[name] += 1
+
+
+def stats() -> dict:
+    """Counters for this worker: calls, cache hits, executions, and calls coalesced in-process or across workers."""
+    with _lock:
+        return dict(_stats)
+
+
+class _LeaderOutOfTime(Exception):
+    """Handed to in-process waiters whose leader's result was cut short by the leader's own deadline."""
+
+
+def keep_private():
+    """
+    Called from inside a coalesced computation whose result was degraded by
+    its own caller's deadline: that caller still gets it, but it isn't
+    published and joined callers compute (or join) afresh.
+    """
+    flag = _private.get()
+    if flag is not None:
+        flag[0] = True
+
+
+def _shareable() -> bool:
+    # A computation that ran out of its caller's time may have returned a partial result.
+    flag = _private.get()
+    return not (flag and flag[0]) and governor.time_left() != 0
+
+
+def _check_deadline():
+    if governor.time_left() == 0:
+        raise governor.DeadlineError("Stopped waiting for a shared result: the request ran out of time.")
+
+
+def _try_lease(key, owner):
+    conn = _db()
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("DELETE FROM leases WHERE expires_at < ?", (now,))
+        conn.execute("DELETE FROM results WHERE created_at < ?", (now - RESULT_TTL,))
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO leases (key, owner, expires_at) VALUES (?, ?, ?)",
+            (key, owner, now + SINGLEFLIGHT_LEASE_TTL)
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return cursor.rowcount == 1
+
+
+def _lease_active(key):
+    row = _db().execute("SELECT expires_at FROM leases WHERE key = ?", (key,)).fetchone()
+    return row is not None and row['expires_at'] >= time.time()
+
+
+def _published_result(key, since):
+    row = _db().execute("SELECT value, created_at FROM results WHERE key = ?", (key,)).fetchone()
+    if row is None or row['created_at'] < since:
+        return False, None
+    return True, json.loads(row['value'])
+
+
+def _publish_and_release(key, owner, result):
+    # Serialised before BEGIN: a result that can't be shared must not keep the lease held.
+    value = None
+    if result is not _NO_RESULT:
+        try:
+            value = json.dumps(result)
+        except (TypeError, ValueError) as e:
+            print(f"AGENT: Coalesced result is not JSON-serializable, releasing without it. Error: {e}")
+    conn = _db()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if value is not None:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, time.time())
+            )
+        conn.execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _run_across_workers(key, fn):
+    """
+    Runs fn once across all gunicorn workers on this machine: the worker that
+    takes the lease computes and publishes, the others poll for its result.
+    If the lease holder dies or fails, a waiter takes over.
+    """
+    owner = f"{os.getpid()}:{threading.get_ident()}"
+    waiting_since = time.time()
+    while True:
+        if _try_lease(key, owner):
+            result = _NO_RESULT
+            try:
+                _count('executions')
+                result = fn()
+                return result
+            finally:
+                try:
+                    _publish_and_release(key, owner, result if _shareable() else _NO_RESULT)
+                except Exception as e:
+                    print(f"AGENT: Could not publish coalesced result. Error: {e}")
+
+        while _lease_active(key):
+            found, result = _published_result(key, waiting_since)
+            if found:
+                _count('coalesced_cross_worker')
+                return result
+            _check_deadline()
+            time.sleep(POLL_INTERVAL)
+
+        found, result = _published_result(key, waiting_since)
+        if found:
+            _count('coalesced_cross_worker')
+            return result
+
+
+def _wait(future):
+    """The leader's result, giving up once this caller's own deadline passes or it is abandoned."""
+    while True:
+        _check_deadline()
+        try:
+            return future.result(timeout=None if governor.time_left() is None else POLL_INTERVAL)
+        except FutureTimeout:
+            continue
+
+
+def do(key: str, fn):
+    """
+    Returns fn(), sharing one in-flight computation among all concurrent
+    callers with the same key, within this worker and across workers.
+    Results must be JSON-serializable to be shared across workers. A leader
+    that runs out of its own deadline keeps what it got to itself; the
+    callers that joined it try again.
+    """
+    _count('calls')
+    while True:
+        with _lock:
+            future = _inflight.get(key)
+            leader = future is None
+            if leader:
+                future = _inflight[key] = Future()
+        if leader:
+            break
+        _count('coalesced')
+        try:
+            return _wait(future)
+        except _LeaderOutOfTime:
+            continue
+
+    token = _private.set([False])
+    try:
+        try:
+            result = _run_across_workers(key, fn)
+        except sqlite3.Error as e:
+            print(f"AGENT: Single-flight store unavailable, running uncoalesced. Error: {e}")
+            _count('executions')
+            result = fn()
+        if _shareable():
+            future.set_result(result)
+        else:
+            future.set_exception(_LeaderOutOfTime())
+        return result
+    except BaseException as e:
+        out_of_time = isinstance(e, governor.DeadlineError) or not _shareable()
+        future.set_exception(_LeaderOutOfTime() if out_of_time else e)
+        raise
+    finally:
+        _private.reset(token)
+        with _lock:
+            _inflight.pop(key, None)
+
+
+def coalesce(namespace: str, key_func=None, cached=None):
+    """
+    Decorator: concurrent calls whose key matches share one execution.
+    key_func maps the call's arguments to a normalized key; by default the
+    arguments themselves are hashed. cached, if given, takes the same
+    arguments and returns an already stored result (or None); a hit is
+    returned without taking a lease.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if cached:
+                result = cached(*args, **kwargs)
+                if result is not None:
+                    _count('cached')
+                    return result
+            if key_func:
+                raw_key = key_func(*args, **kwargs)
+            else:
+                raw_key = json.dumps([args, kwargs], sort_keys=True, default=str)
+            key = f"{namespace}:{hashlib.sha256(raw_key.encode('utf-8')).hexdigest()}"
+            return do(key, lambda: fn(*args, **kwargs))
+        return wrapper
+    return decorator
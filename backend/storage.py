@@ -0,0 +1,36 @@
+import os
+import sqlite3
+import threading
+
+# Load Configuration
+try:
+    from config import CACHE_DIR
+except ImportError:
+    CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+
+_local = threading.local()
+
+
+def cache_path(filename: str) -> str:
+    """Absolute path of a file inside the shared local cache directory."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return os.path.join(CACHE_DIR, filename)
+
+
+def get_connection(filename: str) -> sqlite3.Connection:
+    """
+    Returns this thread's connection to a SQLite file in the cache directory.
+    WAL mode lets every gunicorn worker read while one of them writes.
+    """
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    conn = connections.get(filename)
+    if conn is None:
+        conn = sqlite3.connect(cache_path(filename), timeout=10, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        connections[filename] = conn
+    return conn
@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# The backend modules are flat files that read their configuration on import,
+# so the cache directory must point somewhere disposable before any of them load.
+os.environ['CACHE_DIR'] = tempfile.mkdtemp(prefix="sarkari-tests-")
+os.environ.setdefault('WARMUP_MODE', 'lazy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,151 @@
+import threading
+import time
+
+import pytest
+
+import governor
+from ratelimit import TokenBucket
+
+
+class Transient(Exception):
+    status_code = 503
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    monkeypatch.setattr(governor, 'BREAKER_FAILURE_THRESHOLD', 2)
+    monkeypatch.setattr(governor, 'BREAKER_RESET_TIMEOUT', 0.1)
+    monkeypatch.setattr(governor, 'RETRY_MAX_ATTEMPTS', 1)
+    monkeypatch.setattr(governor, 'GOVERNOR_WAIT_TIMEOUT', 0.1)
+    return governor.Provider('test', 'Test', requests_per_minute=6000, burst=100, max_concurrency=2)
+
+
+def fail():
+    raise Transient("unavailable")
+
+
+def trip(provider):
+    for _ in range(governor.BREAKER_FAILURE_THRESHOLD):
+        with pytest.raises(Transient):
+            provider.call(fail)
+
+
+def test_transient_errors_are_retried(provider, monkeypatch):
+    monkeypatch.setattr(governor, 'RETRY_MAX_ATTEMPTS', 3)
+    monkeypatch.setattr(governor, 'RETRY_BASE_DELAY', 0)
+    outcomes = [Transient("once"), "ok"]
+
+    def flaky():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert provider.call(flaky) == "ok"
+    assert provider.stats()['retries'] == 1
+
+
+def test_permanent_errors_do_not_count_towards_the_breaker(provider):
+    for _ in range(5):
+        with pytest.raises(KeyError):
+            provider.call(lambda: {}['missing'])
+    assert provider.stats()['circuit_state'] == 0
+
+
+def test_breaker_opens_and_fails_fast(provider):
+    trip(provider)
+    calls = []
+
+    with pytest.raises(governor.CircuitOpenError):
+        provider.call(lambda: calls.append(1))
+
+    assert calls == []
+    assert provider.stats()['circuit_state'] == 1
+    assert provider.stats()['opened'] == 1
+
+
+def test_half_open_lets_one_trial_through_and_recovers(provider):
+    trip(provider)
+    time.sleep(governor.BREAKER_RESET_TIMEOUT)
+    during_trial = []
+
+    def trial():
+        during_trial.append(provider.stats()['circuit_state'])
+        with pytest.raises(governor.CircuitOpenError):
+            provider.call(lambda: "second caller")
+        return "recovered"
+
+    assert provider.call(trial) == "recovered"
+    assert during_trial == [2]
+    assert provider.stats()['circuit_state'] == 0
+    assert provider.call(lambda: "closed") == "closed"
+
+
+def test_failed_trial_reopens_the_breaker(provider):
+    trip(provider)
+    time.sleep(governor.BREAKER_RESET_TIMEOUT)
+
+    with pytest.raises(Transient):
+        provider.call(fail)
+    with pytest.raises(governor.CircuitOpenError):
+        provider.call(lambda: "too soon")
+
+
+def test_bucket_allows_a_burst_then_refills():
+    bucket = TokenBucket(rate=20, capacity=2)
+    assert bucket.try_acquire() and bucket.try_acquire()
+    assert not bucket.try_acquire()
+    assert not bucket.acquire(timeout=0.01)
+    started = time.monotonic()
+    assert bucket.acquire(timeout=1)
+    assert time.monotonic() - started < 0.2
+
+
+def test_empty_bucket_rejects_instead_of_waiting_past_the_limit(provider):
+    provider.bucket = TokenBucket(rate=0.01, capacity=1)
+    assert provider.call(lambda: "first") == "first"
+
+    with pytest.raises(governor.ProviderBusyError):
+        provider.call(lambda: "second")
+    assert provider.stats()['rejected'] == 1
+
+
+def test_concurrency_cap(provider):
+    entered, release = threading.Event(), threading.Event()
+    holders = [threading.Thread(target=provider.call, args=(lambda: (entered.set(), release.wait(5)),))
+               for _ in range(provider.max_concurrency)]
+    for holder in holders:
+        holder.start()
+    entered.wait(5)
+    time.sleep(0.05)
+
+    with pytest.raises(governor.ProviderBusyError):
+        provider.call(lambda: "over the cap")
+    release.set()
+    for holder in holders:
+        holder.join(5)
+
+
+def test_calls_past_the_deadline_are_refused(provider):
+    calls = []
+    with governor.deadline(time.monotonic() - 1):
+        with pytest.raises(governor.DeadlineError):
+            provider.call(lambda: calls.append(1))
+
+    cancelled = threading.Event()
+    with governor.deadline(time.monotonic() + 60, cancelled):
+        assert provider.call(lambda: "in time") == "in time"
+        cancelled.set()
+        assert governor.abandoned()
+        with pytest.raises(governor.DeadlineError):
+            provider.call(lambda: calls.append(1))
+    assert calls == []
+
+
+def test_nested_deadlines_only_tighten():
+    with governor.deadline(time.monotonic() + 1):
+        with governor.deadline(time.monotonic() + 60):
+            assert governor.time_left() <= 1
+        with governor.deadline(time.monotonic() + 0.5):
+            assert governor.time_left() <= 0.5
+    assert governor.time_left() is None
@@ -0,0 +1,155 @@
+import itertools
+from datetime import datetime, timezone
+
+import pytest
+
+import history
+
+
+class FakeFirestore:
+    """In-memory stand-in for the slice of the Firestore client history uses."""
+
+    def __init__(self, fail_commits=0):
+        self.docs = {}          # path tuple -> data
+        self.commits = []       # number of writes in each committed batch
+        self.reads = 0
+        self.fail_commits = fail_commits
+        self._ids = itertools.count()
+
+    def collection(self, name):
+        return FakeCollection(self, (name,))
+
+    def batch(self):
+        return FakeBatch(self)
+
+
+class FakeCollection:
+    def __init__(self, store, path, order=None, limit=None):
+        self.store, self.path, self.order, self._limit = store, path, order, limit
+
+    def document(self, doc_id=None):
+        return FakeDocument(self.store, self.path + (doc_id or f"doc{next(self.store._ids)}",))
+
+    def order_by(self, field, direction='ASCENDING'):
+        return FakeCollection(self.store, self.path, (field, direction == 'DESCENDING'), self._limit)
+
+    def limit(self, n):
+        return FakeCollection(self.store, self.path, self.order, n)
+
+    def stream(self):
+        self.store.reads += 1
+        docs = [FakeSnapshot(path[-1], data) for path, data in self.store.docs.items()
+                if path[:-1] == self.path]
+        if self.order:
+            field, descending = self.order
+            docs.sort(key=lambda doc: doc.data[field], reverse=descending)
+        return iter(docs[:self._limit])
+
+
+class FakeDocument:
+    def __init__(self, store, path):
+        self.store, self.path = store, path
+        self.id = path[-1]
+
+    def collection(self, name):
+        return FakeCollection(self.store, self.path + (name,))
+
+
+class FakeSnapshot:
+    def __init__(self, doc_id, data):
+        self.id, self.data = doc_id, data
+
+    def to_dict(self):
+        return dict(self.data)
+
+
+class FakeBatch:
+    def __init__(self, store):
+        self.store, self.writes = store, []
+
+    def set(self, ref, data):
+        self.writes.append((ref.path, data))
+
+    def commit(self):
+        if self.store.fail_commits:
+            self.store.fail_commits -= 1
+            raise ConnectionError("firestore unavailable")
+        self.store.docs.update({path: dict(data) for path, data in self.writes})
+        self.store.commits.append(len(self.writes))
+
+
+@pytest.fixture
+def firestore(monkeypatch):
+    store = FakeFirestore()
+    history.init(lambda: store)
+    # Flushes are driven by the tests; no background thread, no retry sleeps.
+    monkeypatch.setattr(history, '_start_flusher', lambda: None)
+    monkeypatch.setattr(history.time, 'sleep', lambda seconds: None)
+    monkeypatch.setattr(history, 'HISTORY_FLUSH_INTERVAL', 0)
+    history._cache.clear()
+    while not history._pending.empty():
+        history._pending.get_nowait()
+    for name in history._stats:
+        history._stats[name] = 0
+    return store
+
+
+def record(uid, n):
+    history.record(uid, f"Bill {n}", f"Summary {n}", {'positive': n}, f"https://example.gov.in/{n}")
+
+
+def test_record_is_visible_before_flush_and_written_behind(firestore):
+    record('u1', 1)
+
+    assert firestore.commits == []
+    assert [item['billName'] for item in history._cache.get('u1')['items']] == ["Bill 1"]
+    assert history.flush() == 1
+    assert firestore.commits == [1]
+    assert history.stats()['written'] == 1
+
+
+def test_flush_batches_pending_entries(firestore, monkeypatch):
+    monkeypatch.setattr(history, 'HISTORY_BATCH_SIZE', 3)
+    for n in range(7):
+        record(f"u{n % 2}", n)
+
+    while history.flush():
+        pass
+
+    assert firestore.commits == [3, 3, 1]
+    assert history.stats()['batches'] == 3
+    assert len(firestore.docs) == 7
+
+
+def test_failed_batches_are_retried_then_counted(firestore):
+    firestore.fail_commits = 1
+    record('u1', 1)
+    history.flush()
+    assert firestore.commits == [1]
+    assert history.stats()['failed'] == 0
+
+    firestore.fail_commits = history.FLUSH_RETRIES
+    record('u1', 2)
+    history.flush()
+    assert history.stats()['failed'] == 1
+    assert len(firestore.docs) == 1
+
+
+def test_partial_cache_reads_through_and_merges(firestore):
+    stored = firestore.collection('users').document('u1').collection('history')
+    batch = firestore.batch()
+    for n in range(3):
+        batch.set(stored.document(f"old{n}"), {'billName': f"Old {n}", 'date': datetime(2024, 1, n + 1, tzinfo=timezone.utc)})
+    batch.commit()
+
+    # A write made since the last read leaves the cached entry partial.
+    record('u1', 9)
+    assert history._cache.get('u1')['partial'] is True
+
+    items = history.recent('u1')
+    assert [item['billName'] for item in items] == ["Bill 9", "Old 2", "Old 1", "Old 0"]
+    assert firestore.reads == 1
+
+    # Complete now: served from the cache without another Firestore read.
+    assert history.recent('u1') == items
+    assert firestore.reads == 1
@@ -0,0 +1,48 @@
+import time
+
+import pytest
+
+import kv_cache
+from kv_cache import KVCache
+
+
+@pytest.fixture
+def cache(request):
+    # One table per test, named after it.
+    return KVCache(request.node.name, ttl=60, max_entries=2)
+
+
+def test_hits_and_misses_do_not_write(cache):
+    cache.set('a', {'n': 1})
+    conn = cache._db()
+    changes = conn.total_changes
+
+    assert cache.get('a') == {'n': 1}
+    assert cache.get('missing', 'default') == 'default'
+
+    assert conn.total_changes == changes
+    assert cache.stats() == {'entries': 1, 'hits': 1, 'misses': 1}
+
+
+def test_flush_writes_buffered_counters(cache, monkeypatch):
+    cache.set('a', 1)
+    cache.get('a')
+    monkeypatch.setattr(kv_cache, 'ACCESS_FLUSH_INTERVAL', 0)
+    cache.get('b')
+
+    row = cache._db().execute("SELECT hits, misses FROM kv_stats WHERE name = ?", (cache.name,)).fetchone()
+    assert (row['hits'], row['misses']) == (1, 1)
+    assert cache.stats()['hits'] == 1
+
+
+def test_eviction_sees_buffered_access_times(cache):
+    cache.set('old', 1)
+    time.sleep(0.01)
+    cache.set('new', 2)
+    time.sleep(0.01)
+    cache.get('old')
+
+    cache.set('newest', 3)
+
+    assert cache.get('old') == 1
+    assert cache.get('new') is None
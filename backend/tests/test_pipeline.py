@@ -0,0 +1,61 @@
+import threading
+import time
+
+import governor
+import pipeline
+from pipeline import Stage
+
+
+def collect(stages):
+    return [(name, result, status) for name, result, _, status in pipeline.iter_stages(stages)]
+
+
+def test_slow_stage_times_out_with_its_fallback_and_is_cancelled():
+    stopped = threading.Event()
+
+    def slow():
+        while not governor.abandoned():
+            time.sleep(0.01)
+        stopped.set()
+        return "too late"
+
+    events = collect([
+        Stage('fast', lambda: "done", timeout=2),
+        Stage('slow', slow, timeout=0.2, fallback="fallback"),
+    ])
+
+    assert events == [('fast', "done", 'ok'), ('slow', "fallback", 'timeout')]
+    assert stopped.wait(2)
+
+
+def test_failing_stage_yields_its_fallback():
+    def broken():
+        raise RuntimeError("boom")
+
+    results, timings = pipeline.run_stages([
+        Stage('broken', broken, timeout=2, fallback=[]),
+        Stage('fine', lambda x: x * 2, (21,), timeout=2),
+    ])
+
+    assert results == {'broken': [], 'fine': 42}
+    assert timings['broken']['status'] == 'error'
+    assert timings['fine']['status'] == 'ok'
+
+
+def test_streaming_stage_yields_pieces_then_the_joined_text():
+    def pieces():
+        yield "Sarkari "
+        yield "Sanket"
+
+    events = collect([Stage('summary', pieces, timeout=2, stream=True)])
+
+    assert events == [
+        ('summary', "Sarkari ", 'partial'),
+        ('summary', "Sanket", 'partial'),
+        ('summary', "Sarkari Sanket", 'ok'),
+    ]
+
+
+def test_stage_deadline_bounds_governed_calls():
+    results, _ = pipeline.run_stages([Stage('bounded', governor.time_left, timeout=1)])
+    assert 0 < results['bounded'] <= 1
@@ -0,0 +1,103 @@
+import csv
+import json
+
+import pytest
+
+import schemes_index
+
+SCHEMES = [
+    {'name': "PM-KISAN", 'url': "https://pmkisan.gov.in", 'occupation': "Farmers", 'state': "All India"},
+    {'title': "Punjab Kisan Credit", 'official_link': "https://punjab.gov.in/kcc",
+     'states': "Punjab", 'occupations': "farmer;dairy farmer", 'max_income': "3,00,000"},
+    {'scheme_name': "Yuva Sahayata", 'link': "https://example.gov.in/yuva", 'min_age': 18, 'max_age': 21},
+    {'scheme_name': "Sukanya Samriddhi", 'link': "https://example.gov.in/ssy",
+     'sex': "Female", 'is_only_girl_child': "Yes"},
+    {'scheme_name': "Senior Pension", 'link': "https://example.gov.in/pension", 'min_age': "60",
+     'income_min': "0", 'income_limit': "1,00,000"},
+    {'scheme_name': "", 'link': "https://example.gov.in/unnamed"},
+    {'scheme_name': "No link"},
+]
+
+
+@pytest.fixture
+def catalogue(tmp_path, monkeypatch):
+    # Every test starts from a freshly loaded copy of this catalogue.
+    monkeypatch.setattr(schemes_index, '_index', None)
+    monkeypatch.setattr(schemes_index, '_index_checked_at', 0.0)
+    path = tmp_path / "schemes.json"
+    path.write_text(json.dumps({'schemes': SCHEMES}))
+    return schemes_index.ingest(str(path))
+
+
+def names(profile, limit=10):
+    return [match['scheme_name'] for match in schemes_index.match_profile(profile, limit)]
+
+
+def test_ingest_maps_aliases_and_skips_incomplete_rows(catalogue):
+    assert catalogue == {'ingested': 5, 'skipped': 2}
+    records = {r['scheme_name']: r for r in schemes_index.get_index().records}
+
+    assert records["PM-KISAN"]['link'] == "https://pmkisan.gov.in"
+    assert records["PM-KISAN"]['states'] == []   # 'All India' is open to everyone
+    assert records["Punjab Kisan Credit"]['occupations'] == ['dairy farmer', 'farmer']
+    assert records["Punjab Kisan Credit"]['income_max'] == 300000
+    assert records["Sukanya Samriddhi"]['only_girl_child'] is True
+    assert records["Senior Pension"]['age_min'] == 60
+
+
+def test_ingest_reads_csv_dumps(tmp_path, monkeypatch):
+    monkeypatch.setattr(schemes_index, '_index', None)
+    path = tmp_path / "schemes.csv"
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=['title', 'url', 'gender'])
+        writer.writeheader()
+        writer.writerow({'title': "Mahila Udyam", 'url': "https://example.gov.in/mahila", 'gender': "female"})
+
+    assert schemes_index.ingest(str(path)) == {'ingested': 1, 'skipped': 0}
+    assert names({'sex': 'Female'}) == ["Mahila Udyam"]
+    assert names({'sex': 'Male'}) == []
+
+
+def test_indexed_fields_match_terms_and_open_schemes(catalogue):
+    punjab_farmer = names({'state': 'Punjab', 'occupation': 'Farmer', 'income': 200000, 'age': 40})
+    # The more specific scheme ranks first; schemes open to everyone still match.
+    assert punjab_farmer == ["Punjab Kisan Credit", "PM-KISAN"]
+    assert "Punjab Kisan Credit" not in names({'state': 'Kerala', 'occupation': 'farmer'})
+    assert "Punjab Kisan Credit" in names({'state': 'punjab', 'occupation': 'Dairy Farmers'})
+
+
+@pytest.mark.parametrize('income, eligible', [
+    (300000, True), ("3,00,000", True), (300001, False), (450000, False),
+])
+def test_income_limits_are_exact(catalogue, income, eligible):
+    matched = names({'state': 'Punjab', 'occupation': 'farmer', 'income': income})
+    assert ("Punjab Kisan Credit" in matched) is eligible
+
+
+@pytest.mark.parametrize('age, eligible', [(17, False), (18, True), (21, True), (24, False)])
+def test_age_limits_are_exact(catalogue, age, eligible):
+    assert ("Yuva Sahayata" in names({'age': age})) is eligible
+
+
+def test_unparseable_numbers_do_not_filter(catalogue):
+    assert "Yuva Sahayata" in names({'age': 'nan', 'income': 'not disclosed'})
+    assert schemes_index.normalize_number('inf') is None
+
+
+def test_girl_child_schemes_need_the_flag(catalogue):
+    assert "Sukanya Samriddhi" not in names({'sex': 'Female'})
+    assert names({'sex': 'Female', 'is_only_girl_child': 'Yes'})[0] == "Sukanya Samriddhi"
+
+
+def test_reingest_bumps_the_version_and_reloads(catalogue, tmp_path, monkeypatch):
+    version = schemes_index.catalogue_version()
+    path = tmp_path / "replacement.json"
+    path.write_text(json.dumps([{'name': "Naya Yojana", 'url': "https://example.gov.in/naya"}]))
+    schemes_index.ingest(str(path))
+
+    # Within the reload interval the worker keeps its loaded index...
+    assert "Naya Yojana" not in names({})
+    # ...and picks up the new catalogue once it checks again.
+    monkeypatch.setattr(schemes_index, '_index_checked_at', 0.0)
+    assert names({}) == ["Naya Yojana"]
+    assert schemes_index.catalogue_version() != version
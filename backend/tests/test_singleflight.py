@@ -0,0 +1,179 @@
+import threading
+import time
+import uuid
+
+import pytest
+
+import governor
+import singleflight
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(singleflight, 'POLL_INTERVAL', 0.01)
+
+
+@pytest.fixture
+def key():
+    return f"test:{uuid.uuid4().hex}"
+
+
+def lease_count(key):
+    return singleflight._db().execute("SELECT COUNT(*) FROM leases WHERE key = ?", (key,)).fetchone()[0]
+
+
+def test_concurrent_callers_share_one_execution(key):
+    release = threading.Event()
+    executions = []
+
+    def compute():
+        executions.append(1)
+        release.wait(5)
+        return {'answer': 42}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(singleflight.do(key, compute))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while not executions:
+        time.sleep(0.01)
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(executions) == 1
+    assert results == [{'answer': 42}] * 5
+    assert lease_count(key) == 0
+
+
+def test_waits_for_another_workers_lease_and_takes_its_result(key):
+    assert singleflight._try_lease(key, 'other-worker')
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(singleflight.do(key, lambda: 'computed here')))
+    waiter.start()
+    time.sleep(0.05)
+    assert not results
+
+    singleflight._publish_and_release(key, 'other-worker', 'computed there')
+    waiter.join(5)
+    assert results == ['computed there']
+
+
+def test_takes_over_when_the_lease_holder_gives_up(key):
+    assert singleflight._try_lease(key, 'other-worker')
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(singleflight.do(key, lambda: 'computed here')))
+    waiter.start()
+    time.sleep(0.05)
+
+    # The holder failed: lease released without a result.
+    singleflight._publish_and_release(key, 'other-worker', singleflight._NO_RESULT)
+    waiter.join(5)
+    assert results == ['computed here']
+
+
+def test_errors_reach_every_caller_and_release_the_lease(key):
+    started = threading.Event()
+
+    def fail():
+        started.set()
+        time.sleep(0.05)
+        raise ValueError("upstream failed")
+
+    errors = []
+
+    def call():
+        try:
+            singleflight.do(key, fail)
+        except ValueError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    for thread in (leader, follower):
+        thread.join(5)
+
+    assert len(errors) == 2
+    assert lease_count(key) == 0
+
+
+def test_unserialisable_result_still_releases_the_lease(key):
+    value = object()
+    assert singleflight.do(key, lambda: value) is value
+    assert lease_count(key) == 0
+
+
+def test_cache_hit_skips_the_lease(monkeypatch):
+    calls = []
+    monkeypatch.setattr(singleflight, '_try_lease', lambda *args: pytest.fail("lease taken on a cache hit"))
+
+    @singleflight.coalesce('test_cached', cached=lambda name: f"stored {name}" if name == 'known' else None)
+    def lookup(name):
+        calls.append(name)
+        return f"fresh {name}"
+
+    assert lookup('known') == "stored known"
+    assert calls == []
+
+
+def test_leader_out_of_time_is_not_shared_with_callers_that_joined(key):
+    started, release = threading.Event(), threading.Event()
+    results = {}
+
+    def compute(caller):
+        started.set()
+        release.wait(5)
+        if governor.time_left() == 0:
+            raise governor.DeadlineError("No slot freed up before the request's deadline.")
+        return f"computed for {caller}"
+
+    def call(caller, seconds):
+        with governor.deadline(time.monotonic() + seconds):
+            try:
+                results[caller] = singleflight.do(key, lambda: compute(caller))
+            except governor.DeadlineError as e:
+                results[caller] = e
+
+    short = threading.Thread(target=call, args=('short', 0.1))
+    short.start()
+    started.wait(5)
+    long = threading.Thread(target=call, args=('long', 30))
+    long.start()
+    time.sleep(0.2)
+    release.set()
+    for thread in (short, long):
+        thread.join(5)
+
+    assert isinstance(results['short'], governor.DeadlineError)
+    assert results['long'] == "computed for long"
+    assert lease_count(key) == 0
+
+
+def test_private_results_reach_only_their_own_caller(key):
+    def degraded():
+        singleflight.keep_private()
+        return "titles only"
+
+    assert singleflight.do(key, degraded) == "titles only"
+    assert singleflight._published_result(key, 0) == (False, None)
+    assert lease_count(key) == 0
+
+
+def test_cross_worker_waiter_stops_at_its_own_deadline(key):
+    assert singleflight._try_lease(key, 'other-worker')
+    started = time.monotonic()
+
+    with governor.deadline(started + 0.1):
+        with pytest.raises(governor.DeadlineError):
+            singleflight.do(key, lambda: "never runs")
+    assert time.monotonic() - started < 1
+
+    cancelled = threading.Event()
+    cancelled.set()
+    with governor.deadline(time.monotonic() + 30, cancelled):
+        with pytest.raises(governor.DeadlineError):
+            singleflight.do(key, lambda: "never runs")
@@ -0,0 +1,105 @@
+import threading
+import time
+
+from clients import get_firestore, get_gemini_model, get_search_service
+
+# Load Configuration
+try:
+    from config import WARMUP_MODE, WARMUP_TASKS
+except ImportError:
+    WARMUP_MODE, WARMUP_TASKS = 'background', ('firebase', 'gemini', 'search', 'reddit', 'pdf', 'html', 'sentiment')
+
+# Models whose client objects are built ahead of the first analysis.
+WARMUP_MODELS = ('gemini-2.5-flash', 'gemini-2.5-flash-lite')
+
+_lock = threading.Lock()
+_started = False
+_boot_seconds = None
+_timings = {}   # task -> seconds, for tasks that have run
+_failed = set()
+
+
+def _warm_reddit():
+    import praw  # noqa: F401 - the client itself is built per thread on first use
+
+
+def _warm_pdf():
+    import PyPDF2  # noqa: F401
+
+
+def _warm_html():
+    import html_extract
+    html_extract.lxml_etree()
+
+
+def _warm_gemini():
+    for model_name in WARMUP_MODELS:
+        get_gemini_model(model_name)
+
+
+def _warm_sentiment():
+    from sentiment import get_sentiment_engine
+    get_sentiment_engine()
+
+
+# Each task imports a heavy library and/or builds the shared client an endpoint needs.
+TASKS = {
+    'firebase': get_firestore,
+    'gemini': _warm_gemini,
+    'search': get_search_service,
+    'reddit': _warm_reddit,
+    'pdf': _warm_pdf,
+    'html': _warm_html,
+    'sentiment': _warm_sentiment,
+}
+
+
+def run(tasks=None):
+    """Runs the named warm-up tasks (all configured ones by default) in order, timing each."""
+    for name in tasks or WARMUP_TASKS:
+        task = TASKS.get(name)
+        if task is None:
+            print(f"AGENT: Unknown warm-up task '{name}'.")
+            continue
+        started = time.perf_counter()
+        try:
+            task()
+        except Exception as e:
+            print(f"AGENT: Warm-up task '{name}' failed. Error: {e}")
+            with _lock:
+                _failed.add(name)
+        elapsed = time.perf_counter() - started
+        with _lock:
+            _timings[name] = elapsed
+    print(f"AGENT: Warm-up done in {sum(_timings.values()):.2f}s.")
+
+
+def start(boot_seconds: float = None, mode: str = None):
+    """
+    Called once the app module has loaded. 'background' warms up on a daemon
+    thread so the worker takes traffic straight away, 'eager' warms up before
+    returning, and 'lazy' leaves every client to its first request.
+    """
+    global _started, _boot_seconds
+    mode = mode or WARMUP_MODE
+    with _lock:
+        if _started:
+            return
+        _started = True
+        _boot_seconds = boot_seconds
+    if boot_seconds is not None:
+        print(f"AGENT: App loaded in {boot_seconds:.2f}s (warm-up: {mode}).")
+    if mode == 'eager':
+        run()
+    elif mode == 'background':
+        threading.Thread(target=run, name="warmup", daemon=True).start()
+
+
+def stats() -> dict:
+    with _lock:
+        values = {f"{name}_seconds": round(seconds, 4) for name, seconds in _timings.items()}
+        values['tasks_done'] = len(_timings)
+        values['tasks_failed'] = len(_failed)
+        if _boot_seconds is not None:
+            values['boot_seconds'] = round(_boot_seconds, 4)
+        return values
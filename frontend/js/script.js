@@ -25,7 +25,7 @@ try {
 // Global State
 let currentUser = null;
 let currentToken = null;
-let lastAnalyzedBillText = ""; 
+let lastAnalyzedBillId = ""; 
 // const backendUrl = 'http://127.0.0.1:5000'; // local testing
 const backendUrl = 'https://sarkari-sanket-backend.onrender.com'; // production
 
@@ -150,7 +150,15 @@ if (signupBtn) signupBtn.addEventListener('click', () => signupModal.classList.r
 document.getElementById('close-login-modal').addEventListener('click', () => { loginModal.classList.add('hidden'); loginError.textContent = ""; });
 document.getElementById('close-signup-modal').addEventListener('click', () => { signupModal.classList.add('hidden'); signupError.textContent = ""; });
 
-if (logoutBtn) logoutBtn.addEventListener('click', () => auth.signOut());
+if (logoutBtn) logoutBtn.addEventListener('click', async () => {
+    // Let the backend drop its cached verification of this token before signing out
+    if (currentToken) {
+        try {
+            await fetch(`${backendUrl}/api/logout`, { method: 'POST', headers: { 'Authorization': `Bearer ${currentToken}` } });
+        } catch (err) { console.error("Logout Error:", err); }
+    }
+    auth.signOut();
+});
 
 loginForm.addEventListener('submit', async (e) => {
     e.preventDefault();
@@ -316,6 +324,66 @@ async function findSchemes() {
     }
 }
 
+// ========== Streaming (Server-Sent Events over fetch) ==========
+// Reads a text/event-stream response and calls onEvent(name, data) for each event.
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let boundary;
+        while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+            const raw = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            let event = "message", data = "";
+            raw.split("\n").forEach(line => {
+                if (line.startsWith("event: ")) event = line.slice(7);
+                else if (line.startsWith("data: ")) data += line.slice(6);
+            });
+            onEvent(event, data ? JSON.parse(data) : {});
+        }
+    }
+}
+
+function renderMarkdown(text) {
+    return text.replace(/### (.*?)\n/g, '<h3 class="text-xl font-bold mt-6 text-blue-900 border-b pb-2 mb-4">$1</h3>').replace(/\*\*(.*?)\*\*/g, '<strong>$1</strong>');
+}
+
+function renderSentiment(sentiment) {
+    const { positive, negative, neutral } = sentiment;
+    sentimentBar.innerHTML = `<div class="h-full bg-green-500" style="width:${positive}%"></div><div class="h-full bg-red-500" style="width:${negative}%"></div><div class="h-full bg-gray-300" style="width:${neutral}%\"></div>`;
+    sentimentNote.textContent = `Average Sentiment: ${positive}% Positive public sentiment.`;
+}
+
+function renderImpact(impactScores) {
+    const relevant = Object.entries(impactScores).filter(([_, v]) => v.score > 20);
+    if (relevant.length > 0) {
+        impactSection.classList.remove('hidden');
+        impactGrid.innerHTML = relevant.map(([k, v]) => `
+            <div class="p-4 border rounded-xl bg-gray-50 text-center">
+                <div class="text-[10px] uppercase font-bold text-gray-400 mb-1">${k}</div>
+                <div class="text-3xl font-black text-blue-600">${v.score}</div>
+                <p class="text-[9px] text-gray-400 mt-1 leading-tight">${v.reason}</p>
+            </div>
+        `).join('');
+    } else { impactSection.classList.add('hidden'); }
+}
+
+function renderNews(news) {
+    if (news && news.length > 0) {
+        newsSection.classList.remove('hidden');
+        newsFeed.innerHTML = news.map(n => `
+            <div class="border-b border-gray-100 pb-3 mb-3 text-left">
+                <a href="${n.link}" target="_blank" class="text-sm font-bold text-blue-600 hover:underline block">${n.title}</a>
+                <p class="text-[11px] text-gray-400 mt-1 leading-snug">${n.snippet}</p>
+            </div>
+        `).join('');
+    }
+}
+
 // ========== Bill Analysis & Side-by-Side UI ==========
 if (billForm) {
   billForm.addEventListener('submit', async (e) => {
@@ -330,52 +398,42 @@ if (billForm) {
     if (billFileInput.files[0]) formData.append('bill_file', billFileInput.files[0]);
 
     try {
-      const response = await fetch(`${backendUrl}/api/analyze`, { 
+      const response = await fetch(`${backendUrl}/api/analyze/stream`, { 
           method: 'POST', 
           headers: currentToken ? { 'Authorization': `Bearer ${currentToken}` } : {},
           body: formData 
       });
-      const data = await response.json();
-      if (!response.ok) throw new Error(data.error);
-
-      lastAnalyzedBillText = data.bill_text;
-      resultsWrapper.classList.remove('hidden');
-
-      // Row 1: Summary alone (Full Width)
-      summaryTitle.textContent = `Summary (${languageToggle.checked ? 'Hinglish' : 'English'})`;
-      summaryContent.innerHTML = data.summary.replace(/### (.*?)\n/g, '<h3 class="text-xl font-bold mt-6 text-blue-900 border-b pb-2 mb-4">$1</h3>').replace(/\*\*(.*?)\*\*/g, '<strong>$1</strong>');
-
-      if (data.source_url) {
-        sourceInfo.innerHTML = `Sourced from: <a href="${data.source_url}" target="_blank" class="text-blue-600 underline">${data.source_url}</a>`;
+      if (!response.ok) {
+          const data = await response.json();
+          throw new Error(data.error);
       }
 
-      // Row 2: Sentiment + Impact side-by-side
-      const { positive, negative, neutral } = data.sentiment;
-      sentimentBar.innerHTML = `<div class="h-full bg-green-500" style="width:${positive}%"></div><div class="h-full bg-red-500" style="width:${negative}%"></div><div class="h-full bg-gray-300" style="width:${neutral}%\"></div>`;
-      sentimentNote.textContent = `Average Sentiment: ${positive}% Positive public sentiment.`;
-
-      const relevant = Object.entries(data.impact_scores).filter(([_, v]) => v.score > 20);
-      if (relevant.length > 0) {
-          impactSection.classList.remove('hidden');
-          impactGrid.innerHTML = relevant.map(([k, v]) => `
-              <div class="p-4 border rounded-xl bg-gray-50 text-center">
-                  <div class="text-[10px] uppercase font-bold text-gray-400 mb-1">${k}</div>
-                  <div class="text-3xl font-black text-blue-600">${v.score}</div>
-                  <p class="text-[9px] text-gray-400 mt-1 leading-tight">${v.reason}</p>
-              </div>
-          `).join('');
-      } else { impactSection.classList.add('hidden'); }
-
-      // Row 3: Mitra + News side-by-side
-      if (data.news && data.news.length > 0) {
-          newsSection.classList.remove('hidden');
-          newsFeed.innerHTML = data.news.map(n => `
-              <div class="border-b border-gray-100 pb-3 mb-3 text-left">
-                  <a href="${n.link}" target="_blank" class="text-sm font-bold text-blue-600 hover:underline block">${n.title}</a>
-                  <p class="text-[11px] text-gray-400 mt-1 leading-snug">${n.snippet}</p>
-              </div>
-          `).join('');
-      }
+      // Row 1: Summary alone (Full Width), rendered as it streams in
+      let summary = "";
+      summaryTitle.textContent = `Summary (${languageToggle.checked ? 'Hinglish' : 'English'})`;
+      summaryContent.innerHTML = "";
+      sourceInfo.innerHTML = "";
+
+      await readEventStream(response, (event, data) => {
+          if (event === 'meta') {
+              lastAnalyzedBillId = data.bill_id;
+              resultsWrapper.classList.remove('hidden');
+              if (data.source_url) {
+                  sourceInfo.innerHTML = `Sourced from: <a href="${data.source_url}" target="_blank" class="text-blue-600 underline">${data.source_url}</a>`;
+              }
+          } else if (event === 'summary_chunk') {
+              summary += data.text;
+              summaryContent.innerHTML = renderMarkdown(summary);
+          } else if (event === 'stage') {
+              // Row 2: Sentiment + Impact side-by-side, Row 3: Mitra + News
+              if (data.name === 'summary') summaryContent.innerHTML = renderMarkdown(data.result);
+              else if (data.name === 'sentiment') renderSentiment(data.result);
+              else if (data.name === 'impact_scores') renderImpact(data.result);
+              else if (data.name === 'news') renderNews(data.result);
+          } else if (event === 'error') {
+              errorMessage.textContent = data.error;
+          }
+      });
       saveToHistory();
     } catch (err) { errorMessage.textContent = err.message; }
     finally { btn.disabled = false; btn.innerHTML = 'Analyze Bill'; }
@@ -386,20 +444,34 @@ if (billForm) {
 if (chatSend) {
     chatSend.addEventListener('click', async () => {
         const query = chatInput.value.trim();
-        if (!query || !lastAnalyzedBillText) return;
+        if (!query || !lastAnalyzedBillId) return;
         chatBox.innerHTML += `<div class="text-right mb-4"><span class="bg-blue-500 text-white p-3 rounded-xl text-xs inline-block shadow-sm">You: ${query}</span></div>`;
         chatInput.value = "";
         chatBox.scrollTop = chatBox.scrollHeight;
 
         try {
-            const res = await fetch(`${backendUrl}/api/chat`, { 
+            const res = await fetch(`${backendUrl}/api/chat/stream`, { 
                 method: 'POST', 
                 headers: { 'Content-Type': 'application/json' }, 
-                body: JSON.stringify({ bill_text: lastAnalyzedBillText, query, language: 'English' }) 
+                body: JSON.stringify({ bill_id: lastAnalyzedBillId, query, language: 'English' }) 
+            });
+            const bubble = document.createElement('div');
+            bubble.className = "text-left mb-4";
+            bubble.innerHTML = `<span class="bg-gray-100 p-3 rounded-xl text-xs inline-block border shadow-sm">Mitra: </span>`;
+            chatBox.appendChild(bubble);
+            const answerSpan = bubble.querySelector('span');
+
+            if (!res.ok) {
+                const d = await res.json();
+                answerSpan.textContent += d.error;
+                return;
+            }
+            await readEventStream(res, (event, data) => {
+                if (event === 'chunk') {
+                    answerSpan.textContent += data.text;
+                    chatBox.scrollTop = chatBox.scrollHeight;
+                }
             });
-            const d = await res.json();
-            chatBox.innerHTML += `<div class="text-left mb-4"><span class="bg-gray-100 p-3 rounded-xl text-xs inline-block border shadow-sm">Mitra: ${d.answer}</span></div>`;
-            chatBox.scrollTop = chatBox.scrollHeight;
         } catch (err) { console.error("Chat error:", err); }
     });
 }
@@ -408,7 +480,7 @@ document.getElementById('compare-form').addEventListener('submit', async (e) =>
     e.preventDefault();
     const btn = document.getElementById('compare-button');
     btn.innerHTML = "Simplifying differences...";
-    const res = await fetch(`${backendUrl}/api/compare`, { 
+    const res = await fetch(`${backendUrl}/api/compare/stream`, { 
         method: 'POST', 
         headers: { 'Content-Type': 'application/json' }, 
         body: JSON.stringify({ 
@@ -417,17 +489,33 @@ document.getElementById('compare-form').addEventListener('submit', async (e) =>
             language: document.getElementById('compareLanguage').value 
         }) 
     });
-    const data = await res.json();
+    const content = document.getElementById('compare-content');
     document.getElementById('compare-results').classList.remove('hidden');
-    document.getElementById('compare-content').innerHTML = data.comparison.replace(/### (.*?)\n/g, '<h3 class="text-lg font-bold mt-4 text-green-700">$1</h3>');
+    content.innerHTML = "";
+    if (!res.ok) {
+        const data = await res.json();
+        content.textContent = data.error;
+    } else {
+        let comparison = "";
+        await readEventStream(res, (event, data) => {
+            if (event === 'chunk') {
+                comparison += data.text;
+                content.innerHTML = comparison.replace(/### (.*?)\n/g, '<h3 class="text-lg font-bold mt-4 text-green-700">$1</h3>');
+            }
+        });
+    }
     btn.innerHTML = "Compare Now";
 });
 
+// Last list fetched by loadHistory, reused by restoreHistory instead of fetching again
+let historyItems = [];
+
 async function loadHistory() {
     if (!currentUser || !currentToken) return;
     try {
         const res = await fetch(`${backendUrl}/api/get-history`, { headers: { 'Authorization': `Bearer ${currentToken}` } });
         const history = await res.json();
+        historyItems = Array.isArray(history) ? history : [];
         historyList.innerHTML = "";
         if (history.length > 0) {
             noHistory.style.display = "none";
@@ -446,15 +534,12 @@ async function saveToHistory() {
 }
 
 async function restoreHistory(docId) {
-    if (!currentToken) return;
-    const res = await fetch(`${backendUrl}/api/get-history`, { headers: { 'Authorization': `Bearer ${currentToken}` } });
-    const history = await res.json();
-    const item = history.find(h => h.id === docId);
+    const item = historyItems.find(h => h.id === docId);
     if (item) {
         scrollToForm();
         resultsWrapper.classList.remove("hidden");
         summaryTitle.textContent = `Summary (History: ${item.billName})`;
-        summaryContent.innerHTML = (item.summary || "").replace(/### (.*?)\n/g, '<h3 class="text-xl font-bold mt-6 text-blue-900 border-b pb-2 mb-4">$1</h3>').replace(/\*\*(.*?)\*\*/g, '<strong>$1</strong>');
+        summaryContent.innerHTML = renderMarkdown(item.summary || "");
     }
 }
 window.restoreHistory = restoreHistory;
\ No newline at end of file